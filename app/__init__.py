@@ -1,30 +1,101 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
+from flask_migrate import Migrate
+from .utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 mail = Mail()
+migrate = Migrate()
 
-def create_app():
+def _cli_command():
+    """האפליקציה נטענת לפקודת flask שאינה run (db upgrade, shell, catalog ...)"""
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.info_name != 'run'
+
+
+def create_app(config=None):
+    """config - מילון הגדרות שדורס את app/config.py (בנצ'מרקים, מסד אחר)"""
     app = Flask(__name__)
     app.config.from_object('app.config')
+    if config:
+        app.config.update(config)
+    if _cli_command():
+        # פקודת CLI לא מגישה בקשות - בלי חימום הצ'אטבוט ו-thread המיילים ברקע
+        app.config['CHATBOT_WARMUP'] = False
+        app.config['MAIL_QUEUE_AUTOSTART'] = False
 
-    
+    # מאגר חיבורים לפי DB_POOL_* (אפשר לדרוס דרך SQLALCHEMY_ENGINE_OPTIONS ב-config)
+    from .utils.db_pool import db_pool
+    from .utils.db_routing import db_router
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_recycle': 280,  # Recycle connections after 280 seconds
-        'pool_pre_ping': True 
+        **db_pool.engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
     }
+    db_router.configure(app, db_pool.engine_options)
     app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False) 
 
     db.init_app(app)
+    db_pool.init_app(app, db)
+    db_router.init_app(app)
+    migrate.init_app(app, db)
     mail.init_app(app)
 
+    from .utils.perf import profiler
+    profiler.init_app(app)
+
+    from .services.catalog_cache import catalog_cache
+    catalog_cache.init_app(app)
+
+    from .services.user_cache import user_cache
+    user_cache.init_app(app)
+
+    from .services.rental_version import rental_version
+    rental_version.init_app(app)
+
+    from .services.submission_counter import new_submissions_counter
+    new_submissions_counter.init_app(app)
+
+    from .services.movie_retriever import movie_retriever
+    movie_retriever.init_app(app)
+
+    from .services.chat_cache import response_cache, conversation_store
+    response_cache.init_app(app)
+    conversation_store.init_app(app)
+
+    from .services.ai_service import chatbot_service
+    chatbot_service.init_app(app)
+
+    from .utils.mail_queue import mail_queue
+    mail_queue.init_app(app)
+
+    from .services.poster_cache import poster_cache
+    poster_cache.init_app(app)
+
+    from .utils.image_pipeline import profile_images
+    profile_images.init_app(app)
+
+    from .utils.fragment_cache import fragment_cache
+    fragment_cache.init_app(app)
+
+    from .utils.assets import assets, response_compressor
+    assets.init_app(app)
+    response_compressor.init_app(app)
+
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'  # דף login ברירת מחדל
 
     from .routes import bp as main_bp
     app.register_blueprint(main_bp)
 
+    from .api import bp as api_bp
+    app.register_blueprint(api_bp)
+
+    from .cli import catalog_cli, assets_cli
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(assets_cli)
+
     return app
@@ -0,0 +1,182 @@
+"""
+API JSON בגרסה 1 (/api/v1) מעל שכבת השירותים.
+
+- fields=a,b,c בוחר שדות (ברירת מחדל: LIST_FIELDS של ה-schema)
+- cursor / limit - עימוד keyset; התשובה כוללת next_cursor (או null בעמוד האחרון)
+- ETag נגזר ממוני הגרסה של הקטלוג / ההשכרות / המשתמשים, מהמשתמש ומהפרמטרים.
+  If-None-Match תואם מחזיר 304 לפני כל גישה למסד.
+"""
+import hashlib
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import current_user
+from app.schemas import MovieSchema, RecommendationSchema, RentalSchema, get_schema
+from app.services.catalog_cache import catalog_cache
+from app.services.rental_version import rental_version
+from app.services.user_cache import user_cache
+from app.services.movie_service import get_movies_page, get_available_movies_page, get_recommended_movies
+from app.services.rental_service import get_rentals_page
+from app.utils.pagination import PER_PAGE
+
+bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+MAX_LIMIT = 100
+
+
+def _catalog():
+    return catalog_cache.version
+
+
+def _rentals():
+    return rental_version.version
+
+
+def _users():
+    return user_cache.version
+
+
+# ----- עזרים -----
+def api_login_required(view):
+    """כמו login_required, אבל 401 ב-JSON במקום הפניה לדף ההתחברות"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def conditional(*versions):
+    """
+    ETag לפי מוני הגרסה (פונקציות), המשתמש המחובר והבקשה עצמה.
+    אם ה-ETag תואם ל-If-None-Match - 304 בלי להריץ את ה-view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = [request.endpoint, request.query_string.decode('latin-1'), sorted(kwargs.items()),
+                     current_user.get_id(), bool(request.accept_mimetypes['image/webp'])]
+            parts.extend(version() for version in versions)
+            etag = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # weak - אותו תוכן גם כשהתשובה נדחסת (gzip / br)
+            response.set_etag(etag, weak=True)
+            # הלקוח שומר ומאמת מחדש בכל פעם (If-None-Match) - זול כשאין שינוי
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
+
+
+def _fields(schema_class):
+    raw = request.args.get('fields')
+    if not raw:
+        return schema_class.LIST_FIELDS
+    return tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+
+
+def _dump(schema_class, data, many=True, only=None):
+    """סריאליזציה עם בחירת שדות; שדה לא מוכר -> ValueError"""
+    return get_schema(schema_class, only or _fields(schema_class), many).dump(data)
+
+
+def _limit():
+    return max(1, min(request.args.get('limit', PER_PAGE, type=int), MAX_LIMIT))
+
+
+def _page_response(schema_class, page):
+    try:
+        items = _dump(schema_class, page.items)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'next_cursor': page.next_cursor})
+
+
+# ----- סרטים -----
+@bp.route('/movies')
+@api_login_required
+@conditional(_catalog)
+def movies():
+    page = get_movies_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'movie_id'),
+        order=request.args.get('order', 'asc'),
+        search=request.args.get('q') or None,
+        genre=request.args.get('genre') or None,
+        year=request.args.get('year', type=int),
+        per_page=_limit()
+    )
+    return _page_response(MovieSchema, page)
+
+
+@bp.route('/movies/<int:movie_id>')
+@api_login_required
+@conditional(_catalog)
+def movie(movie_id):
+    # מתוך מטמון הקטלוג - בלי שאילתה
+    movie = catalog_cache.get_movies_by_id().get(movie_id)
+    if movie is None:
+        return jsonify({'error': 'Movie not found'}), 404
+    fields = _fields(MovieSchema) if request.args.get('fields') else tuple(MovieSchema._declared_fields)
+    try:
+        return jsonify(_dump(MovieSchema, movie, many=False, only=fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@bp.route('/movies/available')
+@api_login_required
+@conditional(_catalog, _rentals)
+def available_movies():
+    page = get_available_movies_page(
+        current_user.user_id,
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'movie_id'),
+        order=request.args.get('order', 'asc'),
+        genre=request.args.get('genre') or None,
+        year=request.args.get('year', type=int),
+        per_page=_limit()
+    )
+    return _page_response(MovieSchema, page)
+
+
+# ----- השכרות -----
+@bp.route('/rentals')
+@api_login_required
+@conditional(_rentals, _catalog, _users)
+def rentals():
+    """ההשכרות של המשתמש; אדמין רואה את כולן (או של user_id מסוים)"""
+    user_id, search = current_user.user_id, None
+    if current_user.type == 'admin':
+        user_id = request.args.get('user_id', type=int)
+        search = request.args.get('q') or None
+    page = get_rentals_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'rent_date'),
+        order=request.args.get('order', 'desc'),
+        search=search,
+        user_id=user_id,
+        per_page=_limit()
+    )
+    return _page_response(RentalSchema, page)
+
+
+# ----- המלצות -----
+@bp.route('/recommendations')
+@api_login_required
+@conditional(_catalog, _rentals)
+def recommendations():
+    limit = max(1, min(request.args.get('limit', 3, type=int), 20))
+    try:
+        items = _dump(RecommendationSchema, get_recommended_movies(current_user.user_id, limit=limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items})
@@ -0,0 +1,175 @@
+import asyncio
+import io
+import json
+import logging
+import time
+from contextlib import aclosing
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import request
+
+from app.routes import prepare_chat, sse_event, SSE_HEADERS
+from app.services.ai_service import chatbot_service, CHAT_ERROR_MESSAGE, ERROR_MESSAGE
+from app.utils.perf import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class AsgiApp:
+    """
+    מצב הגשה אסינכרוני (uvicorn asgi:app). נתיבים שרוב זמנם המתנה ל-I/O
+    מטופלים כאן ב-async: ב-/chat ההמתנה לטוקנים של המודל לא תופסת thread,
+    כך שמספר השיחות הפתוחות מוגבל בחיבורים ולא במספר ה-workers.
+    כל שאר הבקשות עוברות לאפליקציית Flask הרגילה דרך מאגר threads
+    (ASGI_WSGI_THREADS) - אותו קוד, אותם hooks.
+
+    מיילים ושליפת פוסטרים כבר לא רצים בתוך הבקשה (mail_queue, poster_cache),
+    ולכן הם נשארים בנתיב הסינכרוני.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WSGIMiddleware(app, workers=app.config.get('ASGI_WSGI_THREADS', 32))
+        self.routes = {
+            ('POST', '/chat'): self.chat,
+            ('GET', '/healthz'): self.healthz,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        handler = self.routes.get((scope.get('method'), scope['path'])) if scope['type'] == 'http' else None
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+        return await handler(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ----- /chat -----
+    async def chat(self, scope, receive, send):
+        body = await _read_body(receive)
+        # החלק הסינכרוני (session, קלט, הקשר הסרטים) קצר ורץ ב-thread עם request context של Flask
+        response, prepared, perf = await asyncio.to_thread(self._prepare_chat,
+                                                           build_environ(scope, io.BytesIO(body)))
+        if prepared is None:
+            return await _send_response(send, response.status_code, _headers(response), response.get_data())
+
+        bot = chatbot_service.get()
+        if prepared['stream']:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': _headers(response)})
+            disconnected = asyncio.Event()
+            watcher = asyncio.create_task(_watch_disconnect(receive, disconnected))
+            tokens = bot.astream_response(prepared['message'], prepared['movies_context'], prepared['session_id'])
+            try:
+                async with aclosing(tokens):
+                    async for token in tokens:
+                        if disconnected.is_set():
+                            break  # הלקוח סגר את החיבור - הבקשה למודל נסגרת ולא ממשיכה לייצר טוקנים
+                        await _send_chunk(send, sse_event({'token': token}))
+                    else:
+                        await _send_chunk(send, sse_event({'time': time.strftime("%H:%M")}, event='done'))
+            except Exception as e:
+                logger.error("Chat stream error: %s", e)
+                await _send_chunk(send, sse_event({'response': CHAT_ERROR_MESSAGE,
+                                                   'time': time.strftime("%H:%M")}, event='error'))
+            finally:
+                watcher.cancel()
+                # הכותרות כבר נשלחו - בלי Server-Timing, רק לוג ו-/admin/perf
+                profiler.complete(*perf, 200)
+            return await send({'type': 'http.response.body', 'body': b''})
+
+        try:
+            parts = [token async for token in bot.astream_response(
+                prepared['message'], prepared['movies_context'], prepared['session_id'])]
+            status, payload = 200, {'response': "".join(parts).strip() or ERROR_MESSAGE,
+                                    'time': time.strftime("%H:%M")}
+        except Exception as e:
+            logger.error("Chat error: %s", e)
+            status, payload = 500, {'error': 'Internal server error', 'response': CHAT_ERROR_MESSAGE,
+                                    'time': time.strftime("%H:%M")}
+        profiler.complete(*perf, status, response.headers)
+        await _send_response(send, status, _headers(response), json.dumps(payload).encode('utf-8'))
+
+    def _prepare_chat(self, environ):
+        """
+        מריץ את prepare_chat בתוך בקשת Flask מלאה (before/after_request, שמירת session).
+        מחזיר (תשובה, None, None) לתשובה מוכנה, או (כותרות, prepared, perf) להמשך ב-async -
+        אז מדידת הפרופיילר מנותקת מהבקשה ונסגרת רק אחרי שכל התשובה נשלחה.
+        """
+        with self.app.request_context(environ):
+            prepared = perf = None
+            try:
+                result = self.app.preprocess_request()
+                if result is None:
+                    result = prepare_chat()
+                    if isinstance(result, dict):
+                        result, prepared = None, result
+            except Exception as e:
+                try:
+                    result = self.app.handle_user_exception(e)
+                except Exception as e:
+                    # באג ולא HTTPException - כמו ב-Flask: לוג, got_request_exception ועמוד 500.
+                    # התשובה כבר עברה finalize_request
+                    return self.app.handle_exception(e), None, None
+            if prepared is None:
+                response = self.app.make_response(result)
+            else:
+                response = self.app.response_class(
+                    mimetype='text/event-stream' if prepared['stream'] else 'application/json',
+                    headers=SSE_HEADERS if prepared['stream'] else None)
+                perf = (profiler.detach(), request.endpoint or 'unknown', request.method)
+            return self.app.process_response(response), prepared, perf
+
+    # ----- /healthz -----
+    async def healthz(self, scope, receive, send):
+        """
+        בדיקת חיות ל-load balancer, בלי session, בלי thread ובלי מסד: מצב הצ'אטבוט בלבד.
+        בדיקת המסד ופרטים למנהלים - /health.
+        """
+        payload = {'status': 'ok', 'chatbot': chatbot_service.state}
+        await _send_response(send, 200, [(b'content-type', b'application/json'),
+                                            (b'cache-control', b'no-store')],
+                             json.dumps(payload).encode('utf-8'))
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body.extend(message.get('body', b''))
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def _watch_disconnect(receive, disconnected):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    disconnected.set()
+
+
+def _headers(response):
+    """כותרות התשובה של Flask (session, Vary, ...) בלי Content-Length - הגוף נשלח בנפרד"""
+    return [(name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.items() if name.lower() != 'content-length']
+
+
+async def _send_chunk(send, text):
+    await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+
+async def _send_response(send, status, headers, body):
+    headers = headers + [(b'content-length', str(len(body)).encode('latin-1'))]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(config=None):
+    from app import create_app
+    return AsgiApp(create_app(config))
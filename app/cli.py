@@ -0,0 +1,71 @@
+import os
+import sys
+import click
+from flask.cli import AppGroup
+from app.services.catalog_io import read_rows, import_movies, export_movies, export_rentals
+
+catalog_cli = AppGroup('catalog', help='ייבוא וייצוא של קטלוג הסרטים וההשכרות')
+
+
+def _format_for(path, fmt):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+@catalog_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='ברירת מחדל: לפי הסיומת')
+@click.option('--batch-size', default=1000, show_default=True)
+def import_command(path, fmt, batch_size):
+    """ייבוא/עדכון סרטים מקובץ CSV או JSONL (או - עבור stdin)"""
+    def progress(processed, inserted, updated, skipped):
+        click.echo(f'\r{processed} rows: {inserted} inserted, {updated} updated, {skipped} skipped', nl=False)
+
+    stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    with stream:
+        result = import_movies(read_rows(stream, _format_for(path, fmt)), batch_size=batch_size, progress=progress)
+    click.echo()
+    for error in result.errors:
+        click.echo(error, err=True)
+    click.echo(f'done: {result.inserted} inserted, {result.updated} updated, {result.skipped} skipped')
+
+
+def _export(lines, path):
+    if path == '-':
+        for line in lines:
+            click.echo(line, nl=False)
+        return
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+    click.echo(f'written {path}', err=True)
+
+
+@catalog_cli.command('export-movies')
+@click.argument('path', default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']))
+def export_movies_command(path, fmt):
+    """ייצוא כל הקטלוג (ברירת מחדל: stdout)"""
+    _export(export_movies(_format_for(path, fmt)), path)
+
+
+@catalog_cli.command('export-rentals')
+@click.argument('path', default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']))
+def export_rentals_command(path, fmt):
+    """ייצוא היסטוריית ההשכרות (ברירת מחדל: stdout)"""
+    _export(export_rentals(_format_for(path, fmt)), path)
+
+
+assets_cli = AppGroup('assets', help='בניית קבצי ה-CSS/JS הסטטיים')
+
+
+@assets_cli.command('build')
+def build_assets_command():
+    """מיניפיקציה, שמות לפי hash ודחיסה מראש (gzip/brotli) ל-static/dist"""
+    from app.utils.assets import assets
+    report = assets.build()
+    for source, sizes in report.items():
+        click.echo(f'{source:<22} ' + ' '.join(f'{name}={size}' for name, size in sizes.items()))
@@ -24,6 +24,13 @@ class Movie(db.Model):
     description = db.Column(db.Text) 
     tags = db.Column(db.String(255)) 
 
+    # סינון לפי ז'אנר/שנה ומיון לפי כותרת (דפי הסרטים והאדמין)
+    __table_args__ = (
+        db.Index('ix_movies_genre_year', 'genre', 'year'),
+        db.Index('ix_movies_year', 'year'),
+        db.Index('ix_movies_title', 'title', 'movie_id'),
+    )
+
 class ContactSubmission(db.Model):
     __tablename__ = 'contact_submissions'
     id = db.Column(db.Integer, primary_key=True)
@@ -34,6 +41,12 @@ class ContactSubmission(db.Model):
     is_new = db.Column(db.Boolean, default=True, nullable=False)
     response_sent = db.Column(db.Boolean, default=False, nullable=False)
 
+    # מונה הפניות החדשות ורשימת הפניות לאדמין (מסוננת ל-is_new / ממוינת לפי זמן)
+    __table_args__ = (
+        db.Index('ix_submissions_is_new_timestamp', 'is_new', 'timestamp', 'id'),
+        db.Index('ix_submissions_timestamp', 'timestamp', 'id'),
+    )
+
     def __repr__(self):
         return f'<ContactSubmission {self.id} by {self.name}>'
 
@@ -43,3 +56,15 @@ class Rental(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'))
     movie_id = db.Column(db.Integer, db.ForeignKey('Movies.movie_id'))
     rent_date = db.Column(db.Date)
+
+    # השכרות של משתמש (כולל NOT EXISTS של הסרטים הזמינים), לפי סרט, ומיון האדמין לפי תאריך
+    __table_args__ = (
+        db.Index('ix_rentals_user_movie', 'user_id', 'movie_id',
+                 mssql_include=['rent_date'], postgresql_include=['rent_date']),
+        db.Index('ix_rentals_movie', 'movie_id'),
+        db.Index('ix_rentals_rent_date', 'rent_date', 'rental_id'),
+    )
+
+    # קשרים לטעינה מוקדמת (joinedload) של המשתמש והסרט יחד עם ההשכרה
+    user = db.relationship('User', lazy='select')
+    movie = db.relationship('Movie', lazy='select')
@@ -3,37 +3,53 @@
 # ============================================
 
 # ----- Flask ומודולים בסיסיים -----
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify,
+    Response, stream_with_context, session, abort
+)
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.utils import secure_filename
-import os
 import time
+import json
+import uuid
 from sqlalchemy import text
 
 # ----- שירותים ומודלים -----
 from app.services.user_service import (
-    get_user_by_id, get_all_users, get_user_by_email_password,
-    create_new_user, user_exists, get_user_by_email, update_user_by_admin
+    get_user_by_id, get_user_by_email_password,
+    create_new_user, user_exists, get_user_by_email, update_user_by_admin, get_users_page
+)
+from app.services.movie_service import (
+    get_movie_by_id, get_recommended_movies, get_available_movies, get_movies_page,
+    movie_changed, get_available_movies_page, search_movies
 )
-from app.services.movie_service import get_movie_by_id, get_all_movies, get_recommended_movies, get_available_movies
 from app.services.rental_service import (
-    create_rental, get_all_rentals_with_details, get_user_rentals_with_movie_details
+    create_rental, get_user_rentals_with_movie_details,
+    rentals_with_details_query, to_rental_row, get_rentals_page, rental_changed
 )
-from app.services.ai_service import MovieChatbot
-from app.models import Rental, ContactSubmission, Movie, User
+from app.services.submission_service import get_submissions_page
+from app.services.catalog_cache import catalog_cache
+from app.services.rental_version import rental_version
+from app.services.ai_service import chatbot_service, UNAVAILABLE_MESSAGE, CHAT_ERROR_MESSAGE
+from app.services.chat_cache import response_cache
+from app.services.user_cache import user_cache
+from app.services.poster_cache import poster_cache
+from app.services.catalog_io import read_rows, import_movies, export_movies, export_rentals
+from app.services.submission_counter import new_submissions_counter
+from app.services.movie_retriever import movie_retriever
+from app.models import Rental, ContactSubmission, Movie
 
 # ----- מערכת מיילים -----
-from flask_mail import Message
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from app.utils.email_utils import send_email
+from app.utils.mail_queue import mail_queue
+from app.utils.image_pipeline import profile_images, ImageValidationError
+from app.utils.perf import profiler
+from app.utils.fragment_cache import fragment_cache, LazySequence
+from app.utils.db_pool import db_pool
+from app.utils.db_routing import db_router
 
 # ----- צ'אטבוט ושירותים נוספים -----
-from . import mail, db, login_manager
-
-# יצירת מופע גלובלי של הצ'אטבוט
-chatbot = MovieChatbot()
+# הצ'אטבוט נבנה בשימוש הראשון ומתחמם ברקע (chatbot_service)
+from . import db, login_manager
 
 bp = Blueprint('main', __name__)
 
@@ -44,7 +60,7 @@ bp = Blueprint('main', __name__)
 # ----- טעינת משתמש -----
 @login_manager.user_loader
 def load_user(user_id):
-    return get_user_by_id(user_id)
+    return user_cache.load(user_id)
 
 # ----- התחברות והרשמה -----
 @bp.route('/login', methods=['GET', 'POST'])
@@ -119,17 +135,27 @@ def index():
 @login_required
 def dashboard():
     if current_user.type == 'admin':
-        rentals = get_all_rentals_with_details()
-        return render_template('admin/dashboard_admin.html', rentals=rentals, user=current_user)
+        return render_template('admin/dashboard_admin.html', user=current_user)
     
     user = get_user_by_id(current_user.user_id)
-    rentals = get_user_rentals_with_movie_details(user.user_id)
-    
+
+    # הבלוקים נשמרים במטמון הקטעים לפי המשתמש ומוני הגרסה; הנתונים נשלפים רק בהחטאה
+    fragment_key = '{}|c{}|r{}|{}'.format(user.user_id, catalog_cache.version,
+                                          rental_version.for_user(user.user_id),
+                                          'webp' if request.accept_mimetypes['image/webp'] else 'jpg')
+    if current_app.config.get('RECOMMENDER') == 'item_item':
+        # המלצות item-item תלויות בהשכרות של כל המשתמשים
+        recommendations_key = f'{fragment_key}|i{rental_version.version}'
+    else:
+        recommendations_key = fragment_key
+
     return render_template('user/dashboard_user.html',
                          user=current_user,
-                         rentals=rentals,
-                         available_movies=get_available_movies(user.user_id),
-                         recommended_movies=get_recommended_movies(user.user_id))
+                         fragment_key=fragment_key,
+                         recommendations_key=recommendations_key,
+                         rentals=LazySequence(lambda: get_user_rentals_with_movie_details(user.user_id)),
+                         available_movies=LazySequence(lambda: get_available_movies(user.user_id, limit=30)),
+                         recommended_movies=LazySequence(lambda: get_recommended_movies(user.user_id)))
 
 # ----- ניהול פרופיל -----
 @bp.route('/profile')
@@ -140,10 +166,11 @@ def profile():
     if request.method == 'POST' and 'profile_image' in request.files:
         image = request.files['profile_image']
         if image and image.filename != '':
-            filename = secure_filename(f"user_{user.user_id}.png")
-            upload_path = os.path.join(current_app.root_path, 'static', 'profile_images', filename)
-            image.save(upload_path)
-            flash("תמונת הפרופיל עודכנה בהצלחה", "success")
+            try:
+                profile_images.submit(user.user_id, image)
+                flash("תמונת הפרופיל עודכנה בהצלחה", "success")
+            except ImageValidationError as e:
+                flash(str(e), "danger")
         return redirect(url_for('main.profile'))
 
     rentals = get_user_rentals_with_movie_details(user.user_id)
@@ -167,13 +194,17 @@ def edit_profile():
             user.password = request.form.get('password')
 
         # טיפול בהעלאת תמונת פרופיל
+        # העיבוד (הקטנה וקידוד) רץ ברקע; כאן רק בדיקת הקובץ
         image = request.files.get('profile_image')
         if image and image.filename != '':
-            filename = secure_filename(f"user_{user.user_id}.png")
-            upload_path = os.path.join(current_app.root_path, 'static', 'profile_images', filename)
-            image.save(upload_path)
+            try:
+                profile_images.submit(user.user_id, image)
+            except ImageValidationError as e:
+                flash(str(e), "danger")
+                return redirect(url_for('main.edit_profile'))
 
         db.session.commit()
+        user_cache.invalidate(user.user_id)
         flash("הפרופיל עודכן בהצלחה!", "success")
         return redirect(url_for('main.profile'))
 
@@ -187,19 +218,36 @@ def edit_profile():
 @bp.route('/all-movies')
 @login_required
 def all_movies():
-    all_movies = get_all_movies()
-    rentals = get_user_rentals_with_movie_details(current_user.user_id)
-    rented_ids = [movie.movie_id for rental, movie in rentals]
-    available_movies = [m for m in all_movies if m.movie_id not in rented_ids]
-    return render_template("user/all_movies.html", movies=available_movies, user=current_user)
+    page = get_available_movies_page(
+        current_user.user_id,
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'movie_id'),
+        order=request.args.get('order', 'asc'),
+        genre=request.args.get('genre') or None,
+        year=request.args.get('year', type=int),
+        per_page=48
+    )
+    return render_template("user/all_movies.html", movies=page.items, page=page, user=current_user)
 
 @bp.route('/movie/<int:movie_id>')
 def movie_details(movie_id):
     movie = get_movie_by_id(movie_id)
     if not movie:
-        return render_template('errors/error_404.html'), 404
+        return render_template('errors/error_404.html', user=current_user), 404
     return render_template('user/movie_details.html', movie=movie, user=current_user)
 
+# ----- חיפוש סרטים -----
+@bp.route('/search')
+@login_required
+def search():
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    results = search_movies(query, limit=limit) if query else []
+
+    if request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json':
+        return jsonify({'query': query, 'results': results})
+    return render_template('user/search.html', query=query, results=results, user=current_user)
+
 # ----- המלצות סרטים -----
 @bp.route('/recommended')
 @login_required
@@ -242,25 +290,19 @@ def delete_rental(rental_id):
         # Get next rental before deleting
         next_rental = None
         if current_user.type == 'admin':
-            next_rental = Rental.query.filter(Rental.rental_id > rental_id).order_by(Rental.rental_id.asc()).first()
-            if next_rental:
-                user = User.query.get(next_rental.user_id)
-                movie = Movie.query.get(next_rental.movie_id)
-                if user and movie:
-                    next_rental_data = {
-                        'rental_id': next_rental.rental_id,
-                        'user_name': f'{user.first_name} {user.last_name}',
-                        'email': user.email,
-                        'movie_id': movie.movie_id,
-                        'movie_title': movie.title,
-                        'movie_genre': movie.genre,
-                        'movie_year': movie.year,
-                        'movie_poster': movie.poster_url,
-                        'rent_date': next_rental.rent_date.strftime('%Y-%m-%d')
-                    }
-
+            next_rental = rentals_with_details_query() \
+                .filter(Rental.rental_id > rental_id) \
+                .order_by(Rental.rental_id.asc()).first()
+            if next_rental and next_rental.user and next_rental.movie:
+                next_rental_data = to_rental_row(next_rental)._asdict()
+                next_rental_data['rent_date'] = next_rental.rent_date.strftime('%Y-%m-%d')
+            else:
+                next_rental = None
+
+        renter_id, rented_movie_id = rental.user_id, rental.movie_id
         db.session.delete(rental)
         db.session.commit()
+        rental_changed(renter_id, rented_movie_id, removed=True)
         
         if current_user.type == 'admin' and next_rental:
             return jsonify(next_rental_data), 200
@@ -280,9 +322,8 @@ def admin_dashboard():
     if current_user.type != 'admin':
         flash("אין לך הרשאה לגשת לדף זה", "danger")
         return redirect(url_for('main.index'))
-    
-    rentals = get_all_rentals_with_details()
-    return render_template("admin/dashboard_admin.html", rentals=rentals, user=current_user)
+
+    return render_template("admin/dashboard_admin.html", user=current_user)
 
 # ----- ניהול משתמשים -----
 @bp.route('/admin/users')
@@ -292,8 +333,14 @@ def admin_users_list():
         flash("אין לך הרשאה לגשת לדף זה", "danger")
         return redirect(url_for('main.index'))
     
-    users = get_all_users()
-    return render_template("admin/admin_users_list.html", users=users, user=current_user)
+    page = get_users_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'user_id'),
+        order=request.args.get('order', 'asc'),
+        search=request.args.get('q', '').strip() or None,
+        user_type=request.args.get('type') or None
+    )
+    return render_template("admin/admin_users_list.html", users=page.items, page=page, user=current_user)
 
 @bp.route('/admin/users/edit/<int:user_id>', methods=['GET', 'POST'])
 @login_required
@@ -324,15 +371,8 @@ def admin_edit_user(user_id):
 בברכה,
 צוות CineMate 🎬
 """
-                msg = Message(
-                    subject=subject,
-                    sender=current_app.config['MAIL_DEFAULT_SENDER'],
-                    recipients=[user.email],
-                    body=body
-                )
-                current_app.logger.info(f"Attempting to send email to {user.email}")
-                mail.send(msg)
-                current_app.logger.info("Email sent successfully")
+                mail_queue.send(user.email, subject, body)
+                current_app.logger.info(f"Email to {user.email} queued")
                 flash("הסיסמה נשלחה למייל של המשתמש.", "success")
             except Exception as e:
                 current_app.logger.error(f"Failed to send email: {str(e)}")
@@ -346,6 +386,7 @@ def admin_edit_user(user_id):
             user.email = request.form['email']
             user.password = request.form['password']
             db.session.commit()
+            user_cache.invalidate(user_id)
             flash("המשתמש עודכן בהצלחה!", "success")
             return redirect(url_for('main.admin_users_list'))
 
@@ -365,6 +406,7 @@ def admin_delete_user(user_id):
 
     db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(user_id)
     flash('המשתמש נמחק בהצלחה', 'success')
     return redirect(url_for('main.admin_users_list'))
 
@@ -376,8 +418,15 @@ def admin_edit_movies():
         flash("אין לך הרשאה לגשת לדף זה", "danger")
         return redirect(url_for('main.index'))
 
-    movies = get_all_movies()
-    return render_template("admin/admin_edit_movies.html", movies=movies, user=current_user)
+    page = get_movies_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'movie_id'),
+        order=request.args.get('order', 'asc'),
+        search=request.args.get('q', '').strip() or None,
+        genre=request.args.get('genre') or None,
+        year=request.args.get('year', type=int)
+    )
+    return render_template("admin/admin_edit_movies.html", movies=page.items, page=page, user=current_user)
 
 @bp.route('/admin/movies/add', methods=['GET', 'POST'])
 @login_required
@@ -405,11 +454,61 @@ def add_movie():
         )
         db.session.add(movie)
         db.session.commit()
+        movie_changed(movie.movie_id, movie)
         flash('🎬 הסרט נוסף בהצלחה!', 'success')
         return redirect(url_for('main.admin_edit_movies'))
 
     return render_template('admin/add_movie.html', user=current_user)
 
+# ----- ייבוא וייצוא של הקטלוג -----
+@bp.route('/admin/movies/import', methods=['GET', 'POST'])
+@login_required
+def import_movies_upload():
+    if current_user.type != 'admin':
+        flash("אין לך הרשאה לגשת לדף זה", "danger")
+        return redirect(url_for('main.index'))
+
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or upload.filename == '':
+            flash('לא נבחר קובץ.', 'danger')
+            return redirect(url_for('main.import_movies_upload'))
+        fmt = 'jsonl' if upload.filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+        try:
+            result = import_movies(read_rows(upload.stream, fmt))
+        except Exception as e:
+            current_app.logger.error(f"Catalog import failed: {e}")
+            flash('הייבוא נכשל באמצע - המנות שכבר נשמרו נשארות במסד.', 'danger')
+            return redirect(url_for('main.import_movies_upload'))
+        flash(f'📥 {result.inserted} סרטים נוספו, {result.updated} עודכנו, {result.skipped} שורות דולגו.',
+              'success' if not result.skipped else 'warning')
+        for error in result.errors[:10]:
+            flash(error, 'danger')
+        return redirect(url_for('main.admin_edit_movies'))
+
+    return render_template('admin/import_movies.html', user=current_user)
+
+def _export_response(lines, name, fmt):
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(lines), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'})
+
+@bp.route('/admin/movies/export')
+@login_required
+def export_movies_download():
+    if current_user.type != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    fmt = 'jsonl' if request.args.get('format') == 'jsonl' else 'csv'
+    return _export_response(export_movies(fmt), 'movies', fmt)
+
+@bp.route('/admin/rentals/export')
+@login_required
+def export_rentals_download():
+    if current_user.type != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    fmt = 'jsonl' if request.args.get('format') == 'jsonl' else 'csv'
+    return _export_response(export_rentals(fmt), 'rentals', fmt)
+
 @bp.route('/admin/movies/edit/<int:movie_id>', methods=['GET', 'POST'])
 @login_required
 def edit_movie(movie_id):
@@ -436,6 +535,7 @@ def edit_movie(movie_id):
 
         try:
             db.session.commit()
+            movie_changed(movie.movie_id, movie)
             flash('🎬 הסרט עודכן בהצלחה!', 'success')
             return redirect(url_for('main.admin_edit_movies'))
         except Exception as e:
@@ -456,12 +556,68 @@ def delete_movie(movie_id):
     if movie:
         db.session.delete(movie)
         db.session.commit()
+        movie_changed(movie_id)
         flash('🎬 הסרט נמחק בהצלחה!', 'success')
     else:
         flash('הסרט לא נמצא.', 'danger')
 
     return redirect(url_for('main.admin_edit_movies'))
 
+# ----- פוסטרים מהמטמון המקומי -----
+@bp.route('/posters/<poster_key:key>-<size>.<ext>')
+def poster(key, size, ext):
+    if size not in poster_cache.SIZES or ext not in poster_cache.FORMATS:
+        abort(404)
+    response = poster_cache.send(key, size, ext)
+    if response is not None:
+        return response
+    # עדיין לא במטמון - שליפה ברקע והפניה זמנית למקור
+    url = poster_cache.url_for_key(key)
+    if url is None:
+        abort(404)
+    poster_cache.prefetch(url)
+    return redirect(url)
+
+# ----- בריאות השירות (load balancer / ניטור) -----
+@bp.route('/health')
+def health():
+    chatbot = chatbot_service.health()
+    if not (current_user.is_authenticated and current_user.type == 'admin'):
+        chatbot = {'state': chatbot['state']}
+    return jsonify({'status': 'ok', 'chatbot': chatbot})
+
+# ----- סטטיסטיקות מטמון -----
+@bp.route('/admin/cache-stats')
+@login_required
+def admin_cache_stats():
+    if current_user.type != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({'catalog': catalog_cache.stats(), 'chat': response_cache.stats(),
+                    'users': user_cache.stats(), 'submissions': new_submissions_counter.stats(),
+                    'posters': poster_cache.stats(), 'fragments': fragment_cache.stats()})
+
+# ----- מאגר החיבורים למסד -----
+@bp.route('/admin/db-pool')
+@login_required
+def admin_db_pool():
+    if current_user.type != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({'pools': db_pool.stats(), 'replica': db_router.enabled})
+
+# ----- ביצועים לפי endpoint -----
+@bp.route('/admin/perf')
+@login_required
+def admin_perf():
+    if current_user.type != 'admin':
+        flash("אין לך הרשאה לגשת לדף זה", "danger")
+        return redirect(url_for('main.index'))
+    endpoints = profiler.summary()
+    slow_queries = list(reversed(profiler.slow_queries))
+    if request.args.get('format') == 'json':
+        return jsonify({'endpoints': endpoints, 'slow_queries': slow_queries})
+    return render_template('admin/admin_perf.html', endpoints=endpoints, slow_queries=slow_queries,
+                           user=current_user)
+
 # ----- ניהול השכרות -----
 @bp.route('/admin/rentals')
 @login_required
@@ -470,8 +626,13 @@ def admin_rentals():
         flash("אין לך הרשאה לגשת לדף זה", "danger")
         return redirect(url_for('main.index'))
 
-    rentals = get_all_rentals_with_details()
-    return render_template("admin/admin_rentals.html", rentals=rentals, user=current_user)
+    page = get_rentals_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'rental_id'),
+        order=request.args.get('order', 'asc'),
+        search=request.args.get('q', '').strip() or None
+    )
+    return render_template("admin/admin_rentals.html", rentals=page.items, page=page, user=current_user)
 
 # ----- ניהול פניות -----
 @bp.route('/admin/submissions')
@@ -481,8 +642,13 @@ def admin_submissions():
         flash("אין לך הרשאה לגשת לדף זה.", "danger")
         return redirect(url_for('main.index'))
     
-    submissions = ContactSubmission.query.order_by(ContactSubmission.timestamp.desc()).all()
-    return render_template('admin/admin_submissions.html', submissions=submissions, user=current_user)
+    page = get_submissions_page(
+        cursor=request.args.get('cursor'),
+        sort=request.args.get('sort', 'timestamp'),
+        order=request.args.get('order', 'desc'),
+        status=request.args.get('status') or None
+    )
+    return render_template('admin/admin_submissions.html', submissions=page.items, page=page, user=current_user)
 
 @bp.route('/admin/submission/<int:submission_id>', methods=['GET', 'POST'])
 @login_required
@@ -497,6 +663,7 @@ def admin_view_submission(submission_id):
     if submission.is_new:
         submission.is_new = False
         db.session.commit()
+        new_submissions_counter.add(-1)
 
     if request.method == 'POST':
         response_subject = request.form.get('response_subject')
@@ -510,13 +677,7 @@ def admin_view_submission(submission_id):
 צוות CineMate 🎬"""
 
         try:
-            msg = Message(
-                subject=response_subject,
-                sender=current_app.config['MAIL_DEFAULT_SENDER'],
-                recipients=[submission.email],
-                body=email_body
-            )
-            mail.send(msg)
+            mail_queue.send(submission.email, response_subject, email_body)
             submission.response_sent = True
             db.session.commit()
             flash("התגובה נשלחה בהצלחה למשתמש.", "success")
@@ -534,8 +695,11 @@ def delete_submission(submission_id):
         return jsonify({"error": "Unauthorized"}), 403
         
     submission = ContactSubmission.query.get_or_404(submission_id)
+    was_new = submission.is_new
     db.session.delete(submission)
     db.session.commit()
+    if was_new:
+        new_submissions_counter.add(-1)
     return '', 204
 
 # ============================================
@@ -568,6 +732,7 @@ def contact():
             )
             db.session.add(new_submission)
             db.session.commit()
+            new_submissions_counter.add(1)
             flash('הפנייה נשלחה בהצלחה! ניצור איתך קשר בהקדם.', 'success')
             return redirect(url_for('main.contact'))
         except Exception as e:
@@ -585,34 +750,93 @@ def contact():
 # ----- שגיאות מערכת -----
 @bp.app_errorhandler(404)
 def page_not_found(e):
-    return render_template('errors/error_404.html'), 404
+    return render_template('errors/error_404.html', user=current_user), 404
 
 @bp.app_errorhandler(500)
 def internal_error(e):
-    return render_template('errors/error_500.html'), 500
+    return render_template('errors/error_500.html', user=current_user), 500
 
 # ============================================
 # ============== צ'אטבוט ==================
 # ============================================
 
 # ----- טיפול בבקשות צ'אט -----
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
 @bp.route('/chat', methods=['POST'])
 def chat():
-    message = request.json.get('message')
-    if not message:
-        return jsonify({'error': 'No message provided'}), 400
+    prepared = prepare_chat()
+    if not isinstance(prepared, dict):
+        return prepared
+
+    # גרסת SSE - התשובה נשלחת טוקן אחר טוקן כפי שהיא מגיעה מהמודל
+    if prepared['stream']:
+        return Response(
+            stream_with_context(_chat_events(prepared['message'], prepared['movies_context'],
+                                             prepared['session_id'])),
+            mimetype='text/event-stream',
+            headers=SSE_HEADERS
+        )
 
     try:
-        response = chatbot.get_response(message)
+        response = chatbot_service.get().get_response(prepared['message'], prepared['movies_context'],
+                                                      prepared['session_id'])
         return jsonify(response)
     except Exception as e:
         current_app.logger.error(f"Chat error: {e}")
         return jsonify({
             'error': 'Internal server error',
-            'response': 'מצטער, נתקלתי בשגיאה. אנא נסה שוב.',
+            'response': CHAT_ERROR_MESSAGE,
             'time': time.strftime("%H:%M")
         }), 500
 
+def prepare_chat():
+    """
+    החלק המשותף ל-/chat ב-WSGI ול-handler האסינכרוני (app/asgi.py): בדיקת הקלט
+    וזמינות המודל, הקשר הסרטים ומזהה השיחה. מחזיר תשובה מוכנה, או dict עם
+    message, movies_context, session_id ו-stream (האם הלקוח ביקש SSE).
+    """
+    message = request.json.get('message')
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    stream = request.accept_mimetypes.best == 'text/event-stream'
+    # המודל ידוע כלא זמין - תשובה מיידית במקום להמתין ל-timeout
+    if not chatbot_service.available():
+        if stream:
+            return Response(sse_event({'token': UNAVAILABLE_MESSAGE}) +
+                            sse_event({'time': time.strftime("%H:%M")}, event='done'),
+                            mimetype='text/event-stream')
+        return jsonify({'response': UNAVAILABLE_MESSAGE, 'time': time.strftime("%H:%M")})
+
+    return {
+        'message': message,
+        # רק הסרטים הרלוונטיים לשאלה נשלחים למודל
+        'movies_context': movie_retriever.context_for(message),
+        'session_id': _chat_session_id(),
+        'stream': stream,
+    }
+
+def _chat_session_id():
+    """מזהה שיחה לכל דפדפן - ההיסטוריה לא מתערבבת בין משתמשים"""
+    if 'chat_id' not in session:
+        session['chat_id'] = uuid.uuid4().hex
+    return session['chat_id']
+
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _chat_events(message, movies_context="", session_id=None):
+    try:
+        for token in chatbot_service.get().stream_response(message, movies_context, session_id):
+            yield sse_event({'token': token})
+        yield sse_event({'time': time.strftime("%H:%M")}, event='done')
+    except Exception as e:
+        current_app.logger.error(f"Chat stream error: {e}")
+        yield sse_event({'response': CHAT_ERROR_MESSAGE,
+                         'time': time.strftime("%H:%M")}, event='error')
+
 # ============================================
 # =========== פונקציות עזר ===============
 # ============================================
@@ -621,15 +845,12 @@ def chat():
 @bp.app_context_processor
 def inject_new_submissions_count():
     if current_user.is_authenticated and current_user.type == 'admin':
-        new_submissions_count = ContactSubmission.query.filter_by(is_new=True).count()
-        return dict(new_submissions_count=new_submissions_count)
+        # מונה מתוחזק במקום COUNT בכל עמוד
+        return dict(new_submissions_count=new_submissions_counter.get())
     return dict(new_submissions_count=0)
 
 # ----- שליחת מיילים -----
 def send_password_email(recipient_email, password):
-    sender_email = os.environ.get('MAIL_USERNAME', 'adar04954@gmail.com')
-    sender_password = os.environ.get('MAIL_PASSWORD', 'ehrf ajby ukoo djsj')
-
     subject = "CineMate – שחזור סיסמה"
     body = f"""
 שלום,
@@ -644,19 +865,4 @@ def send_password_email(recipient_email, password):
 צוות CineMate 🎬
     """
 
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = recipient_email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.send_message(msg)
-        server.quit()
-    except Exception as e:
-        print(f"❌ שגיאה בשליחת מייל: {e}")
-        return False
-    return True
+    return send_email(recipient_email, subject, body)
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from marshmallow import Schema, fields
+from app.services.poster_cache import poster_cache
+from app.services.tag_index import split_tags
+
+
+class Poster(fields.Field):
+    """כתובת הפוסטר להצגה (הגרסה המוקטנת מהמטמון המקומי) מתוך poster_url"""
+
+    def __init__(self, size='md', attribute='poster_url', **kwargs):
+        super().__init__(attribute=attribute, dump_only=True, **kwargs)
+        self.size = size
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return poster_cache.poster_src(value, self.size) if value else None
+
+
+class Tags(fields.Field):
+    def _serialize(self, value, attr, obj, **kwargs):
+        return list(split_tags(value))
+
+
+class MovieSchema(Schema):
+    movie_id = fields.Integer()
+    title = fields.String()
+    genre = fields.String()
+    year = fields.Integer()
+    poster = Poster()
+    poster_url = fields.String()
+    description = fields.String()
+    tags = Tags()
+
+    # ברירת המחדל ברשימות - בלי התיאור (רוב המשקל) ובלי ה-URL המקורי
+    LIST_FIELDS = ('movie_id', 'title', 'genre', 'year', 'poster', 'tags')
+
+
+class RecommendationSchema(MovieSchema):
+    recommendation_rank = fields.Integer()
+
+    LIST_FIELDS = MovieSchema.LIST_FIELDS + ('recommendation_rank',)
+
+
+class RentalSchema(Schema):
+    """שורת RentalRow (השכרה + פרטי המשתמש והסרט)"""
+    rental_id = fields.Integer()
+    rent_date = fields.Date()
+    user_id = fields.Integer()
+    user_name = fields.String()
+    email = fields.String()
+    movie_id = fields.Integer()
+    movie_title = fields.String()
+    movie_genre = fields.String()
+    movie_year = fields.Integer()
+    movie_poster = Poster(size='sm', attribute='movie_poster')
+
+    LIST_FIELDS = ('rental_id', 'rent_date', 'movie_id', 'movie_title', 'movie_genre', 'movie_year',
+                   'movie_poster')
+
+
+@lru_cache(maxsize=256)
+def get_schema(schema_class, only=None, many=True):
+    """
+    מופע schema לכל צירוף שדות - בניית schema של marshmallow יקרה יחסית,
+    והמופעים חסרי מצב ולכן בטוחים לשיתוף. שדה לא מוכר זורק ValueError.
+    """
+    return schema_class(only=only, many=many)
@@ -1,16 +1,291 @@
 import os
 import time
+import asyncio
+import json
 import logging
+import threading
+from app.services.chat_cache import response_cache, conversation_store
 
 # הגדרת לוגים
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+UNAVAILABLE_MESSAGE = "מצטער, שירות הצ'אטבוט אינו זמין כרגע. אנא נסה שוב מאוחר יותר."
+ERROR_MESSAGE = "⚠️ Oops! Something went wrong, try again in a moment!"
+CHAT_ERROR_MESSAGE = "מצטער, נתקלתי בשגיאה. אנא נסה שוב."
+
+
+class OllamaStreamingLLM:
+    """לקוח מינימלי ל-API של Ollama שמחזיר את התשובה בחלקים (stream)"""
+
+    def __init__(self, base_url, model="mistral", timeout=60, options=None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.options = options or {}
+
+    def probe(self):
+        """בדיקת זמינות וטעינת המודל לזיכרון (בקשה בלי prompt) - לחימום ברקע"""
+        import requests  # טעינה עצלה - לא בזמן עליית האפליקציה
+        response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+        response.raise_for_status()
+        models = {model.get("name", "").split(":")[0] for model in response.json().get("models", [])}
+        if self.model.split(":")[0] not in models:
+            raise RuntimeError(f"model {self.model} is not available on {self.base_url}")
+        requests.post(f"{self.base_url}/api/generate", json={"model": self.model},
+                      timeout=self.timeout).raise_for_status()
+
+    def stream(self, prompt):
+        import requests
+        with requests.post(
+            f"{self.base_url}/api/generate",
+            json={"model": self.model, "prompt": prompt, "stream": True, "options": self.options},
+            stream=True,
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    async def astream(self, prompt):
+        """כמו stream, ללא חסימת thread בזמן ההמתנה לטוקנים (מצב ASGI)"""
+        import httpx
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "prompt": prompt, "stream": True, "options": self.options},
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+
+
+class FakeStreamingLLM:
+    """מודל מקומי מזויף לבדיקות ולפיתוח - מחזיר תשובה קבועה מילה אחר מילה"""
+
+    def __init__(self, reply="This is a test answer from the CineMate bot.", delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+
+    def probe(self):
+        pass
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word if i == len(words) - 1 else word + " "
+
+    async def astream(self, prompt):
+        self.prompts.append(prompt)
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield word if i == len(words) - 1 else word + " "
+
+
+def _llm_from_env():
+    backend = os.getenv("CHATBOT_BACKEND", "ollama" if os.getenv("OLLAMA_BASE_URL") else "")
+    if backend == "fake":
+        return FakeStreamingLLM(delay=float(os.getenv("CHATBOT_FAKE_DELAY", "0.05")))
+    if backend == "ollama" and os.getenv("OLLAMA_BASE_URL"):
+        return OllamaStreamingLLM(
+            os.getenv("OLLAMA_BASE_URL"),
+            model=os.getenv("OLLAMA_MODEL", "mistral"),
+            options={
+                "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.1")),
+                "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "512")),
+                "num_predict": int(os.getenv("OLLAMA_NUM_PREDICT", "100")),
+                "stop": ["Question:", "Human:", "User:"],
+            },
+        )
+    # Ollama is disabled for cloud deployment
+    return None
+
+
 class MovieChatbot:
-    def __init__(self):
-        # Ollama is disabled for cloud deployment
-        self.llm = None
-        
-    def get_response(self, user_input, movies_context=""):
-        # Fallback response when Ollama is not available
-        return "מצטער, שירות הצ'אטבוט אינו זמין כרגע. אנא נסה שוב מאוחר יותר."
+    template = """You are CineMate's movie expert. Answer briefly and only about movies.
+{context}{history}
+Question: {question}
+Expert answer:"""
+
+    def __init__(self, llm=None, cache=None, conversations=None):
+        self.llm = llm if llm is not None else _llm_from_env()
+        self.cache = cache if cache is not None else response_cache
+        self.conversations = conversations if conversations is not None else conversation_store
+
+    def build_prompt(self, user_input, movies_context="", history=None):
+        context = f"Movies in our catalog:\n{movies_context}\n" if movies_context else ""
+        turns = "".join(f"Question: {q}\nExpert answer: {a}\n" for q, a in history or [])
+        return self.template.format(context=context, history=turns, question=user_input.strip())
+
+    def stream_response(self, user_input, movies_context="", session_id=None):
+        """
+        מחזיר generator של חלקי התשובה כפי שהם מגיעים מהמודל.
+        שאלה שכבר נענתה עם אותו הקשר ואותה היסטוריית שיחה מוחזרת מהמטמון
+        בלי לפנות למודל.
+        """
+        if not self.llm:
+            yield UNAVAILABLE_MESSAGE
+            return
+
+        history = self.conversations.history(session_id)
+        key = self.cache.key(user_input, movies_context, history)
+        cached = self._cached(key, user_input, session_id)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        parts = []
+        prompt = self.build_prompt(user_input, movies_context, history)
+        for token in self.llm.stream(prompt):
+            parts.append(token)
+            yield token
+        self._remember(key, user_input, session_id, parts, start)
+
+    async def astream_response(self, user_input, movies_context="", session_id=None):
+        """הגרסה האסינכרונית של stream_response, ל-/chat במצב ASGI"""
+        if not self.llm:
+            yield UNAVAILABLE_MESSAGE
+            return
+
+        history = self.conversations.history(session_id)
+        key = self.cache.key(user_input, movies_context, history)
+        cached = self._cached(key, user_input, session_id)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        parts = []
+        prompt = self.build_prompt(user_input, movies_context, history)
+        async for token in self.llm.astream(prompt):
+            parts.append(token)
+            yield token
+        self._remember(key, user_input, session_id, parts, start)
+
+    def _cached(self, key, user_input, session_id):
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.conversations.append(session_id, user_input.strip(), cached)
+        return cached
+
+    def _remember(self, key, user_input, session_id, parts, start):
+        answer = "".join(parts).strip()
+        if answer:
+            self.cache.put(key, answer, time.perf_counter() - start)
+            self.conversations.append(session_id, user_input.strip(), answer)
+
+    def get_response(self, user_input, movies_context="", session_id=None):
+        try:
+            result = "".join(self.stream_response(user_input, movies_context, session_id)).strip()
+        except Exception as e:
+            logger.error("Error in get_response: %s", e, exc_info=True)
+            result = ERROR_MESSAGE
+        return {
+            "response": result or ERROR_MESSAGE,
+            "time": time.strftime("%H:%M")
+        }
+
+
+class ChatbotService:
+    """
+    אתחול עצל של הצ'אטבוט: שום דבר לא נבנה בזמן import או create_app.
+    החימום (בניית הלקוח, בדיקת השרת וטעינת המודל) רץ ב-thread ברקע,
+    ו-/chat פונה לבוט דרך get(). מצב הבריאות:
+      cold        - עוד לא התחיל
+      warming     - החימום רץ
+      ready       - המודל ענה לבדיקה
+      unavailable - אין מודל מוגדר, או שהבדיקה נכשלה (נבדק שוב אחרי retry_interval)
+    """
+
+    def __init__(self, factory=None, retry_interval=60):
+        self._factory = factory or MovieChatbot
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._bot = None
+        self._pid = None
+        self.state = "cold"
+        self.error = None
+        self.checked_at = None
+        self.warmup_seconds = None
+
+    def init_app(self, app):
+        self.retry_interval = app.config.get("CHATBOT_RETRY_INTERVAL", self.retry_interval)
+        if app.config.get("CHATBOT_WARMUP", True):
+            self.start_warmup()
+        app.extensions["chatbot"] = self
+
+    def get(self):
+        """הבוט עצמו - נבנה בקריאה הראשונה"""
+        if self._bot is None:
+            with self._lock:
+                if self._bot is None:
+                    self._bot = self._factory()
+        return self._bot
+
+    def start_warmup(self):
+        with self._lock:
+            if self.state == "warming" and self._pid == os.getpid():
+                return
+            self.state = "warming"
+            self._pid = os.getpid()
+        threading.Thread(target=self._warmup, name="chatbot-warmup", daemon=True).start()
+
+    def _warmup(self):
+        start = time.perf_counter()
+        try:
+            llm = self.get().llm
+            if llm is None:
+                state, error = "unavailable", "no chatbot backend configured"
+            else:
+                llm.probe()
+                state, error = "ready", None
+        except Exception as e:
+            logger.warning("chatbot warmup failed: %s", e)
+            state, error = "unavailable", str(e)
+        with self._lock:
+            self.state, self.error = state, error
+            self.checked_at = time.time()
+            self.warmup_seconds = round(time.perf_counter() - start, 3)
+
+    def available(self):
+        """
+        False רק כשידוע שהמודל לא זמין - אז /chat עונה מיד במקום לחכות ל-timeout.
+        אחרי retry_interval (או ב-worker חדש אחרי fork) החימום מתחיל שוב ברקע.
+        """
+        if self._pid != os.getpid() or (
+                self.state == "unavailable" and self.checked_at is not None
+                and time.time() - self.checked_at > self.retry_interval):
+            self.start_warmup()
+        return self.state != "unavailable"
+
+    def health(self):
+        return {
+            "state": self.state,
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+# מופע גלובלי לתהליך
+chatbot_service = ChatbotService()
@@ -0,0 +1,154 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - ללא נעילת קובץ בין תהליכים
+    fcntl = None
+
+from app.models import Movie
+
+# עותק בלתי ניתן לשינוי של סרט - בטוח לשיתוף בין בקשות ו-threads
+MovieSnapshot = namedtuple('MovieSnapshot', [
+    'movie_id', 'title', 'genre', 'year', 'poster_url', 'description', 'tags'
+])
+
+
+def snapshot_movie(movie):
+    return MovieSnapshot(*(getattr(movie, field) for field in MovieSnapshot._fields))
+
+
+class LocalVersionStamp:
+    """מונה גרסה בזיכרון התהליך בלבד (worker יחיד / פיתוח). slots - מספר מונים נפרדים"""
+
+    def __init__(self, slots=1):
+        self._lock = threading.Lock()
+        self._values = [0] * slots
+
+    def read(self, slot=0):
+        return self._values[slot]
+
+    def bump(self, slot=0):
+        with self._lock:
+            self._values[slot] += 1
+            return self._values[slot]
+
+
+class FileVersionStamp:
+    """
+    מונה גרסה של 8 בתים בקובץ ממופה לזיכרון (mmap), משותף לכל ה-workers
+    של gunicorn על אותה מכונה. קריאה היא גישה לזיכרון בלבד.
+    slots > 1 שומר כמה מונים רצופים באותו קובץ.
+    """
+
+    _FORMAT = '<Q'
+
+    def __init__(self, path, slots=1):
+        self.path = path
+        self._lock = threading.Lock()
+        size = 8 * slots
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)  # ההרחבה ממולאת באפסים
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def read(self, slot=0):
+        return struct.unpack_from(self._FORMAT, self._map, 8 * slot)[0]
+
+    def bump(self, slot=0):
+        with self._lock, open(self.path, 'r+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = self.read(slot) + 1
+            struct.pack_into(self._FORMAT, self._map, 8 * slot, value)
+            return value
+
+
+class CatalogCache:
+    """
+    מטמון קטלוג הסרטים בתוך התהליך.
+    התוכן נטען מחדש כשמונה הגרסה המשותף משתנה (add/edit/delete/update של סרט)
+    או כשעבר ה-TTL - גיבוי לשינויים שנעשו ישירות במסד הנתונים. טעינת TTL
+    שמוצאת שינוי מקדמת את המונה, כך שגם האינדקסים התלויים בו נבנים מחדש.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._stamp = LocalVersionStamp()
+        self._lock = threading.Lock()
+        self._movies = None
+        self._by_id = None
+        self._version = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', self.ttl)
+        if app.config.get('CATALOG_VERSION_BACKEND', 'file') == 'file':
+            path = app.config.get('CATALOG_VERSION_FILE') or \
+                os.path.join(app.instance_path, 'catalog.version')
+            self._stamp = FileVersionStamp(path)
+        app.extensions['catalog_cache'] = self
+
+    @property
+    def version(self):
+        return self._stamp.read()
+
+    def bump(self):
+        """מסמן שהקטלוג השתנה - לקרוא אחרי commit"""
+        return self._stamp.bump()
+
+    def get_movies(self):
+        version = self._stamp.read()
+        movies = self._movies
+        if movies is not None and self._version == version and \
+                time.monotonic() - self._loaded_at < self.ttl:
+            self.hits += 1
+            return movies
+
+        # הגרסה נקראת לפני השאילתה, כך ששינוי שיתבצע במהלכה יגרום לטעינה נוספת
+        previous, previous_version = movies, self._version
+        movies = tuple(snapshot_movie(movie) for movie in Movie.query.order_by(Movie.movie_id).all())
+        if previous is not None and previous_version == version and movies != previous:
+            # טעינת TTL מצאה שינוי ישיר במסד - קידום הגרסה בונה מחדש גם את
+            # אינדקס התגיות, החיפוש וה-retriever בכל ה-workers
+            version = self._stamp.bump()
+        with self._lock:
+            self.misses += 1
+            self._movies = movies
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return movies
+
+    def get_movies_by_id(self):
+        """אותו קטלוג כמילון movie_id -> MovieSnapshot"""
+        movies = self.get_movies()
+        by_id = self._by_id
+        if by_id is None or by_id[0] is not movies:
+            by_id = (movies, {movie.movie_id: movie for movie in movies})
+            self._by_id = by_id
+        return by_id[1]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'version': self.version,
+            'cached_movies': len(self._movies) if self._movies is not None else 0,
+            'ttl': self.ttl,
+        }
+
+
+# מופע גלובלי לתהליך
+catalog_cache = CatalogCache()
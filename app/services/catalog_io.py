@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import logging
+from collections import namedtuple
+from sqlalchemy import insert, update
+from app import db
+from app.models import Movie, Rental, User
+from app.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+MOVIE_FIELDS = ('movie_id', 'title', 'genre', 'year', 'poster_url', 'description', 'tags')
+RENTAL_FIELDS = ('rental_id', 'rent_date', 'user_id', 'email', 'movie_id', 'title')
+MAX_ERRORS = 100
+
+ImportResult = namedtuple('ImportResult', ['inserted', 'updated', 'skipped', 'errors'])
+
+
+class RowError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'שורה {line}: {message}')
+        self.line = line
+
+
+# ----- קריאה -----
+def read_rows(stream, fmt):
+    """מחזיר generator של (מספר שורה, dict) מתוך קובץ CSV או JSONL בינארי, בלי לטעון הכל לזיכרון"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for line, row in enumerate(csv.DictReader(text), start=2):
+            yield line, row
+    elif fmt == 'jsonl':
+        for line, raw in enumerate(text, start=1):
+            if not raw.strip():
+                continue
+            try:
+                row = json.loads(raw)
+            except ValueError as e:
+                yield line, RowError(line, f'JSON לא תקין ({e.msg})')
+                continue
+            yield line, row if isinstance(row, dict) else RowError(line, 'כל שורה חייבת להיות אובייקט JSON')
+    else:
+        raise ValueError(f'פורמט לא נתמך: {fmt}')
+
+
+def _text(row, field, max_length, line, required=False):
+    value = row.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(line, f'חסר {field}')
+    if len(value) > max_length:
+        raise RowError(line, f'{field} ארוך מ-{max_length} תווים')
+    return value or None
+
+
+def _int(row, field, line, minimum=None, maximum=None):
+    value = row.get(field)
+    if value in (None, ''):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RowError(line, f'{field} חייב להיות מספר')
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise RowError(line, f'{field} מחוץ לטווח')
+    return value
+
+
+MOVIE_VALIDATORS = {
+    'genre': lambda row, line: _text(row, 'genre', 50, line),
+    'year': lambda row, line: _int(row, 'year', line, minimum=1870, maximum=2100),
+    'poster_url': lambda row, line: _text(row, 'poster_url', 255, line),
+    'description': lambda row, line: _text(row, 'description', 10_000, line),
+    'tags': lambda row, line: _text(row, 'tags', 255, line),
+}
+
+# ערכים לעמודות שלא הופיעו בקובץ - רק בהוספת סרט חדש
+MOVIE_DEFAULTS = {'genre': None, 'year': None, 'poster_url': 'movies/default.jpg',
+                  'description': None, 'tags': None}
+
+
+def validate_movie(row, line):
+    """
+    שורה גולמית -> dict עם עמודות Movie שהופיעו בשורה בלבד, כך שעדכון
+    לא דורס עמודות שחסרות בקובץ. זורק RowError
+    """
+    movie = {'title': _text(row, 'title', 100, line, required=True)}
+    movie_id = _int(row, 'movie_id', line, minimum=1)
+    if movie_id is not None:
+        movie['movie_id'] = movie_id
+    for field, validate in MOVIE_VALIDATORS.items():
+        if field in row:
+            movie[field] = validate(row, line)
+    return movie
+
+
+# ----- ייבוא -----
+def _existing_ids(batch):
+    """
+    מזהי הסרטים הקיימים לשורות במנה: לפי movie_id, או לפי (title, year) כשאין מזהה.
+    שתי שאילתות IN נפרדות - כל אחת עד batch_size פרמטרים (SQL Server מוגבל ל-2100).
+    """
+    ids = [m['movie_id'] for m in batch if 'movie_id' in m]
+    titles = {m['title'] for m in batch if 'movie_id' not in m}
+    existing_ids, by_key = set(), {}
+    if ids:
+        existing_ids.update(r.movie_id for r in db.session.query(Movie.movie_id).filter(Movie.movie_id.in_(ids)))
+    if titles:
+        for r in db.session.query(Movie.movie_id, Movie.title, Movie.year).filter(Movie.title.in_(titles)):
+            existing_ids.add(r.movie_id)
+            by_key.setdefault((r.title, r.year), r.movie_id)
+    return existing_ids, by_key
+
+
+def _flush_batch(batch):
+    """
+    upsert של מנה אחת בטרנזקציה אחת: UPDATE ב-executemany לפי PK (רק העמודות
+    שבשורה - SQLAlchemy מקבץ שורות לפי קבוצת העמודות) ו-INSERT מרוכז
+    """
+    existing_ids, by_key = _existing_ids(batch)
+    inserts, updates = [], []
+    for movie in batch:
+        movie_id = movie.get('movie_id') or by_key.get((movie['title'], movie.get('year')))
+        if movie_id in existing_ids:
+            updates.append({**movie, 'movie_id': movie_id})
+        else:
+            inserts.append({**MOVIE_DEFAULTS, **movie})
+    try:
+        if updates:
+            db.session.execute(update(Movie), updates)
+        if inserts:
+            db.session.execute(insert(Movie), inserts)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(inserts), len(updates)
+
+
+def import_movies(rows, batch_size=1000, progress=None):
+    """
+    ייבוא/עדכון סרטים ממקור זורם של (מספר שורה, dict).
+    שורות לא תקינות מדולגות ונאספות (עד MAX_ERRORS); כל מנה נשמרת ב-commit משלה.
+    progress(processed, inserted, updated, skipped) נקרא אחרי כל מנה.
+    """
+    inserted = updated = skipped = processed = 0
+    errors = []
+    batch = []
+    seen = set()
+
+    def flush():
+        nonlocal inserted, updated
+        if batch:
+            i, u = _flush_batch(batch)
+            inserted, updated = inserted + i, updated + u
+            batch.clear()
+            seen.clear()
+            if progress:
+                progress(processed, inserted, updated, skipped)
+
+    try:
+        for line, row in rows:
+            processed += 1
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                movie = validate_movie(row, line)
+            except RowError as e:
+                skipped += 1
+                if len(errors) < MAX_ERRORS:
+                    errors.append(str(e))
+                continue
+            # אותו סרט פעמיים באותה מנה - מסיימים את המנה קודם כדי שהשני יהיה עדכון
+            key = movie.get('movie_id') or (movie['title'], movie.get('year'))
+            if key in seen:
+                flush()
+            seen.add(key)
+            batch.append(movie)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if inserted or updated:
+            # גם כשמנה מאוחרת נכשלה - המנות הקודמות כבר נשמרו, והאינדקסים
+            # והמטמונים נבנים מחדש בגישה הבאה
+            catalog_cache.bump()
+    logger.info('catalog import: %d inserted, %d updated, %d skipped', inserted, updated, skipped)
+    return ImportResult(inserted, updated, skipped, errors)
+
+
+# ----- ייצוא -----
+def _iter_chunks(query, key_column, chunk_size):
+    """מעבר על כל התוצאות במנות לפי keyset על המפתח - זיכרון חסום ובלי cursor פתוח לאורך ההורדה"""
+    last = None
+    while True:
+        chunk_query = query.order_by(key_column)
+        if last is not None:
+            chunk_query = chunk_query.filter(key_column > last)
+        rows = chunk_query.limit(chunk_size).all()
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1][0]
+
+
+def _serialize(rows, fields, fmt):
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue()
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
+    elif fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), ensure_ascii=False, default=str) + '\n'
+    else:
+        raise ValueError(f'פורמט לא נתמך: {fmt}')
+
+
+def export_movies(fmt='csv', chunk_size=1000):
+    """generator של שורות טקסט (CSV / JSONL) עבור כל הקטלוג"""
+    query = db.session.query(*(getattr(Movie, field) for field in MOVIE_FIELDS))
+    return _serialize(_iter_chunks(query, Movie.movie_id, chunk_size), MOVIE_FIELDS, fmt)
+
+
+def export_rentals(fmt='csv', chunk_size=5000):
+    """generator של שורות טקסט עבור היסטוריית ההשכרות, כולל אימייל המשתמש ושם הסרט"""
+    query = db.session.query(Rental.rental_id, Rental.rent_date, Rental.user_id, User.email,
+                             Rental.movie_id, Movie.title) \
+        .outerjoin(User, Rental.user_id == User.user_id) \
+        .outerjoin(Movie, Rental.movie_id == Movie.movie_id)
+    return _serialize(_iter_chunks(query, Rental.rental_id, chunk_size), RENTAL_FIELDS, fmt)
@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from app.services.search_index import tokenize
+
+# מילים שלא משנות את משמעות השאלה לצורך מפתח המטמון
+STOPWORDS = {
+    'a', 'an', 'the', 'do', 'does', 'you', 'your', 'have', 'has', 'is', 'are', 'any', 'some',
+    'please', 'can', 'could', 'i', 'me', 'we', 'to', 'of', 'for', 'in', 'on', 'what', 'which',
+    'יש', 'לכם', 'לך', 'אתם', 'של', 'את', 'מה', 'אילו', 'איזה', 'בבקשה', 'אפשר', 'לי', 'גם',
+}
+
+
+def normalize_question(text):
+    """
+    מפתח מנורמל לשאלה: מילים בלי סימני פיסוק, מילות קישור וחזרות, בסדר
+    המקורי - "Alien better than Predator" ו-"Predator better than Alien" שונות.
+    """
+    words = dict.fromkeys(word for word in tokenize(text, variants=False) if word not in STOPWORDS)
+    return ' '.join(words)
+
+
+class ResponseCache:
+    """
+    מטמון תשובות הצ'אטבוט: מפתח = שאלה מנורמלת + טביעת אצבע של ההקשר
+    שנשלף (movies_context) ושל היסטוריית השיחה, כך ששינוי בקטלוג יוצר מפתח
+    חדש ושאלת המשך ("and the second one?") לא מקבלת תשובה משיחה אחרת.
+    פינוי LRU לפי מספר רשומות ונפח בבתים, ותפוגה לפי TTL.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=5 * 1024 * 1024, ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('CHAT_CACHE_MAX_ENTRIES', self.max_entries)
+        self.max_bytes = app.config.get('CHAT_CACHE_MAX_BYTES', self.max_bytes)
+        self.ttl = app.config.get('CHAT_CACHE_TTL', self.ttl)
+
+    @staticmethod
+    def key(question, context='', history=None):
+        """history - זוגות (שאלה, תשובה) קודמים ב-session; ריקה בשאלה ראשונה"""
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        digest = hashlib.sha1(normalized.encode('utf-8'))
+        digest.update(b'\0' + hashlib.sha1(context.encode('utf-8')).digest())
+        for turn in history or ():
+            for text in turn:
+                digest.update(b'\0' + text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] > self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+
+    def put(self, key, response, generation_seconds):
+        """generation_seconds - כמה זמן לקחה התשובה מהמודל (נחסך בכל פגיעה)"""
+        if key is None or not response:
+            return
+        size = len(response.encode('utf-8')) + len(key)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (response, generation_seconds, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'saved_seconds': round(self.saved_seconds, 3),
+        }
+
+
+class ConversationStore:
+    """היסטוריית שיחה חסומה לכל session: עד max_turns זוגות (שאלה, תשובה), עד max_sessions שיחות"""
+
+    def __init__(self, max_turns=3, max_sessions=5000, ttl=1800):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+
+    def init_app(self, app):
+        self.max_turns = app.config.get('CHAT_HISTORY_TURNS', self.max_turns)
+        self.max_sessions = app.config.get('CHAT_MAX_SESSIONS', self.max_sessions)
+
+    def history(self, session_id):
+        if not session_id:
+            return []
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                return []
+            return list(entry[0])
+
+    def append(self, session_id, question, answer):
+        if not session_id:
+            return
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            turns = entry[0] if entry else deque(maxlen=self.max_turns)
+            turns.append((question, answer))
+            self._sessions[session_id] = (turns, time.monotonic())
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+# מופעים גלובליים לתהליך
+response_cache = ResponseCache()
+conversation_store = ConversationStore()
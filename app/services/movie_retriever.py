@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from app.services.catalog_cache import catalog_cache
+from app.services.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class MovieRetriever:
+    """
+    שלב ה-retrieval של הצ'אטבוט: אינדקס TF-IDF של תיאור, תגיות, כותרת וז'אנר
+    של כל סרט, שמור בדיסק כמערכי NumPy בפורמט CSC (מונח -> סרטים) ונטען
+    ב-mmap. לכל שאלה נבחרים k הסרטים הדומים ביותר (קוסינוס) ורק הם נשלחים
+    למודל כ-movies_context, כך שגודל ה-prompt חסום.
+
+    האינדקס נשמר בתיקייה לפי טביעת התוכן של הקטלוג (ולא לפי מונה הגרסה,
+    שמתחיל מ-0 בכל הפעלה), כך שתיקייה מהרצה קודמת או ממסד אחר לא נטענת
+    בטעות. בכל שינוי גרסה הטביעה מחושבת מחדש ואינדקס חסר נבנה.
+    """
+
+    def __init__(self, top_k=5, max_description=200):
+        self.top_k = top_k
+        self.max_description = max_description
+        self.index_dir = None
+        self._lock = threading.Lock()
+        self._loaded = None
+
+    def init_app(self, app):
+        self.index_dir = app.config.get('RETRIEVER_INDEX_DIR') or \
+            os.path.join(app.instance_path, 'retriever')
+        self.top_k = app.config.get('RETRIEVER_TOP_K', self.top_k)
+        os.makedirs(self.index_dir, exist_ok=True)
+        app.extensions['movie_retriever'] = self
+
+    # ----- בנייה ושמירה -----
+    @staticmethod
+    def _document(movie):
+        return ' '.join(filter(None, [movie.title, movie.title, movie.genre,
+                                      (movie.tags or '').replace(',', ' '), movie.description]))
+
+    @staticmethod
+    def fingerprint(movies):
+        """טביעת תוכן של השדות שנכנסים לאינדקס - שם התיקייה בדיסק"""
+        digest = hashlib.blake2b(digest_size=10)
+        for movie in movies:
+            digest.update(json.dumps([movie.movie_id, movie.title, movie.genre, movie.tags,
+                                      movie.description], ensure_ascii=False).encode('utf-8'))
+        return digest.hexdigest()
+
+    def build(self, movies, target_dir):
+        """בונה את האינדקס לתיקייה target_dir (נכתב לתיקייה זמנית ומוחלף אטומית)"""
+        import numpy as np  # טעינה עצלה - נחוץ רק לצ'אט, לא בעליית ה-worker
+        docs = [Counter(tokenize(self._document(movie))) for movie in movies]
+        vocabulary = sorted({term for doc in docs for term in doc})
+        term_ids = {term: i for i, term in enumerate(vocabulary)}
+
+        df = np.zeros(len(vocabulary), dtype=np.float32)
+        for doc in docs:
+            for term in doc:
+                df[term_ids[term]] += 1
+        idf = np.log((1 + len(docs)) / (1 + df)).astype(np.float32) + 1.0
+
+        # postings לכל מונח: (סרט, משקל tf-idf מנורמל L2 לפי סרט)
+        columns = [[] for _ in vocabulary]
+        for row, doc in enumerate(docs):
+            weights = {term_ids[t]: (1 + math.log(tf)) * idf[term_ids[t]] for t, tf in doc.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for col, weight in weights.items():
+                columns[col].append((row, weight / norm))
+
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(col) for col in columns])
+        indices = np.fromiter((row for col in columns for row, _ in col), dtype=np.int32, count=indptr[-1])
+        data = np.fromiter((w for col in columns for _, w in col), dtype=np.float32, count=indptr[-1])
+
+        tmp_dir = tempfile.mkdtemp(prefix='.build-', dir=os.path.dirname(target_dir))
+        np.save(os.path.join(tmp_dir, 'indptr.npy'), indptr)
+        np.save(os.path.join(tmp_dir, 'indices.npy'), indices)
+        np.save(os.path.join(tmp_dir, 'data.npy'), data)
+        np.save(os.path.join(tmp_dir, 'idf.npy'), idf)
+        np.save(os.path.join(tmp_dir, 'movie_ids.npy'), np.array([m.movie_id for m in movies], dtype=np.int64))
+        with open(os.path.join(tmp_dir, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        try:
+            os.rename(tmp_dir, target_dir)
+        except OSError:
+            # worker אחר כבר בנה את אותה גרסה
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _load(self, path):
+        import numpy as np
+
+        def array(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        with open(os.path.join(path, 'vocabulary.json'), encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        return {
+            'indptr': array('indptr'), 'indices': array('indices'), 'data': array('data'),
+            'idf': array('idf'), 'movie_ids': array('movie_ids'),
+            'term_ids': {term: i for i, term in enumerate(vocabulary)},
+        }
+
+    def _cleanup(self, keep):
+        for name in os.listdir(self.index_dir):
+            if name.startswith('v') and name != keep:
+                shutil.rmtree(os.path.join(self.index_dir, name), ignore_errors=True)
+
+    def _current(self):
+        version = catalog_cache.version
+        loaded = self._loaded
+        if loaded is not None and loaded[0] == version:
+            return loaded[1]
+        with self._lock:
+            movies = catalog_cache.get_movies()
+            name = f'v{self.fingerprint(movies)}'
+            path = os.path.join(self.index_dir, name)
+            if not os.path.isdir(path):
+                logger.info('building retriever index for %d movies (catalog version %d)', len(movies), version)
+                self.build(movies, path)
+                self._cleanup(keep=name)
+            index = self._load(path)
+            self._loaded = (version, index)
+            return index
+
+    # ----- שאילתה -----
+    def retrieve(self, question, k=None):
+        """מחזיר עד k זוגות (movie_id, score) הדומים ביותר לשאלה"""
+        import numpy as np
+        k = k or self.top_k
+        index = self._current()
+        query = Counter(t for t in tokenize(question) if t in index['term_ids'])
+        if not query or not len(index['movie_ids']):
+            return []
+
+        indptr, indices, data, idf = index['indptr'], index['indices'], index['data'], index['idf']
+        scores = np.zeros(len(index['movie_ids']), dtype=np.float32)
+        for term, tf in query.items():
+            col = index['term_ids'][term]
+            start, end = indptr[col], indptr[col + 1]
+            scores[indices[start:end]] += data[start:end] * ((1 + math.log(tf)) * idf[col])
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(index['movie_ids'][row]), float(scores[row])) for row in top]
+
+    def context_for(self, question, k=None):
+        """טקסט movies_context קצר עבור השאלה - שורה אחת לכל סרט רלוונטי"""
+        try:
+            hits = self.retrieve(question, k)
+        except Exception as e:
+            logger.error('retrieval failed: %s', e, exc_info=True)
+            return ''
+        if not hits:
+            return ''
+        movies = catalog_cache.get_movies_by_id()
+        lines = []
+        for movie_id, _ in hits:
+            movie = movies.get(movie_id)
+            if movie is None:
+                continue
+            description = (movie.description or '')[:self.max_description]
+            lines.append(f"- {movie.title} ({movie.year}, {movie.genre}) [{movie.tags or ''}]: {description}")
+        return '\n'.join(lines)
+
+
+# מופע גלובלי לתהליך
+movie_retriever = MovieRetriever()
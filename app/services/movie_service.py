@@ -1,9 +1,66 @@
-from app.models import Movie
+from app.models import Movie, Rental
 from app import db
+from sqlalchemy import exists
+from flask import current_app
 from collections import Counter
+import heapq
+from app.utils.pagination import keyset_paginate, PER_PAGE
+from app.services.tag_index import tag_index, split_tags
+from app.services.catalog_cache import catalog_cache, snapshot_movie
+from app.services.search_index import search_index
+from app.services.poster_cache import poster_cache
+from app.utils.db_routing import replica_read
 
 def get_all_movies():
-    return Movie.query.all()
+    """כל הקטלוג כ-MovieSnapshot מתוך המטמון (נטען מחדש רק אחרי שינוי)"""
+    return catalog_cache.get_movies()
+
+def movie_changed(movie_id, movie=None):
+    """
+    לקרוא אחרי commit של הוספה / עריכה / מחיקה של סרט.
+    movie=None פירושו שהסרט נמחק.
+    """
+    catalog_cache.bump()
+    if movie is None:
+        tag_index.remove_movie(movie_id)
+        search_index.remove_movie(movie_id)
+    else:
+        tag_index.update_movie(movie_id, movie.tags)
+        search_index.update_movie(snapshot_movie(movie))
+        poster_cache.prefetch(movie.poster_url)
+
+def search_movies(query, limit=20, prefix=True):
+    """חיפוש טקסט חופשי בקטלוג (BM25 על כותרת, תיאור, תגיות וז'אנר)"""
+    return [
+        {
+            'movie_id': movie.movie_id,
+            'title': movie.title,
+            'genre': movie.genre,
+            'year': movie.year,
+            'poster_url': movie.poster_url,
+            'score': round(score, 4)
+        }
+        for movie, score in search_index.search(query, limit=limit, prefix=prefix)
+    ]
+
+MOVIE_SORTS = {
+    'movie_id': [Movie.movie_id],
+    'title': [Movie.title, Movie.movie_id],
+}
+
+@replica_read
+def get_movies_page(cursor=None, sort='movie_id', order='asc', search=None, genre=None, year=None,
+                    per_page=PER_PAGE):
+    """עמוד סרטים לאדמין (keyset) עם חיפוש וסינון ב-SQL"""
+    query = Movie.query
+    if search:
+        query = query.filter(Movie.title.ilike(f'%{search}%'))
+    if genre:
+        query = query.filter(Movie.genre == genre)
+    if year:
+        query = query.filter(Movie.year == year)
+    columns = MOVIE_SORTS.get(sort, MOVIE_SORTS['movie_id'])
+    return keyset_paginate(query, columns, cursor, descending=(order == 'desc'), per_page=per_page)
 
 def get_movie_by_id(movie_id):
     return Movie.query.get(movie_id)
@@ -21,6 +78,7 @@ def update_movie(movie_id, **kwargs):
     
     try:
         db.session.commit()
+        movie_changed(movie.movie_id, movie)
         return movie
     except Exception as e:
         db.session.rollback()
@@ -29,46 +87,44 @@ def update_movie(movie_id, **kwargs):
 def get_recommended_movies(user_id, limit=3):
     """מקבל המלצות סרטים מותאמות אישית למשתמש לפי תגיות"""
     from app.services.rental_service import get_user_rentals_with_movie_details
-    from collections import Counter
-    
+
+    # מנוע item-item לפי השכרות כל המשתמשים (אם הוגדר), עם נפילה לתגיות
+    if current_app.config.get('RECOMMENDER') == 'item_item':
+        from app.services.recommendation_engine import item_engine
+        top = item_engine.recommend(int(user_id), k=limit)
+        if top:
+            return _recommendation_dicts([movie_id for movie_id, _ in top])
+
     # קבלת סרטים מושכרים של המשתמש
     rentals = get_user_rentals_with_movie_details(user_id)
-    rented_movies = [movie for rental, movie in rentals]
-    
+
     # אם אין היסטוריה, החזר רשימה ריקה
-    if not rented_movies:
+    if not rentals:
         return []
-    
-    # איסוף תגיות המשתמש
-    user_movie_tags = []
+
+    # ספירת תדירות תגיות המשתמש
+    tag_counter = Counter()
     for rental, movie in rentals:
-        if movie.tags:
-            user_movie_tags.extend(tag.strip() for tag in movie.tags.split(','))
-    
-    # ספירת תדירות תגיות
-    tag_counter = Counter(user_movie_tags)
+        tag_counter.update(split_tags(movie.tags))
     if not tag_counter:
         return []
-    
-    # קבלת סרטים זמינים שאינם מושכרים
+
+    # ניקוד דרך האינדקס ההפוך - רק סרטים שחולקים תגית עם ההיסטוריה
     rented_movie_ids = {movie.movie_id for _, movie in rentals}
-    all_movies = get_all_movies() or []
-    available_movies = [movie for movie in all_movies if movie.movie_id not in rented_movie_ids]
-    
-    # דירוג סרטים לפי התאמה לתגיות
-    movie_scores = []
-    for movie in available_movies:
-        if not movie.tags:
-            continue
-            
-        movie_tags = [tag.strip() for tag in movie.tags.split(',')]
-        score = sum(tag_counter[tag] for tag in movie_tags if tag in tag_counter)
-        if score > 0:
-            movie_scores.append((score, movie.movie_id, movie))
-    
-    # מיון והחזרת הסרטים המתאימים ביותר
-    recommended = [movie for _, _, movie in sorted(movie_scores, reverse=True)][:limit]
-    
+    movie_scores = tag_index.score(tag_counter, exclude=rented_movie_ids)
+
+    # top-k בעזרת heap במקום מיון מלא
+    top = heapq.nlargest(limit, movie_scores.items(), key=lambda item: (item[1], item[0]))
+    return _recommendation_dicts([movie_id for movie_id, _ in top])
+
+def _recommendation_dicts(movie_ids):
+    """טוען את הסרטים המומלצים בשאילתה אחת ושומר על סדר הדירוג"""
+    if not movie_ids:
+        return []
+    movies = {movie.movie_id: movie
+              for movie in Movie.query.filter(Movie.movie_id.in_(movie_ids)).all()}
+    recommended = [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
     return [
         {
             'movie_id': movie.movie_id,
@@ -82,22 +138,30 @@ def get_recommended_movies(user_id, limit=3):
         for i, movie in enumerate(recommended, 1)
     ]
 
-def get_available_movies(user_id):
-    """מחזיר רשימת סרטים שהמשתמש לא שכר עדיין"""
-    from app.services.rental_service import get_user_rentals_with_movie_details
-    
-    rentals = get_user_rentals_with_movie_details(user_id)
-    rented_ids = [movie.movie_id for rental, movie in rentals]
-    all_movies = get_all_movies() or []
-    
-    return [
-        {
-            'movie_id': movie.movie_id,
-            'title': movie.title,
-            'genre': movie.genre,
-            'year': movie.year,
-            'poster_url': movie.poster_url
-        }
-        for movie in all_movies
-        if movie.movie_id not in rented_ids
-    ]
+def available_movies_query(user_id, genre=None, year=None):
+    """סרטים שהמשתמש לא שכר - NOT EXISTS מול Rentals, עם סינון ב-SQL"""
+    rented = exists().where(Rental.movie_id == Movie.movie_id, Rental.user_id == user_id)
+    query = Movie.query.filter(~rented)
+    if genre:
+        query = query.filter(Movie.genre == genre)
+    if year:
+        query = query.filter(Movie.year == year)
+    return query
+
+@replica_read
+def get_available_movies_page(user_id, cursor=None, sort='movie_id', order='asc',
+                              genre=None, year=None, per_page=PER_PAGE):
+    """עמוד (keyset) של סרטים זמינים להשכרה"""
+    columns = MOVIE_SORTS.get(sort, MOVIE_SORTS['movie_id'])
+    return keyset_paginate(available_movies_query(user_id, genre, year), columns, cursor,
+                           descending=(order == 'desc'), per_page=per_page)
+
+@replica_read
+def get_available_movies(user_id, limit=None, genre=None, year=None):
+    """מחזיר רשימת סרטים שהמשתמש לא שכר עדיין (רק העמודות הנדרשות)"""
+    query = available_movies_query(user_id, genre, year) \
+        .with_entities(Movie.movie_id, Movie.title, Movie.genre, Movie.year, Movie.poster_url) \
+        .order_by(Movie.movie_id)
+    if limit:
+        query = query.limit(limit)
+    return [row._asdict() for row in query.all()]
@@ -0,0 +1,190 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import has_request_context, request, send_file, url_for
+from werkzeug.routing import BaseConverter
+from app.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+def poster_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+
+class PosterKeyConverter(BaseConverter):
+    """מפתח פוסטר ב-URL - בדיוק 20 תווי hex כמו poster_key"""
+    regex = '[0-9a-f]{20}'
+
+
+class PosterCache:
+    """
+    מטמון מקומי לפוסטרים של הסרטים: כל poster_url חיצוני נשלף פעם אחת,
+    מוקטן לכמה רוחבים קבועים ונשמר בדיסק לפי hash של ה-URL. התבניות מפנות
+    ל-/posters/<key>-<size>.<ext>, שמוגש עם ETag ו-Cache-Control immutable
+    (URL חדש = key חדש).
+
+    רק URL-ים שמופיעים בקטלוג ניתנים לשליפה, כך שה-route אינו proxy פתוח.
+    פוסטר שעדיין לא במטמון מופנה לכתובת המקורית ונשלף ברקע.
+    """
+
+    SIZES = {'sm': 185, 'md': 342, 'lg': 500}
+    FORMATS = ('webp', 'jpg')
+    CACHE_MAX_AGE = 365 * 24 * 3600
+
+    def __init__(self, workers=2, timeout=10, max_bytes=10 * 1024 * 1024, retry_after=600):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.retry_after = retry_after
+        self.cache_dir = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = set()
+        self._failed = {}
+        self._urls = None
+        self.fetched = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        self.workers = app.config.get('POSTER_CACHE_WORKERS', self.workers)
+        self.timeout = app.config.get('POSTER_FETCH_TIMEOUT', self.timeout)
+        self.max_bytes = app.config.get('POSTER_MAX_BYTES', self.max_bytes)
+        self.cache_dir = app.config.get('POSTER_CACHE_DIR') or os.path.join(app.instance_path, 'posters')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        app.add_template_global(self.poster_src, 'poster_src')
+        # לפני רישום ה-blueprint - הנתיב /posters משתמש בו
+        app.url_map.converters['poster_key'] = PosterKeyConverter
+        app.extensions['poster_cache'] = self
+
+    # ----- נתיבים -----
+    def path(self, key, size, ext):
+        return os.path.join(self.cache_dir, key[:2], f'{key}-{size}.{ext}')
+
+    def is_cached(self, key):
+        return os.path.exists(self.path(key, 'lg', self.FORMATS[-1]))
+
+    def url_for_key(self, key):
+        """ה-URL המקורי לפי ה-key - רק מתוך הקטלוג"""
+        movies = catalog_cache.get_movies()
+        urls = self._urls
+        if urls is None or urls[0] is not movies:
+            urls = (movies, {poster_key(m.poster_url): m.poster_url
+                             for m in movies if self.is_remote(m.poster_url)})
+            self._urls = urls
+        return urls[1].get(key)
+
+    @staticmethod
+    def is_remote(url):
+        return bool(url) and url.startswith(('http://', 'https://'))
+
+    def poster_src(self, url, size='md'):
+        """כתובת להצגה בתבנית: הגרסה המקומית, או ה-URL עצמו אם אינו חיצוני"""
+        if not self.is_remote(url):
+            return url
+        ext = 'webp' if has_request_context() and request.accept_mimetypes['image/webp'] else 'jpg'
+        return url_for('main.poster', key=poster_key(url), size=size, ext=ext)
+
+    def send(self, key, size, ext):
+        """Response לגרסה השמורה, או None אם עדיין לא נשלפה"""
+        if size not in self.SIZES or ext not in self.FORMATS:
+            return None
+        path = self.path(key, size, ext)
+        if not os.path.exists(path):
+            return None
+        response = send_file(path, mimetype='image/webp' if ext == 'webp' else 'image/jpeg',
+                             etag=f'{key}-{size}.{ext}', conditional=True, max_age=self.CACHE_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    # ----- שליפה ועיבוד ברקע -----
+    def prefetch(self, url):
+        """מתזמן שליפה של הפוסטר ברקע (לקרוא אחרי שמירת poster_url)"""
+        if not self.is_remote(url):
+            return None
+        key = poster_key(url)
+        with self._lock:
+            if key in self._pending or self.is_cached(key):
+                return None
+            if time.monotonic() - self._failed.get(key, float('-inf')) < self.retry_after:
+                return None
+            self._pending.add(key)
+        return self._pool().submit(self._fetch, key, url)
+
+    def _pool(self):
+        # נוצר בשימוש הראשון בכל תהליך - בטוח ל-fork של gunicorn
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='poster-cache')
+        return self._executor
+
+    def _fetch(self, key, url):
+        import requests  # טעינה עצלה - רק ב-thread של השליפה, לא בעליית האפליקציה
+        try:
+            with requests.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                data = response.raw.read(self.max_bytes + 1, decode_content=True)
+            if len(data) > self.max_bytes:
+                raise ValueError('poster too large')
+            for (size, ext), content in self.render(data).items():
+                self._write(self.path(key, size, ext), content)
+            self.fetched += 1
+            return True
+        except Exception as e:  # RequestException, UnidentifiedImageError, DecompressionBombError...
+            # תמונה פגומה או זדונית לא מפילה את ה-thread ולא נשלפת שוב עד retry_after
+            logger.warning('poster fetch failed for %s: %s: %s', url, type(e).__name__, e)
+            with self._lock:
+                self._failed[key] = time.monotonic()
+            self.failed += 1
+            return False
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def render(self, data):
+        """מחזיר {(size, ext): bytes} - הקטנה לפי רוחב, בלי הגדלה"""
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft('RGB', (max(self.SIZES.values()), max(self.SIZES.values()) * 2))
+            image = image.convert('RGB')
+        outputs = {}
+        for name, width in self.SIZES.items():
+            resized = image
+            if image.width > width:
+                resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS,
+                                       reducing_gap=3.0)
+            for ext in self.FORMATS:
+                buf = io.BytesIO()
+                if ext == 'webp':
+                    resized.save(buf, 'WEBP', quality=80, method=4)
+                else:
+                    resized.save(buf, 'JPEG', quality=82, optimize=True, progressive=True)
+                outputs[(name, ext)] = buf.getvalue()
+        return outputs
+
+    @staticmethod
+    def _write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        return {
+            'fetched': self.fetched,
+            'failed': self.failed,
+            'pending': len(self._pending),
+        }
+
+
+# מופע גלובלי לתהליך
+poster_cache = PosterCache()
@@ -0,0 +1,175 @@
+import threading
+from collections import defaultdict
+from app.models import Rental, Movie
+from app import db
+from app.services.rental_version import rental_version
+
+
+class ItemSimilarityEngine:
+    """
+    מנוע המלצות item-item לפי היסטוריית ההשכרות של כל המשתמשים.
+
+    שומר מטריצת co-occurrence דלילה C = Xᵀ·X (סרט × סרט) מתוך מטריצת
+    המשתמש × סרט X, ואת מספר השוכרים של כל סרט n. דמיון קוסינוס בין
+    סרטים i, j הוא C[i, j] / √(nᵢ·nⱼ), ולכן הניקוד של סרט j עבור משתמש
+    הוא (Σᵢ C[i, j] / √nᵢ) / √nⱼ - מכפלת וקטור במטריצה אחת.
+
+    השכרות חדשות נרשמות ב-delta קטן שממוזג למטריצה כשהוא גדל. שינוי
+    בגרסת ההשכרות מ-worker אחר גורם לבנייה מחדש בהמלצה הבאה.
+    """
+
+    def __init__(self, max_delta=50000):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+        self.max_delta = max_delta
+
+    @property
+    def built(self):
+        return self._built
+
+    # ----- בנייה מלאה -----
+    def build(self):
+        """בנייה מלאה מטבלת ההשכרות (שתי עמודות בלבד)"""
+        version = rental_version.version
+        pairs = db.session.query(Rental.user_id, Rental.movie_id) \
+            .filter(Rental.user_id.isnot(None), Rental.movie_id.isnot(None)).all()
+        movie_ids = [movie_id for movie_id, in db.session.query(Movie.movie_id).all()]
+        self.build_from_pairs(pairs, movie_ids, version)
+
+    def build_from_pairs(self, pairs, movie_ids=(), version=None):
+        """בנייה ממערך זוגות (user_id, movie_id) - משמש גם לבנצ'מרק"""
+        import numpy as np  # טעינה עצלה - numpy ו-scipy כבדים ונחוצים רק למנוע item-item
+        from scipy import sparse
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        items = np.unique(np.concatenate([pairs[:, 1], np.asarray(movie_ids, dtype=np.int64)]))
+        users, user_idx = np.unique(pairs[:, 0], return_inverse=True)
+        item_idx = np.searchsorted(items, pairs[:, 1])
+
+        X = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.float32), (user_idx, item_idx)),
+            shape=(len(users), len(items))
+        )
+        X.sum_duplicates()
+        # מספר ההשכרות של כל זוג - כדי שמחיקת השכרה כפולה לא תמחק את הזוג
+        rentals = X.data.astype(np.int64)
+        X.data[:] = 1.0  # השכרה חוזרת של אותו סרט נספרת פעם אחת
+
+        C = (X.T @ X).tocsr()
+        C.setdiag(0)
+        C.eliminate_zeros()
+
+        user_items = {
+            int(users[u]): dict(zip(X.indices[X.indptr[u]:X.indptr[u + 1]].tolist(),
+                                    rentals[X.indptr[u]:X.indptr[u + 1]].tolist()))
+            for u in range(len(users))
+        }
+
+        with self._lock:
+            self._items = items
+            self._item_pos = {int(movie_id): pos for pos, movie_id in enumerate(items)}
+            self._counts = np.asarray(X.sum(axis=0), dtype=np.float64).ravel()
+            self._C = C
+            self._user_items = user_items
+            self._delta = defaultdict(lambda: defaultdict(float))
+            self._delta_size = 0
+            self._version = rental_version.version if version is None else version
+            self._built = True
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    # ----- עדכון אינקרמנטלי -----
+    def _apply(self, user_id, movie_id, sign):
+        pos = self._item_pos.get(movie_id)
+        if pos is None:
+            # סרט שנוסף אחרי הבנייה - בנייה מחדש בשימוש הבא
+            self._built = False
+            return
+        items = self._user_items.setdefault(user_id, {})
+        count = items.get(pos, 0)
+        if sign < 0 and count == 0:
+            return
+        if count + sign > 0:
+            # השכרה נוספת / מחיקת אחת מכמה השכרות של אותו סרט - הזוגות לא משתנים
+            items[pos] = count + sign
+            return
+        if sign < 0:
+            del items[pos]
+        for other in items:
+            self._delta[pos][other] += sign
+            self._delta[other][pos] += sign
+        if sign > 0:
+            items[pos] = 1
+        self._counts[pos] = max(self._counts[pos] + sign, 0)
+        self._delta_size += 2 * len(items)
+        if self._delta_size > self.max_delta:
+            self._merge_delta()
+
+    def _adopt_version(self):
+        # השינוי המקומי הוא היחיד מאז הבנייה - אין צורך לבנות מחדש
+        version = rental_version.version
+        if version == self._version + 1:
+            self._version = version
+
+    def add_rental(self, user_id, movie_id):
+        """לקרוא אחרי rental_version.bump()"""
+        with self._lock:
+            if self._built:
+                self._apply(user_id, movie_id, 1)
+                self._adopt_version()
+
+    def remove_rental(self, user_id, movie_id):
+        """לקרוא אחרי rental_version.bump()"""
+        with self._lock:
+            if self._built:
+                self._apply(user_id, movie_id, -1)
+                self._adopt_version()
+
+    def _merge_delta(self):
+        import numpy as np
+        from scipy import sparse
+        rows, cols, values = [], [], []
+        for i, row in self._delta.items():
+            for j, value in row.items():
+                rows.append(i)
+                cols.append(j)
+                values.append(value)
+        if rows:
+            delta = sparse.csr_matrix((values, (rows, cols)), shape=self._C.shape, dtype=np.float32)
+            self._C = (self._C + delta).tocsr()
+            self._C.eliminate_zeros()
+        self._delta = defaultdict(lambda: defaultdict(float))
+        self._delta_size = 0
+
+    # ----- הגשת המלצות -----
+    def recommend(self, user_id, k=3):
+        """מחזיר עד k זוגות (movie_id, score) מסודרים מהגבוה לנמוך"""
+        import numpy as np
+        if not self._built or self._version != rental_version.version:
+            self.build()
+        with self._lock:
+            items = self._user_items.get(user_id)
+            if not items:
+                return []
+            idx = np.fromiter(items, dtype=np.int64, count=len(items))
+            inv_norm = 1.0 / np.sqrt(np.maximum(self._counts, 1.0))
+
+            scores = np.asarray(self._C[idx].T @ inv_norm[idx], dtype=np.float64).ravel()
+            for i in items:
+                for j, value in self._delta.get(i, {}).items():
+                    scores[j] += value * inv_norm[i]
+            scores *= inv_norm
+            scores[idx] = 0.0
+
+            k = min(k, len(scores))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(int(self._items[pos]), float(scores[pos])) for pos in top if scores[pos] > 0]
+
+
+# מופע גלובלי לתהליך
+item_engine = ItemSimilarityEngine()
@@ -1,28 +1,91 @@
 from app.models import Rental, User, Movie
 from app import db
 from datetime import date
+from collections import namedtuple
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from app.utils.pagination import keyset_paginate, PER_PAGE
+from app.services.recommendation_engine import item_engine
+from app.services.rental_version import rental_version
+from app.utils.db_routing import replica_read
+
+# שורת השכרה מצומצמת לתצוגות האדמין (מפתחות זהים ל-JSON של מחיקת השכרה)
+RentalRow = namedtuple('RentalRow', [
+    'rental_id', 'user_id', 'user_name', 'email',
+    'movie_id', 'movie_title', 'movie_genre', 'movie_year', 'movie_poster',
+    'rent_date'
+])
+
+def to_rental_row(rental):
+    """ממיר השכרה (עם user ו-movie טעונים) לשורה מצומצמת"""
+    user, movie = rental.user, rental.movie
+    return RentalRow(
+        rental_id=rental.rental_id,
+        user_id=rental.user_id,
+        user_name=f'{user.first_name} {user.last_name}' if user else '',
+        email=user.email if user else '',
+        movie_id=rental.movie_id,
+        movie_title=movie.title if movie else '',
+        movie_genre=movie.genre if movie else None,
+        movie_year=movie.year if movie else None,
+        movie_poster=movie.poster_url if movie else None,
+        rent_date=rental.rent_date
+    )
+
+def rentals_with_details_query():
+    """שאילתת השכרות שטוענת משתמש וסרט באותו SELECT (JOIN אחד במקום 2N+1)"""
+    return Rental.query.options(joinedload(Rental.user), joinedload(Rental.movie))
+
+def rental_changed(user_id, movie_id, removed=False):
+    """לקרוא אחרי commit של יצירה / מחיקה של השכרה"""
+    rental_version.bump(user_id)
+    if removed:
+        item_engine.remove_rental(user_id, movie_id)
+    else:
+        item_engine.add_rental(int(user_id), int(movie_id))
 
 # ✔ יצירת השכרה חדשה
 def create_rental(user_id, movie_id):
     rental = Rental(user_id=user_id, movie_id=movie_id, rent_date=date.today())
     db.session.add(rental)
     db.session.commit()
+    rental_changed(user_id, movie_id)
 
 # ✔ החזרת כל ההשכרות בלבד
 def get_all_rentals():
     return Rental.query.all()
 
 # ✔ החזרת כל ההשכרות עם פרטי משתמש וסרט (עבור דשבורד אדמין)
+@replica_read
 def get_all_rentals_with_details():
-    rentals = Rental.query.all()
-    detailed_rentals = []
-    for rental in rentals:
-        user = User.query.get(rental.user_id)
-        movie = Movie.query.get(rental.movie_id)
-        detailed_rentals.append((rental, user, movie))
-    return detailed_rentals
+    rentals = rentals_with_details_query().order_by(Rental.rental_id.asc()).all()
+    return [to_rental_row(rental) for rental in rentals]
+
+# ✔ עמוד השכרות לאדמין (keyset) עם חיפוש ומיון ב-SQL
+RENTAL_SORTS = {
+    'rental_id': [Rental.rental_id],
+    'rent_date': [Rental.rent_date, Rental.rental_id],
+}
+
+@replica_read
+def get_rentals_page(cursor=None, sort='rental_id', order='asc', search=None, user_id=None, per_page=PER_PAGE):
+    query = rentals_with_details_query()
+    if user_id is not None:
+        query = query.filter(Rental.user_id == user_id)
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(
+            Rental.user.has(or_(User.email.ilike(pattern),
+                                User.first_name.ilike(pattern),
+                                User.last_name.ilike(pattern))),
+            Rental.movie.has(Movie.title.ilike(pattern))
+        ))
+    columns = RENTAL_SORTS.get(sort, RENTAL_SORTS['rental_id'])
+    page = keyset_paginate(query, columns, cursor, descending=(order == 'desc'), per_page=per_page)
+    return page._replace(items=[to_rental_row(rental) for rental in page.items])
 
 # ✔ השכרות לפי משתמש כולל פרטי סרט (לפרופיל אישי)
+@replica_read
 def get_user_rentals_with_movie_details(user_id):
     """
     מחזיר רשימה של זוגות (Rental, Movie) לפי מזהה משתמש
@@ -36,5 +99,7 @@ def get_user_rentals_with_movie_details(user_id):
 def delete_rental(rental_id):
     """מחיקת השכרה"""
     rental = Rental.query.get_or_404(rental_id)
+    user_id, movie_id = rental.user_id, rental.movie_id
     db.session.delete(rental)
     db.session.commit()
+    rental_changed(user_id, movie_id, removed=True)
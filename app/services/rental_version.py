@@ -0,0 +1,45 @@
+import os
+from app.services.catalog_cache import LocalVersionStamp, FileVersionStamp
+
+
+class RentalVersion:
+    """
+    מוני גרסה של טבלת ההשכרות - מתקדמים בכל יצירה או מחיקה של השכרה.
+    משותפים ל-workers (קובץ ממופה) כמו מונה הקטלוג; משמשים ל-ETag של ה-API
+    ולכל מטמון שתלוי בהשכרות.
+
+    מונה 0 הוא הגרסה הכללית. בנוסף יש user_slots מונים לפי user_id % user_slots,
+    כך שמטמון של משתמש אחד לא מתרוקן בכל השכרה של משתמש אחר.
+    """
+
+    def __init__(self, user_slots=4096):
+        self.user_slots = user_slots
+        self._stamp = LocalVersionStamp(1 + user_slots)
+
+    def init_app(self, app):
+        self.user_slots = app.config.get('RENTAL_VERSION_USER_SLOTS', self.user_slots)
+        if app.config.get('RENTAL_VERSION_BACKEND', 'file') == 'file':
+            path = app.config.get('RENTAL_VERSION_FILE') or \
+                os.path.join(app.instance_path, 'rentals.version')
+            self._stamp = FileVersionStamp(path, 1 + self.user_slots)
+        else:
+            self._stamp = LocalVersionStamp(1 + self.user_slots)
+        app.extensions['rental_version'] = self
+
+    @property
+    def version(self):
+        return self._stamp.read()
+
+    def for_user(self, user_id):
+        """גרסת ההשכרות של משתמש (משותפת עם המשתמשים באותו slot)"""
+        return self._stamp.read(1 + int(user_id) % self.user_slots)
+
+    def bump(self, user_id=None):
+        """לקרוא אחרי commit של שינוי בהשכרות"""
+        if user_id is not None:
+            self._stamp.bump(1 + int(user_id) % self.user_slots)
+        return self._stamp.bump()
+
+
+# מופע גלובלי לתהליך
+rental_version = RentalVersion()
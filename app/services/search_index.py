@@ -0,0 +1,206 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from app.services.catalog_cache import catalog_cache
+
+# משקל כל שדה בניקוד
+FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'genre': 2.0, 'description': 1.0}
+
+# פרמטרי BM25
+K1 = 1.2
+B = 0.75
+
+# כמה מילים לכל היותר ירחיב חיפוש לפי תחילית (type-ahead)
+MAX_PREFIX_EXPANSIONS = 20
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_NIQQUD_RE = re.compile('[\u0591-\u05C7]')
+_FINAL_LETTERS = str.maketrans('ךםןףץ', 'כמנפצ')
+_HEBREW_PREFIXES = 'והבלמשכ'
+
+
+def _is_hebrew(token):
+    return 'א' <= token[0] <= 'ת'
+
+
+def _variants(token):
+    # מילה עברית עם אות שימוש בתחילתה (ה, ו, ב...) - גם הצורה בלעדיה
+    if len(token) > 3 and _is_hebrew(token) and token[0] in _HEBREW_PREFIXES:
+        return (token, token[1:])
+    return (token,)
+
+
+def tokenize(text, variants=True):
+    """
+    מפרק טקסט עברי / אנגלי למילים מנורמלות: אותיות קטנות, ללא ניקוד
+    ואותיות סופיות. עם variants=True נוספת גם הצורה ללא אות השימוש,
+    כך ש"הסרט" נמצא גם בחיפוש "סרט".
+    """
+    if not text:
+        return []
+    text = _NIQQUD_RE.sub('', text.lower()).translate(_FINAL_LETTERS)
+    words = _TOKEN_RE.findall(text)
+    if not variants:
+        return words
+    return [form for word in words for form in _variants(word)]
+
+
+class SearchIndex:
+    """
+    אינדקס הפוך בזיכרון על כותרת, תיאור, תגיות וז'אנר, עם דירוג BM25
+    והתאמת תחילית למילה האחרונה בשאילתה. נבנה מ-catalog_cache ומתעדכן
+    אינקרמנטלית דרך movie_changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+
+    def _reset(self):
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._doc_len = {}
+        self._doc_norm = {}
+        self._total_len = 0.0
+        self._vocabulary = []
+        self._movies = {}
+
+    def _ensure_built(self):
+        if not self._built or self._version != catalog_cache.version:
+            self.build()
+
+    def build(self):
+        version = catalog_cache.version
+        movies = catalog_cache.get_movies()
+        with self._lock:
+            self._reset()
+            for movie in movies:
+                self._add(movie)
+            self._vocabulary = sorted(self._postings)
+            avg_len = self._total_len / len(self._doc_len) if self._doc_len else 1.0
+            self._doc_norm = {movie_id: self._norm(length, avg_len)
+                              for movie_id, length in self._doc_len.items()}
+            self._version = version
+            self._built = True
+
+    @staticmethod
+    def _norm(length, avg_len):
+        # רכיב נרמול האורך של BM25; מחושב מראש כדי שהחיפוש יהיה חיבור בלבד
+        return K1 * (1 - B + B * length / (avg_len or 1.0))
+
+    def _add(self, movie, keep_sorted=False):
+        weighted = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(movie, field) or ''):
+                weighted[token] += weight
+        for term, tf in weighted.items():
+            if keep_sorted and term not in self._postings:
+                bisect.insort(self._vocabulary, term)
+            self._postings[term][movie.movie_id] = tf
+        length = sum(weighted.values())
+        self._doc_terms[movie.movie_id] = tuple(weighted)
+        self._doc_len[movie.movie_id] = length
+        self._total_len += length
+        if keep_sorted:
+            self._doc_norm[movie.movie_id] = self._norm(length, self._total_len / len(self._doc_len))
+        self._movies[movie.movie_id] = movie
+
+    def _remove(self, movie_id):
+        for term in self._doc_terms.pop(movie_id, ()):
+            docs = self._postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(movie_id, None)
+            if not docs:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocabulary, term)
+                if i < len(self._vocabulary) and self._vocabulary[i] == term:
+                    del self._vocabulary[i]
+        self._total_len -= self._doc_len.pop(movie_id, 0.0)
+        self._doc_norm.pop(movie_id, None)
+        self._movies.pop(movie_id, None)
+
+    def _adopt_version(self):
+        version = catalog_cache.version
+        if version == self._version + 1:
+            self._version = version
+
+    def update_movie(self, movie):
+        """לקרוא אחרי catalog_cache.bump()"""
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(movie.movie_id)
+            self._add(movie, keep_sorted=True)
+            self._adopt_version()
+
+    def remove_movie(self, movie_id):
+        """לקרוא אחרי catalog_cache.bump()"""
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(movie_id)
+            self._adopt_version()
+
+    def _expand_prefix(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query, limit=20, prefix=True):
+        """
+        מחזיר עד limit זוגות (MovieSnapshot, score) מהמתאים ביותר.
+        כאשר prefix=True המילה האחרונה מורחבת לכל המילים שמתחילות בה.
+        """
+        self._ensure_built()
+        words = list(dict.fromkeys(tokenize(query, variants=False)))
+        if not words:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            doc_norm = self._doc_norm
+
+            # לכל מילה בשאילתה: רשימת (מונח, משקל) שהיא מתאימה להם
+            query_terms = []
+            for position, word in enumerate(words):
+                alternatives = {}
+                for form in _variants(word):
+                    boost = 1.0 if form == word else 0.9
+                    alternatives[form] = max(alternatives.get(form, 0.0), boost)
+                    if prefix and position == len(words) - 1:
+                        for term in self._expand_prefix(form):
+                            alternatives.setdefault(term, boost * 0.8)
+                query_terms.append(alternatives.items())
+
+            scores = defaultdict(float)
+            for alternatives in query_terms:
+                best = {}
+                for term, boost in alternatives:
+                    docs = self._postings.get(term)
+                    if not docs:
+                        continue
+                    weight = boost * (K1 + 1) * math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for movie_id, tf in docs.items():
+                        score = weight * tf / (tf + doc_norm[movie_id])
+                        if score > best.get(movie_id, 0.0):
+                            best[movie_id] = score
+                for movie_id, score in best.items():
+                    scores[movie_id] += score
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(self._movies[movie_id], score) for movie_id, score in top]
+
+
+# מופע גלובלי לתהליך
+search_index = SearchIndex()
@@ -0,0 +1,120 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows - ללא נעילת קובץ בין תהליכים
+    fcntl = None
+
+from app.models import ContactSubmission
+
+# מונה (int64) + זמן הסנכרון האחרון מול המסד (epoch, double)
+_FORMAT = '<qd'
+_SIZE = struct.calcsize(_FORMAT)
+
+
+class LocalCounterStore:
+    """המונה בזיכרון התהליך בלבד (worker יחיד / פיתוח)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = (0, 0.0)
+
+    def read(self):
+        return self._value
+
+    def update(self, fn):
+        with self._lock:
+            self._value = fn(*self._value)
+            return self._value
+
+
+class FileCounterStore:
+    """המונה בקובץ ממופה לזיכרון - משותף לכל ה-workers, כמו FileVersionStamp"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _SIZE:
+                os.write(fd, b'\0' * _SIZE)
+            self._map = mmap.mmap(fd, _SIZE)
+        finally:
+            os.close(fd)
+
+    def read(self):
+        return struct.unpack_from(_FORMAT, self._map)
+
+    def update(self, fn):
+        with self._lock, open(self.path, 'r+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = fn(*self.read())
+            struct.pack_into(_FORMAT, self._map, 0, *value)
+            return value
+
+
+class NewSubmissionsCounter:
+    """
+    מספר הפניות החדשות (is_new) לתפריט האדמין, בלי COUNT בכל עמוד.
+    המונה מתעדכן בכל הוספה / סימון כנקראה / מחיקה של פנייה, ומסונכרן מול
+    המסד פעם ב-reconcile_interval שניות (worker אחד בלבד מבצע את הסנכרון).
+    """
+
+    def __init__(self, reconcile_interval=300):
+        self.reconcile_interval = reconcile_interval
+        self._store = LocalCounterStore()
+        self.reconciles = 0
+
+    def init_app(self, app):
+        self.reconcile_interval = app.config.get('SUBMISSIONS_COUNT_RECONCILE', self.reconcile_interval)
+        if app.config.get('SUBMISSIONS_COUNT_BACKEND', 'file') == 'file':
+            path = app.config.get('SUBMISSIONS_COUNT_FILE') or \
+                os.path.join(app.instance_path, 'submissions.count')
+            self._store = FileCounterStore(path)
+        app.extensions['submissions_counter'] = self
+
+    def get(self):
+        count, reconciled_at = self._store.read()
+        if time.time() - reconciled_at >= self.reconcile_interval:
+            count = self.reconcile()
+        return max(count, 0)
+
+    def reconcile(self):
+        """סנכרון מול המסד - COUNT אחד לכל reconcile_interval בכל ה-workers"""
+        now = time.time()
+
+        def claim(count, reconciled_at):
+            # worker אחר כבר סנכרן בינתיים
+            if now - reconciled_at < self.reconcile_interval:
+                return count, reconciled_at
+            return count, now
+
+        if self._store.update(claim)[1] != now:
+            return self._store.read()[0]
+
+        count = ContactSubmission.query.filter_by(is_new=True).count()
+        self._store.update(lambda _, reconciled_at: (count, reconciled_at))
+        self.reconciles += 1
+        return count
+
+    def add(self, delta):
+        """לקרוא אחרי commit: +1 לפנייה חדשה, -1 לפנייה שנקראה או נמחקה כשהייתה חדשה"""
+        self._store.update(lambda count, reconciled_at: (count + delta, reconciled_at))
+
+    def stats(self):
+        count, reconciled_at = self._store.read()
+        return {
+            'new_submissions': count,
+            'reconciled_seconds_ago': round(time.time() - reconciled_at, 1) if reconciled_at else None,
+            'reconciles': self.reconciles,
+        }
+
+
+# מופע גלובלי לתהליך
+new_submissions_counter = NewSubmissionsCounter()
@@ -0,0 +1,21 @@
+from app.models import ContactSubmission
+from app.utils.pagination import keyset_paginate
+from app.utils.db_routing import replica_read
+
+SUBMISSION_SORTS = {
+    'timestamp': [ContactSubmission.timestamp, ContactSubmission.id],
+    'id': [ContactSubmission.id],
+}
+
+@replica_read
+def get_submissions_page(cursor=None, sort='timestamp', order='desc', status=None):
+    """עמוד פניות לאדמין (keyset), ברירת מחדל - החדשות ביותר קודם"""
+    query = ContactSubmission.query
+    if status == 'new':
+        query = query.filter_by(is_new=True)
+    elif status == 'read':
+        query = query.filter_by(is_new=False, response_sent=False)
+    elif status == 'answered':
+        query = query.filter_by(response_sent=True)
+    columns = SUBMISSION_SORTS.get(sort, SUBMISSION_SORTS['timestamp'])
+    return keyset_paginate(query, columns, cursor, descending=(order == 'desc'))
@@ -0,0 +1,102 @@
+import threading
+from collections import defaultdict
+from app.models import Movie
+from app import db
+from app.services.catalog_cache import catalog_cache
+
+
+def split_tags(tags):
+    """מפרק מחרוזת תגיות מופרדת בפסיקים לתגיות מנורמלות"""
+    if not tags:
+        return ()
+    return tuple(dict.fromkeys(tag.strip().lower() for tag in tags.split(',') if tag.strip()))
+
+
+class TagIndex:
+    """
+    אינדקס הפוך בזיכרון: תגית -> מזהי סרטים.
+    נבנה פעם אחת מהטבלה ומתעדכן בהוספה / עריכה / מחיקה של סרט;
+    שינוי בגרסת הקטלוג מ-worker אחר גורם לבנייה מחדש.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(set)
+        self._movie_tags = {}
+        self._built = False
+        self._version = None
+
+    def _ensure_built(self):
+        if not self._built or self._version != catalog_cache.version:
+            self.build()
+
+    def build(self):
+        """בנייה מלאה - שאילתה אחת על שתי עמודות בלבד"""
+        version = catalog_cache.version
+        rows = db.session.query(Movie.movie_id, Movie.tags).all()
+        postings = defaultdict(set)
+        movie_tags = {}
+        for movie_id, tags in rows:
+            movie_tags[movie_id] = split_tags(tags)
+            for tag in movie_tags[movie_id]:
+                postings[tag].add(movie_id)
+        with self._lock:
+            self._postings = postings
+            self._movie_tags = movie_tags
+            self._version = version
+            self._built = True
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    def _remove(self, movie_id):
+        for tag in self._movie_tags.pop(movie_id, ()):
+            ids = self._postings.get(tag)
+            if ids is not None:
+                ids.discard(movie_id)
+                if not ids:
+                    del self._postings[tag]
+
+    def _adopt_version(self):
+        # השינוי המקומי הוא היחיד מאז הבנייה - אין צורך לבנות מחדש
+        version = catalog_cache.version
+        if version == self._version + 1:
+            self._version = version
+
+    def update_movie(self, movie_id, tags):
+        """לקרוא אחרי catalog_cache.bump()"""
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(movie_id)
+            self._movie_tags[movie_id] = split_tags(tags)
+            for tag in self._movie_tags[movie_id]:
+                self._postings[tag].add(movie_id)
+            self._adopt_version()
+
+    def remove_movie(self, movie_id):
+        """לקרוא אחרי catalog_cache.bump()"""
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(movie_id)
+            self._adopt_version()
+
+    def score(self, tag_weights, exclude=()):
+        """
+        מחזיר {movie_id: ניקוד} רק עבור סרטים שחולקים תגית עם tag_weights,
+        ללא הסרטים שב-exclude
+        """
+        self._ensure_built()
+        scores = defaultdict(int)
+        with self._lock:
+            for tag, weight in tag_weights.items():
+                for movie_id in self._postings.get(tag, ()):
+                    if movie_id not in exclude:
+                        scores[movie_id] += weight
+        return scores
+
+
+# מופע גלובלי לתהליך
+tag_index = TagIndex()
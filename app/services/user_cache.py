@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
+from app.models import User
+from app.services.catalog_cache import LocalVersionStamp, FileVersionStamp
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class UserCache:
+    """
+    מטמון המשתמשים המחוברים עבור load_user של Flask-Login.
+
+    בתוך בקשה: המשתמש מוצמד ל-session של SQLAlchemy, כך ש-get_user_by_id
+    על אותו מזהה נענה מה-identity map בלי שאילתה נוספת.
+    בין בקשות: ערכי העמודות נשמרים ל-TTL קצר. כל עדכון או מחיקה של משתמש
+    מקדמים מונה גרסה משותף, וכל ה-workers מרוקנים את המטמון שלהם.
+    """
+
+    def __init__(self, ttl=30, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stamp = LocalVersionStamp()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', self.max_entries)
+        if app.config.get('USER_VERSION_BACKEND', 'file') == 'file':
+            path = app.config.get('USER_VERSION_FILE') or \
+                os.path.join(app.instance_path, 'users.version')
+            self._stamp = FileVersionStamp(path)
+        app.extensions['user_cache'] = self
+
+    def load(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        version = self._stamp.read()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self.hits += 1
+                return self._attach(entry[0])
+            self.misses += 1
+
+        user = db.session.get(User, user_id)
+        if user is not None:
+            values = {key: getattr(user, key) for key in _COLUMNS}
+            with self._lock:
+                if self._version == version:
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.pop(next(iter(self._entries)))
+                    self._entries[user_id] = (values, time.monotonic())
+        return user
+
+    @property
+    def version(self):
+        return self._stamp.read()
+
+    @staticmethod
+    def _attach(values):
+        # בניית אובייקט "טעון" מהערכים השמורים והצמדה ל-session בלי SELECT
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id=None):
+        """לקרוא אחרי commit של עדכון או מחיקת משתמש"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        self._stamp.bump()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'cached_users': len(self._entries),
+            'ttl': self.ttl,
+        }
+
+
+# מופע גלובלי לתהליך
+user_cache = UserCache()
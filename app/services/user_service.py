@@ -1,9 +1,14 @@
 from app.models import User
 from app import db
+from sqlalchemy import or_
+from app.utils.pagination import keyset_paginate
+from app.services.user_cache import user_cache
+from app.utils.db_routing import replica_read
 
 
 def get_user_by_id(user_id):
-    return User.query.get(user_id)
+    # session.get בודק קודם את ה-identity map - המשתמש שנטען ב-load_user לא נשלף שוב
+    return db.session.get(User, user_id)
 
 def get_user_by_email_password(email, password):
     return User.query.filter_by(email=email, password=password).first()
@@ -11,6 +16,25 @@ def get_user_by_email_password(email, password):
 def get_all_users():
     return User.query.all()
 
+USER_SORTS = {
+    'user_id': [User.user_id],
+    'email': [User.email, User.user_id],
+}
+
+@replica_read
+def get_users_page(cursor=None, sort='user_id', order='asc', search=None, user_type=None):
+    """עמוד משתמשים לאדמין (keyset) עם חיפוש וסינון ב-SQL"""
+    query = User.query
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(User.email.ilike(pattern),
+                                 User.first_name.ilike(pattern),
+                                 User.last_name.ilike(pattern)))
+    if user_type:
+        query = query.filter(User.type == user_type)
+    columns = USER_SORTS.get(sort, USER_SORTS['user_id'])
+    return keyset_paginate(query, columns, cursor, descending=(order == 'desc'))
+
 def user_exists(email):
     return User.query.filter_by(email=email).first() is not None
 
@@ -32,6 +56,7 @@ def update_user_by_admin(user_id, first_name, last_name, email, password):
         user.email = email
         user.password = password
         db.session.commit()
+        user_cache.invalidate(user_id)
     return user
 
 def delete_user(user_id):
@@ -40,5 +65,6 @@ def delete_user(user_id):
     if user:
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         return True
     return False
\ No newline at end of file
@@ -0,0 +1,20 @@
+// סגירת הודעות flash (כפתור / אוטומטית אחרי 5 שניות)
+document.addEventListener('DOMContentLoaded', function() {
+    let alerts = document.querySelectorAll('.alert');
+    alerts.forEach(function(alert) {
+        // הוספת מאזין לכפתור הסגירה
+        let closeButton = alert.querySelector('.btn-close');
+        if (closeButton) {
+            closeButton.addEventListener('click', function() {
+                alert.remove();
+            });
+        }
+
+        // סגירה אוטומטית אחרי 5 שניות
+        setTimeout(function() {
+            if (alert) {
+                alert.remove();
+            }
+        }, 5000);
+    });
+});
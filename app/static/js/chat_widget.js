@@ -0,0 +1,156 @@
+// כתובות התמונות מגיעות מה-HTML (data-*), כך שהקובץ זהה לכל המשתמשים ונשמר בדפדפן
+document.addEventListener('DOMContentLoaded', function () {
+    const widget = document.querySelector('.chat-widget');
+    if (!widget) return;
+    const toggle = document.getElementById('chat-toggle');
+    const chatBox = document.getElementById('chat-box');
+    const form = document.getElementById('chat-form');
+    const input = document.getElementById('chat-input');
+    const messages = document.getElementById('chat-messages');
+
+    toggle.addEventListener('click', () => {
+        chatBox.style.display = chatBox.style.display === 'flex' ? 'none' : 'flex';
+        input.focus();
+    });
+
+    const now = new Date();
+    document.getElementById('welcome-time').textContent = now.toLocaleTimeString('en-GB', {
+        hour: '2-digit',
+        minute: '2-digit',
+        hour12: false
+    });
+
+    function addMessage(text, type, time = null) {
+        const now = new Date();
+        const currentTime = time || now.toLocaleTimeString('en-GB', {
+            hour: '2-digit',
+            minute: '2-digit',
+            hour12: false
+        });
+
+        const div = document.createElement('div');
+        div.className = `chat-message ${type}-message`;
+
+        const avatarDiv = document.createElement('div');
+        avatarDiv.className = 'message-avatar';
+
+        const avatarImg = document.createElement('img');
+        avatarImg.src = type === 'bot' ? widget.dataset.botAvatar : widget.dataset.userAvatar;
+        avatarImg.onerror = function() {
+            this.onerror = null;
+            this.src = widget.dataset.defaultAvatar;
+        };
+        avatarImg.alt = type === 'bot' ? 'Bot' : 'User';
+        avatarDiv.appendChild(avatarImg);
+
+        const contentWrapper = document.createElement('div');
+        contentWrapper.className = 'message-content-wrapper';
+
+        const textDiv = document.createElement('div');
+        textDiv.className = 'message-text';
+        textDiv.textContent = text;
+
+        const timeSpan = document.createElement('span');
+        timeSpan.className = 'message-time';
+        timeSpan.textContent = currentTime;
+
+        contentWrapper.appendChild(textDiv);
+        contentWrapper.appendChild(timeSpan);
+
+        div.appendChild(avatarDiv);
+        div.appendChild(contentWrapper);
+
+        messages.querySelector('#messages-container').appendChild(div);
+        messages.scrollTop = messages.scrollHeight;
+        return textDiv;
+    }
+
+    async function sendMessage() {
+        const message = input.value.trim();
+        if (!message) return;
+
+        // הוספת ההודעה של המשתמש
+        addMessage(message, 'user');
+        input.value = '';
+
+        // הצגת אנימציית ההקלדה
+        const typingIndicator = document.getElementById('typing-indicator');
+        const messagesContainer = document.getElementById('messages-container');
+        typingIndicator.style.display = 'block';
+        
+        // גלילה לתחתית כדי לראות את האנימציה
+        messages.scrollTop = messages.scrollHeight;
+
+        try {
+            const response = await fetch('/chat', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+                body: JSON.stringify({ message })
+            });
+            if (!response.ok || !response.body) {
+                throw new Error('Chat request failed');
+            }
+
+            // קריאת אירועי SSE והצגת הטוקנים ברגע שהם מגיעים
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let botText = null;
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const frame = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let event = 'message';
+                    let data = '';
+                    frame.split('\n').forEach(line => {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    });
+                    const payload = data ? JSON.parse(data) : {};
+
+                    if (event === 'message') {
+                        if (!botText) {
+                            typingIndicator.style.display = 'none';
+                            botText = addMessage('', 'bot');
+                        }
+                        botText.textContent += payload.token;
+                        messages.scrollTop = messages.scrollHeight;
+                    } else if (event === 'done') {
+                        if (!botText) {
+                            typingIndicator.style.display = 'none';
+                            botText = addMessage('', 'bot');
+                        }
+                        botText.parentElement.querySelector('.message-time').textContent = payload.time;
+                    } else if (event === 'error') {
+                        typingIndicator.style.display = 'none';
+                        addMessage(payload.response, 'error', payload.time);
+                    }
+                }
+            }
+            typingIndicator.style.display = 'none';
+        } catch (error) {
+            typingIndicator.style.display = 'none';
+            addMessage("Connection error. Please try again.", 'error');
+        }
+    }
+
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        sendMessage();
+    });
+});
+
+function minimizeChat() {
+    const chatBox = document.getElementById('chat-box');
+    const chatToggle = document.getElementById('chat-toggle');
+    
+    chatBox.style.display = 'none';
+    chatToggle.style.display = 'flex';
+}
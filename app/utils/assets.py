@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from flask import request, send_file, abort, url_for
+
+try:
+    import brotli
+except ImportError:  # ללא brotli - gzip בלבד
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def minify_css(text):
+    """מיניפיקציה שמרנית: הערות, רווחים מיותרים ו-; לפני }"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """
+    מיניפיקציה שמרנית לפי שורות: הזחה, שורות ריקות והערות בשורה מלאה.
+    שבירות השורה נשמרות, כך שאין תלות ב-ASI ואין צורך בפרסר JS.
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+class AssetPipeline:
+    """
+    קבצי CSS/JS של ה-layout וה-widget: מקור ב-static/css ו-static/js,
+    ובבנייה - מיניפיקציה, שם לפי hash של התוכן ודחיסה מראש ל-gzip/brotli
+    בתיקיית static/dist עם manifest.json.
+
+    הקבצים הבנויים מוגשים מ-/assets/ עם Cache-Control immutable ובקידוד
+    שהדפדפן תומך בו. בלי build - asset_url מחזיר את קובץ המקור.
+    """
+
+    SOURCES = ('css/base.css', 'css/chat_widget.css', 'js/base.js', 'js/chat_widget.js')
+    MINIFIERS = {'.css': minify_css, '.js': minify_js}
+    MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # לפי סדר העדפה
+    CACHE_MAX_AGE = 365 * 24 * 3600
+
+    def __init__(self):
+        self.static_dir = None
+        self.dist_dir = None
+        self._manifest = {}
+        self._files = {}
+
+    def init_app(self, app):
+        self.static_dir = app.static_folder
+        self.dist_dir = os.path.join(app.static_folder, 'dist')
+        self._load_manifest()
+        if app.config.get('ASSETS_AUTO_BUILD', True) and self.stale():
+            try:
+                self.build()
+            except OSError:
+                logger.exception('asset build failed, serving source files')
+        app.add_url_rule('/assets/<path:filename>', 'assets', self.send)
+        app.add_template_global(self.asset_url, 'asset_url')
+        app.extensions['assets'] = self
+
+    # ----- בנייה -----
+    def stale(self):
+        """האם קובץ מקור כלשהו השתנה מאז הבנייה האחרונה"""
+        for source in self.SOURCES:
+            built = self._manifest.get(source)
+            if built is None or self._source_hash(source) != built['hash']:
+                return True
+        return False
+
+    def _source_hash(self, source):
+        with open(os.path.join(self.static_dir, source), 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def build(self):
+        """בונה את כל הקבצים ומחזיר דוח: מקור -> גדלים בבתים"""
+        os.makedirs(self.dist_dir, exist_ok=True)
+        manifest, report = {}, {}
+        for source in self.SOURCES:
+            with open(os.path.join(self.static_dir, source), 'rb') as f:
+                raw = f.read()
+            name, ext = os.path.splitext(os.path.basename(source))
+            minified = self.MINIFIERS[ext](raw.decode('utf-8')).encode('utf-8')
+            filename = f'{name}.{hashlib.sha1(minified).hexdigest()[:10]}.min{ext}'
+
+            outputs = {'': minified, '.gz': gzip.compress(minified, 9, mtime=0)}
+            if brotli:
+                outputs['.br'] = brotli.compress(minified, quality=11)
+            for suffix, content in outputs.items():
+                self._write(os.path.join(self.dist_dir, filename + suffix), content)
+
+            manifest[source] = {'file': filename, 'hash': hashlib.sha1(raw).hexdigest(),
+                                'encodings': [encoding for encoding, suffix in self.ENCODINGS if suffix in outputs]}
+            report[source] = {'source': len(raw), **{s[1:] or 'minified': len(c) for s, c in outputs.items()}}
+
+        self._write(os.path.join(self.dist_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode('utf-8'))
+        self._remove_old(manifest)
+        self._set_manifest(manifest)
+        return report
+
+    @staticmethod
+    def _write(path, content):
+        # כתיבה לקובץ זמני והחלפה - workers אחרים לא יראו קובץ חלקי
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _remove_old(self, manifest):
+        current = {entry['file'] for entry in manifest.values()}
+        for filename in os.listdir(self.dist_dir):
+            base = re.sub(r'\.(gz|br)$', '', filename)
+            if base != 'manifest.json' and base not in current and not filename.endswith('.tmp'):
+                os.remove(os.path.join(self.dist_dir, filename))
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.dist_dir, 'manifest.json'), encoding='utf-8') as f:
+                self._set_manifest(json.load(f))
+        except (OSError, ValueError):
+            self._set_manifest({})
+
+    def _set_manifest(self, manifest):
+        self._manifest = manifest
+        self._files = {entry['file']: entry['encodings'] for entry in manifest.values()}
+
+    # ----- הגשה -----
+    def asset_url(self, source):
+        entry = self._manifest.get(source)
+        if entry is None:
+            return url_for('static', filename=source)
+        return url_for('assets', filename=entry['file'])
+
+    def send(self, filename):
+        encodings = self._files.get(filename)
+        if encodings is None:
+            abort(404)
+        encoding, suffix = next(((name, suffix) for name, suffix in self.ENCODINGS
+                                 if name in encodings and name in request.accept_encodings), (None, ''))
+        response = send_file(os.path.join(self.dist_dir, filename + suffix),
+                             mimetype=self.MIMETYPES[os.path.splitext(filename)[1]],
+                             etag=filename + suffix, conditional=True, max_age=self.CACHE_MAX_AGE)
+        if encoding:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+class ResponseCompressor:
+    """
+    דחיסת תשובות דינמיות (HTML / JSON) לפי Accept-Encoding - brotli אם זמין,
+    אחרת gzip. תשובות זורמות (SSE), קבצים ותשובות קטנות לא נדחסות.
+    """
+
+    TYPES = ('text/html', 'application/json', 'text/css', 'text/javascript', 'text/csv', 'text/plain')
+
+    def __init__(self, min_bytes=500, gzip_level=6, brotli_quality=4):
+        self.enabled = True
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_RESPONSES', self.enabled)
+        self.min_bytes = app.config.get('COMPRESS_MIN_BYTES', self.min_bytes)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        app.after_request(self.compress)
+        app.extensions['response_compressor'] = self
+
+    def compress(self, response):
+        if not self.enabled or response.direct_passthrough or response.is_streamed \
+                or response.status_code != 200 or response.content_encoding \
+                or response.mimetype not in self.TYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        if brotli and 'br' in request.accept_encodings:
+            encoding = 'br'
+        elif 'gzip' in request.accept_encodings:
+            encoding = 'gzip'
+        else:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_bytes:
+            return response
+        if encoding == 'br':
+            data = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            data = gzip.compress(data, self.gzip_level)
+        response.set_data(data)
+        response.content_encoding = encoding
+        # אותו ETag לשני קידודים שונים - חייב להיות weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+# מופעים גלובליים לתהליך
+assets = AssetPipeline()
+response_compressor = ResponseCompressor()
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """מונים של pool אחד: זמן המתנה ל-checkout, חיבורים בשימוש, timeouts ובדיקות חיבור"""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self.waits = deque(maxlen=window)  # ms, כולל פתיחת חיבור חדש כשצריך
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self.pings = 0
+        self.stale = 0
+
+    def record_checkout(self, seconds, in_use):
+        with self._lock:
+            self.waits.append(seconds * 1000)
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            waits = sorted(self.waits)
+            checkouts, timeouts, peak = self.checkouts, self.timeouts, self.peak_in_use
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p / 100))], 3) if waits else 0.0
+
+        return {
+            'size': pool.size(),
+            'in_use': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'peak_in_use': peak,
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_ms': {'p50': pct(50), 'p95': pct(95), 'p99': pct(99), 'max': round(waits[-1], 3) if waits else 0.0},
+            'idle_pings': self.pings,
+            'stale_connections': self.stale,
+        }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool שמודד כמה זמן כל checkout חיכה לחיבור"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # dispose / invalidate יוצרים pool חדש - המונים ממשיכים
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class DbPool:
+    """
+    הגדרות מאגר החיבורים לכל engine (primary ו-replica) ומדדים ל-/admin/db-pool.
+
+    במקום pool_pre_ping (round trip לשרת בכל checkout) נבדק ב-SELECT 1 רק חיבור
+    שעמד פנוי יותר מ-DB_POOL_PING_IDLE שניות. חיבור שנכשל בבדיקה נזרק וה-pool
+    פותח חדש במקומו, כך שהבקשה לא נכשלת על חיבור שהשרת כבר סגר.
+    """
+
+    def __init__(self):
+        self._engines = {}
+        self.ping_idle = 60
+
+    def engine_options(self, config, url=None):
+        """אפשרויות create_engine לפי app.config (לפני db.init_app)"""
+        options = {
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 280),
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+        }
+        url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            return options  # SQLite בזיכרון - StaticPool, אין גודל מאגר
+        options.update(
+            poolclass=MeteredQueuePool,
+            pool_size=config.get('DB_POOL_SIZE', 5),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 10),
+            # LIFO - החיבורים החמים חוזרים לשימוש והעודפים מתיישנים ונסגרים ב-recycle
+            pool_use_lifo=True,
+        )
+        return options
+
+    def init_app(self, app, db):
+        self.ping_idle = app.config.get('DB_POOL_PING_IDLE', self.ping_idle)
+        with app.app_context():
+            self._engines = {key or 'primary': engine for key, engine in db.engines.items()}
+        for engine in self._engines.values():
+            stats = getattr(engine.pool, 'stats', None)
+            if stats is not None:
+                stats.waits = deque(maxlen=app.config.get('DB_POOL_STATS_WINDOW', 1000))
+                if self.ping_idle and not app.config.get('DB_POOL_PRE_PING'):
+                    self._listen_idle_ping(engine, stats)
+        app.extensions['db_pool'] = self
+
+    def _listen_idle_ping(self, engine, stats):
+        def on_checkin(dbapi_connection, record):
+            record.info['idle_since'] = time.monotonic()
+
+        def on_checkout(dbapi_connection, record, proxy):
+            idle_since = record.info.pop('idle_since', None)
+            if idle_since is None or time.monotonic() - idle_since < self.ping_idle:
+                return
+            stats.pings += 1
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchall()
+                cursor.close()
+            except Exception as e:
+                stats.stale += 1
+                # ה-pool מחליף את החיבור ומנסה שוב
+                raise exc.DisconnectionError(f'idle connection check failed: {e}') from e
+
+        event.listen(engine, 'checkin', on_checkin)
+        event.listen(engine, 'checkout', on_checkout)
+
+    def stats(self):
+        result = {}
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            stats = getattr(pool, 'stats', None)
+            result[name] = stats.snapshot(pool) if stats is not None else {'status': pool.status()}
+        return result
+
+
+# מופע גלובלי לתהליך
+db_pool = DbPool()
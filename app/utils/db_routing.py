@@ -0,0 +1,137 @@
+import functools
+import time
+from contextvars import ContextVar
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND = 'replica'
+PRIMARY_COOKIE = 'db_primary_until'
+_WRITE_VERBS = ('insert', 'update', 'delete', 'merge')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_read(fn):
+    """
+    פונקציית שירות לקריאה בלבד: השאילתות שהיא מריצה הולכות לעותק הקריאה
+    (כשהוגדר DB_REPLICA_URL). טעינות עצלות אחרי החזרה מהפונקציה - ל-primary.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+def _pinned_to_primary():
+    """
+    הדפדפן כתב לאחרונה - קורא מה-primary כדי לראות את הכתיבה שלו (replication lag).
+    עוגייה נפרדת ולא ה-session של Flask, שקריאה ממנו מוסיפה Vary: Cookie לכל תשובה.
+    """
+    if not has_request_context():
+        return False
+    if g.get('db_wrote', False):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _is_write(statement):
+    """INSERT / UPDATE / DELETE - ORM, Core או טקסט"""
+    if getattr(statement, 'is_dml', False):
+        return True
+    if isinstance(statement, TextClause):
+        statement = statement.text
+    if isinstance(statement, str):
+        words = statement.split(None, 1)
+        return bool(words) and words[0].lower() in _WRITE_VERBS
+    return False
+
+
+def _mark_request_write():
+    if has_request_context():
+        g.db_wrote = True
+
+
+class RoutingSession(Session):
+    """
+    session שמפנה שאילתות בתוך replica_read ל-bind 'replica'. כתיבות, flush
+    וכל קריאה אחרי כתיבה באותה session נשארים ב-primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replica_reads.get() and not self.info.get('wrote'):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None and not _pinned_to_primary():
+                return replica
+        return super().get_bind(mapper, clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _mark_write(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        session.info['wrote'] = True
+        _mark_request_write()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_execute_write(orm_execute_state):
+    # db.session.execute(update(...)) / text('UPDATE ...') - לא עוברים דרך flush
+    if _is_write(orm_execute_state.statement):
+        orm_execute_state.session.info['wrote'] = True
+        _mark_request_write()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # כתיבות ישירות על connection (engine.begin(), exec_driver_sql) - בלי session
+    if _is_write(statement):
+        _mark_request_write()
+
+
+class ReplicaRouter:
+    """
+    רישום עותק הקריאה כ-bind ונעיצה ל-primary אחרי כתיבה: בקשה שכתבה למסד
+    מחזירה עוגייה שלפיה הבקשות של אותו דפדפן ב-DB_REPLICA_STICKY_SECONDS הבאות
+    יקראו מה-primary (למשל הדשבורד מיד אחרי השכרה).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sticky_seconds = 5
+        self._engine_hooked = False
+
+    def configure(self, app, engine_options):
+        """לפני db.init_app - מוסיף את bind ה-replica ל-SQLALCHEMY_BINDS"""
+        url = app.config.get('DB_REPLICA_URL')
+        self.enabled = bool(url)
+        if self.enabled:
+            binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+            binds[REPLICA_BIND] = {'url': url, **engine_options(app.config, url)}
+            app.config['SQLALCHEMY_BINDS'] = binds
+
+    def init_app(self, app):
+        self.sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        if self.enabled:
+            if not self._engine_hooked:
+                event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+                self._engine_hooked = True
+            app.after_request(self._pin_after_write)
+        app.extensions['db_router'] = self
+
+    def _pin_after_write(self, response):
+        if g.get('db_wrote') and self.sticky_seconds:
+            response.set_cookie(PRIMARY_COOKIE, str(int(time.time() + self.sticky_seconds) + 1),
+                                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+
+# מופע גלובלי לתהליך
+db_router = ReplicaRouter()
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """
+    מטמון קטעי HTML מרונדרים, עם פינוי LRU לפי מספר רשומות ונפח בבתים.
+    המפתח כולל את מוני הגרסה שהקטע תלוי בהם, ולכן אין צורך במחיקה יזומה:
+    אחרי שינוי נוצר מפתח חדש והישן נדחק החוצה.
+    """
+
+    def __init__(self, max_entries=5000, max_bytes=32 * 1024 * 1024):
+        self.enabled = True
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', self.enabled)
+        self.max_entries = app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', self.max_entries)
+        self.max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', self.max_bytes)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.extensions['fragment_cache'] = self
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = len(value) + len(key)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = value
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        value = self._entries.pop(key)
+        self._bytes -= len(value) + len(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'name', key1, key2, ... %} ... {% endcache %}
+    הגוף מרונדר רק בהחטאה; בפגיעה מוחזר ה-HTML השמור כמו שהוא.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(parts)]), [], [], body) \
+            .set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        cache = self.environment.fragment_cache
+        if not cache.enabled:
+            return caller()
+        key = '|'.join(str(part) for part in parts)
+        value = cache.get(key)
+        if value is None:
+            value = Markup(caller())
+            cache.put(key, value)
+        return value
+
+
+class LazySequence:
+    """
+    רשימה שנטענת רק כשהתבנית ניגשת אליה. נתונים שמוצגים רק בתוך בלוק
+    {% cache %} לא נשלפים מהמסד כשהבלוק נענה מהמטמון.
+    """
+
+    __slots__ = ('_loader', '_items')
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._items = None
+
+    def _load(self):
+        if self._items is None:
+            self._items = list(self._loader())
+        return self._items
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __bool__(self):
+        return bool(self._load())
+
+
+# מופע גלובלי לתהליך
+fragment_cache = FragmentCache()
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import has_request_context, request, url_for
+
+logger = logging.getLogger(__name__)
+
+
+class ImageValidationError(ValueError):
+    """הקובץ שהועלה אינו תמונה תקינה או חורג מהמגבלות"""
+
+
+class ProfileImagePipeline:
+    """
+    עיבוד תמונות פרופיל: הבקשה רק בודקת את הכותרת של הקובץ (פורמט ומידות),
+    והפענוח, החיתוך לריבוע, ההקטנה לגדלים קבועים וקידוד ל-WebP ול-PNG
+    מבוצעים ב-thread pool ברקע.
+
+    הקבצים נשמרים בשם user_<id>-<size>-<hash>.<ext> לפי hash של התוכן, ולכן
+    מוגשים עם Cache-Control ארוך ו-immutable. קובץ user_<id>.json מצביע על
+    ה-hash הנוכחי של כל משתמש.
+    """
+
+    SIZES = {'sm': 96, 'md': 160, 'lg': 320}
+    ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'BMP'}
+    HASHED_NAME = re.compile(r'^profile_images/user_\d+-[a-z]+-[0-9a-f]{12}\.(webp|png)$')
+    CACHE_MAX_AGE = 365 * 24 * 3600
+
+    def __init__(self, max_bytes=10 * 1024 * 1024, max_pixels=40_000_000, workers=2, webp_quality=80):
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.workers = workers
+        self.webp_quality = webp_quality
+        self.image_dir = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._manifests = {}
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get('PROFILE_IMAGE_MAX_BYTES', self.max_bytes)
+        self.max_pixels = app.config.get('PROFILE_IMAGE_MAX_PIXELS', self.max_pixels)
+        self.workers = app.config.get('PROFILE_IMAGE_WORKERS', self.workers)
+        self.image_dir = os.path.join(app.static_folder, 'profile_images')
+        os.makedirs(self.image_dir, exist_ok=True)
+        app.add_template_global(self.avatar_url, 'avatar_url')
+        app.after_request(self._cache_headers)
+        app.extensions['profile_images'] = self
+
+    # ----- צד הבקשה -----
+    def validate(self, data):
+        """בדיקה זולה: קריאת כותרת הקובץ בלבד, בלי פענוח הפיקסלים"""
+        from PIL import Image, UnidentifiedImageError  # טעינה עצלה - רק בהעלאה, לא בעליית ה-worker
+        if len(data) > self.max_bytes:
+            raise ImageValidationError(f'הקובץ גדול מדי (מקסימום {self.max_bytes // (1024 * 1024)}MB)')
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.format not in self.ALLOWED_FORMATS:
+                    raise ImageValidationError('פורמט התמונה אינו נתמך')
+                width, height = image.size
+                image.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+            raise ImageValidationError('הקובץ אינו תמונה תקינה')
+        if width * height > self.max_pixels:
+            raise ImageValidationError('מידות התמונה גדולות מדי')
+
+    def submit(self, user_id, file_storage):
+        """בודק את הקובץ ומעביר את העיבוד ל-pool. זורק ImageValidationError"""
+        data = file_storage.read(self.max_bytes + 1)
+        self.validate(data)
+        future = self._pool().submit(self.process, user_id, data)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _pool(self):
+        # נוצר בשימוש הראשון בכל תהליך - בטוח ל-fork של gunicorn
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='profile-images')
+        return self._executor
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.error('profile image processing failed', exc_info=future.exception())
+
+    # ----- עיבוד ברקע -----
+    def render(self, data):
+        """מחזיר {(size, ext): bytes} לכל הגדלים והפורמטים"""
+        from PIL import Image, ImageOps
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft('RGB', (max(self.SIZES.values()) * 2,) * 2)  # JPEG: פענוח מוקטן מראש
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            side = min(image.size)
+            image = ImageOps.fit(image, (side, side))
+
+        outputs = {}
+        for name, size in self.SIZES.items():
+            resized = image.resize((size, size), Image.LANCZOS, reducing_gap=3.0) if side > size else image
+            webp = io.BytesIO()
+            resized.save(webp, 'WEBP', quality=self.webp_quality, method=4)
+            png = io.BytesIO()
+            resized.save(png, 'PNG', optimize=True)
+            outputs[(name, 'webp')] = webp.getvalue()
+            outputs[(name, 'png')] = png.getvalue()
+        return outputs
+
+    def process(self, user_id, data):
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        for (size, ext), content in self.render(data).items():
+            self._write(f'user_{user_id}-{size}-{digest}.{ext}', content)
+        previous = self._read_manifest(user_id)
+        self._write(f'user_{user_id}.json', json.dumps({'hash': digest}).encode())
+
+        # ניקוי הגרסאות הקודמות והקובץ הישן שנשמר כמו שהוא
+        stale = [f'user_{user_id}.png']
+        if previous and previous != digest:
+            stale += [f'user_{user_id}-{size}-{previous}.{ext}' for size in self.SIZES for ext in ('webp', 'png')]
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.image_dir, name))
+            except FileNotFoundError:
+                pass
+        return digest
+
+    def _write(self, name, content):
+        path = os.path.join(self.image_dir, name)
+        tmp_path = os.path.join(self.image_dir, f'.{name}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    # ----- הגשה -----
+    def _read_manifest(self, user_id):
+        """ה-hash הנוכחי של המשתמש; נקרא מחדש רק כשהקובץ השתנה (stat אחד)"""
+        path = os.path.join(self.image_dir, f'user_{user_id}.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._manifests.get(user_id)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, encoding='utf-8') as f:
+                digest = json.load(f)['hash']
+        except (OSError, ValueError, KeyError):
+            return None
+        self._manifests[user_id] = (mtime, digest)
+        return digest
+
+    def avatar_url(self, user_id, size='md'):
+        digest = self._read_manifest(user_id)
+        if digest is None:
+            # משתמשים שהעלו לפני הצינור (או בלי תמונה - ה-onerror בתבנית מציג ברירת מחדל)
+            return url_for('static', filename=f'profile_images/user_{user_id}.png')
+        ext = 'webp' if has_request_context() and request.accept_mimetypes['image/webp'] else 'png'
+        return url_for('static', filename=f'profile_images/user_{user_id}-{size}-{digest}.{ext}')
+
+    def _cache_headers(self, response):
+        if request.endpoint == 'static' and response.status_code == 200 and \
+                self.HASHED_NAME.match(request.view_args.get('filename', '')):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = self.CACHE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+
+# מופע גלובלי לתהליך
+profile_images = ProfileImagePipeline()
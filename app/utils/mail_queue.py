@@ -0,0 +1,225 @@
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    תור מיילים יוצאים: הבקשה רק כותבת את ההודעה לתיקיית spool וחוזרת מיד,
+    ו-thread רקע שולח אותן במנות דרך חיבור SMTP אחד מאומת שנשמר פתוח.
+
+    כל הודעה היא קובץ <not_before>-<attempts>-<uuid>.eml. התיקייה משותפת
+    לכל ה-workers; קובץ נתפס ע"י rename אטומי, כך שכל הודעה נשלחת פעם אחת.
+    כישלון מחזיר את הקובץ לתור עם backoff מעריכי, ואחרי MAIL_QUEUE_MAX_ATTEMPTS
+    ניסיונות הוא עובר לתיקיית failed.
+
+    ה-worker מופעל ב-init_app (MAIL_QUEUE_AUTOSTART), כך שהודעות שנשארו בתור
+    נשלחות גם לפני המייל הבא, ומופעל מחדש בתהליך הבן אחרי fork (gunicorn --preload).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._smtp = None
+        self._smtp_used_at = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.autostart = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        config = app.config
+        self.server = config.get('MAIL_SERVER', 'localhost')
+        self.port = config.get('MAIL_PORT', 25)
+        self.use_tls = config.get('MAIL_USE_TLS', False)
+        self.use_ssl = config.get('MAIL_USE_SSL', False)
+        self.username = config.get('MAIL_USERNAME')
+        self.password = config.get('MAIL_PASSWORD')
+        self.default_sender = config.get('MAIL_DEFAULT_SENDER') or self.username
+        self.spool_dir = config.get('MAIL_QUEUE_DIR') or os.path.join(app.instance_path, 'mail_queue')
+        self.batch_size = config.get('MAIL_QUEUE_BATCH_SIZE', 20)
+        self.max_attempts = config.get('MAIL_QUEUE_MAX_ATTEMPTS', 5)
+        self.backoff = config.get('MAIL_QUEUE_BACKOFF', 30)
+        self.poll_interval = config.get('MAIL_QUEUE_POLL_INTERVAL', 5)
+        self.idle_timeout = config.get('MAIL_SMTP_IDLE_TIMEOUT', 60)
+        self.smtp_timeout = config.get('MAIL_SMTP_TIMEOUT', 30)
+        # כל הודעה במנה יכולה לחכות לכמה פעולות SMTP (התחברות, STARTTLS, login,
+        # שליחה ושוב התחברות ושליחה) - הודעה שנתפסה נחשבת נטושה רק אחרי פי 2 מזה
+        self.stale_after = config.get('MAIL_QUEUE_STALE_AFTER') or \
+            2 * 5 * self.batch_size * self.smtp_timeout
+        self.autostart = config.get('MAIL_QUEUE_AUTOSTART', True)
+        os.makedirs(os.path.join(self.spool_dir, 'failed'), exist_ok=True)
+        app.extensions['mail_queue'] = self
+        if self.autostart:
+            self.start()
+
+    # ----- צד הבקשה -----
+    def send(self, to, subject, body, sender=None):
+        """מכניס מייל לתור וחוזר מיד"""
+        msg = EmailMessage()
+        msg['From'] = sender or self.default_sender
+        msg['To'] = to if isinstance(to, str) else ', '.join(to)
+        msg['Subject'] = subject
+        msg.set_content(body)
+        self._write(msg.as_bytes(policy=policy.SMTP), not_before=0, attempts=0)
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def _write(self, data, not_before, attempts, name=None):
+        name = name or uuid.uuid4().hex
+        tmp_path = os.path.join(self.spool_dir, f'.{name}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(self.spool_dir, f'{int(not_before)}-{attempts}-{name}.eml'))
+
+    def _ensure_worker(self):
+        # thread אחד לכל תהליך - אחרי fork נוצר מחדש
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+                self._thread.start()
+
+    def start(self):
+        """מפעיל את ה-worker גם בלי מייל חדש (לשליחת הודעות שנשארו בתור)"""
+        self._ensure_worker()
+
+    def _after_fork(self):
+        # ה-thread וחיבור ה-SMTP של תהליך האב לא עוברים ל-fork
+        self._lock = threading.Lock()
+        self._smtp = None
+        if self._thread is not None and self.autostart:
+            self._thread = None
+            self.start()
+
+    # ----- thread הרקע -----
+    def _recover_stale(self, max_age=None):
+        # הודעות שנתפסו ע"י תהליך שנפל באמצע שליחה חוזרות לתור עם מספר הניסיונות שלהן
+        max_age = self.stale_after if max_age is None else max_age
+        now = time.time()
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            if name.endswith('.sending') and now - os.path.getmtime(path) > max_age:
+                attempts, _, msg_id = name[1:-len('.sending')].rpartition('-')
+                try:
+                    os.rename(path, os.path.join(self.spool_dir, f'0-{attempts or 0}-{msg_id}.eml'))
+                except OSError:
+                    pass
+
+    def _run(self):
+        self._recover_stale()
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                while self.flush() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception('mail queue worker error')
+            if self._smtp and time.monotonic() - self._smtp_used_at > self.idle_timeout:
+                self._close()
+
+    def _due(self):
+        now = time.time()
+        due = []
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.endswith('.eml'):
+                continue
+            not_before, attempts, rest = name.split('-', 2)
+            if int(not_before) <= now:
+                due.append((name, int(attempts), rest[:-len('.eml')]))
+            if len(due) >= self.batch_size:
+                break
+        return due
+
+    def flush(self):
+        """שולח מנה אחת של הודעות שהגיע זמנן; מחזיר כמה נתפסו"""
+        batch = []
+        for name, attempts, msg_id in self._due():
+            claimed = os.path.join(self.spool_dir, f'.{attempts}-{msg_id}.sending')
+            try:
+                os.rename(os.path.join(self.spool_dir, name), claimed)
+            except OSError:
+                continue  # worker אחר תפס את ההודעה
+            os.utime(claimed)
+            batch.append((claimed, attempts, msg_id))
+
+        for claimed, attempts, msg_id in batch:
+            with open(claimed, 'rb') as f:
+                data = f.read()
+            try:
+                self._deliver(message_from_bytes(data, policy=policy.SMTP))
+            except Exception as e:
+                self._close()
+                self._retry(claimed, data, attempts + 1, msg_id, e)
+            else:
+                os.remove(claimed)
+                self.sent += 1
+        return len(batch)
+
+    def _retry(self, claimed, data, attempts, msg_id, error):
+        if attempts >= self.max_attempts:
+            os.replace(claimed, os.path.join(self.spool_dir, 'failed', f'{msg_id}.eml'))
+            self.failed += 1
+            logger.error(f'mail {msg_id} failed after {attempts} attempts: {error}')
+            return
+        delay = self.backoff * 2 ** (attempts - 1)
+        logger.warning(f'mail {msg_id} attempt {attempts} failed ({error}), retry in {delay}s')
+        self._write(data, time.time() + delay, attempts, name=msg_id)
+        os.remove(claimed)
+
+    # ----- חיבור SMTP -----
+    def _connect(self):
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.server, self.port, timeout=self.smtp_timeout)
+        else:
+            smtp = smtplib.SMTP(self.server, self.port, timeout=self.smtp_timeout)
+            if self.use_tls:
+                smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _deliver(self, msg):
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # השרת סגר חיבור שהיה פתוח - התחברות מחדש וניסיון אחד נוסף
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+        self._smtp_used_at = time.monotonic()
+
+    def _close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def stats(self):
+        pending = [name for name in os.listdir(self.spool_dir) if name.endswith('.eml')]
+        return {
+            'pending': len(pending),
+            'failed_total': len(os.listdir(os.path.join(self.spool_dir, 'failed'))),
+            'sent': self.sent,
+            'failed': self.failed,
+        }
+
+
+# מופע גלובלי לתהליך
+mail_queue = MailQueue()
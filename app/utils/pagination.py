@@ -0,0 +1,122 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from sqlalchemy import and_, or_, false
+
+# גודל עמוד ברירת מחדל לרשימות האדמין
+PER_PAGE = 50
+
+# עמוד תוצאות: הפריטים, הסמן לעמוד הבא (או None אם זה העמוד האחרון)
+Page = namedtuple('Page', ['items', 'next_cursor', 'cursor'])
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, raw):
+    if raw is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(row, columns):
+    """
+    בונה סמן מערכי עמודות המיון של השורה האחרונה בעמוד: רשימת JSON
+    ב-base64 בטוח ל-URL, כך שכל תו בערך (גם '|') וגם NULL נשמרים
+    """
+    values = [_encode_value(getattr(row, column.key)) for column in columns]
+    raw = json.dumps(values, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """מפענח סמן לערכי עמודות; סמן לא תקין מחזיר None (חזרה לעמוד הראשון)"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        parts = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(parts, list) or len(parts) != len(columns):
+        return None
+    try:
+        return [_decode_value(column, raw) for column, raw in zip(columns, parts)]
+    except (ValueError, TypeError):
+        return None
+
+
+def _nullable(column):
+    return getattr(getattr(column, 'expression', column), 'nullable', False)
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _beyond(column, value, descending):
+    """שורות שבאות אחרי value בעמודה אחת, כולל טיפול ב-NULL"""
+    if not _nullable(column):
+        return column < value if descending else column > value
+    if descending:
+        return or_(column < value, column.is_(None))
+    return column.isnot(None) if value is None else column > value
+
+
+def _after(columns, values, descending):
+    """
+    תנאי keyset: (a, b) > (x, y) בפירוק ל-OR/AND,
+    כי SQL Server לא תומך בהשוואת tuple
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        if descending and values[i] is None and _nullable(column):
+            continue  # אחרי NULL בסדר יורד אין ערכים נוספים בעמודה הזאת
+        equal = [_equal(columns[j], values[j]) for j in range(i)]
+        clauses.append(and_(*equal, _beyond(column, values[i], descending)))
+    return or_(*clauses) if clauses else false()
+
+
+def _order_by(columns, descending, dialect):
+    """
+    NULL נחשב קטן מכל ערך: קודם בסדר עולה ואחרון בסדר יורד. כך ממיינים
+    SQL Server ו-SQLite בעצמם (והאינדקס נשאר שמיש); ב-Postgres זה מפורש.
+    """
+    order = []
+    for column in columns:
+        key = column.desc() if descending else column.asc()
+        if dialect == 'postgresql' and _nullable(column):
+            key = key.nulls_last() if descending else key.nulls_first()
+        order.append(key)
+    return order
+
+
+def keyset_paginate(query, columns, cursor=None, descending=False, per_page=PER_PAGE):
+    """
+    מחזיר עמוד אחד מתוך query לפי סמן (keyset) במקום OFFSET,
+    כך שעלות כל עמוד קבועה ללא תלות בגודל הטבלה.
+    העמודה האחרונה ב-columns חייבת להיות ייחודית (בדרך כלל המפתח הראשי).
+    """
+    values = decode_cursor(cursor, columns)
+    if values is not None:
+        query = query.filter(_after(columns, values, descending))
+
+    dialect = query.session.get_bind().dialect.name
+    rows = query.order_by(*_order_by(columns, descending, dialect)).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1], columns)
+
+    return Page(items=rows, next_cursor=next_cursor, cursor=cursor if values is not None else None)
@@ -0,0 +1,194 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from flask import g, has_app_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('cinemate.perf')
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _RequestStats:
+    __slots__ = ('start', 'queries', 'db_time', 'template_time', 'template_start', 'statements')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_start = None
+        self.statements = Counter()
+
+
+class RequestProfiler:
+    """
+    מדידה לכל בקשה: מספר שאילתות SQL, זמן מסד כולל, שאילתות כפולות
+    (אותו statement יותר מפעם אחת - סימן ל-N+1) וזמן רינדור תבניות.
+
+    התוצאות נשלחות בכותרת Server-Timing, נרשמות ללוג כ-JSON (בקשות ושאילתות
+    איטיות תמיד, כל הבקשות אם PERF_LOG_ALL), ומצטברות לכל endpoint בחלון
+    של הבקשות האחרונות עבור /admin/perf. הנתונים לכל תהליך בנפרד.
+    """
+
+    def __init__(self, window=1000, slow_request_ms=500, slow_query_ms=200, log_all=False):
+        self.window = window
+        self.slow_request_ms = slow_request_ms
+        self.slow_query_ms = slow_query_ms
+        self.log_all = log_all
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.slow_queries = deque(maxlen=50)
+        self._engine_hooked = False
+
+    def init_app(self, app):
+        self.window = app.config.get('PERF_WINDOW', self.window)
+        self.slow_request_ms = app.config.get('PERF_SLOW_REQUEST_MS', self.slow_request_ms)
+        self.slow_query_ms = app.config.get('PERF_SLOW_QUERY_MS', self.slow_query_ms)
+        self.log_all = app.config.get('PERF_LOG_ALL', self.log_all)
+        if not app.config.get('PERF_ENABLED', True):
+            return
+
+        if not self._engine_hooked:
+            # ברמת המחלקה Engine - כולל engines נוספים (binds)
+            event.listen(Engine, 'before_cursor_execute', self._before_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_execute)
+            self._engine_hooked = True
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions['perf'] = self
+
+    # ----- hooks -----
+    @staticmethod
+    def _current():
+        return g.get('_perf') if has_app_context() else None
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_perf_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_perf_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = self._current()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            stats.statements[statement] += 1
+        if elapsed * 1000 >= self.slow_query_ms:
+            entry = {
+                'ms': round(elapsed * 1000, 1),
+                'endpoint': request.endpoint if stats is not None else None,
+                'statement': ' '.join(statement.split())[:500],
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            self.slow_queries.append(entry)
+            logger.warning(json.dumps({'event': 'slow_query', **entry}, ensure_ascii=False))
+
+    def _before_render(self, app, template, context, **extra):
+        stats = self._current()
+        if stats is not None:
+            stats.template_start = time.perf_counter()
+
+    def _after_render(self, app, template, context, **extra):
+        stats = self._current()
+        if stats is not None and stats.template_start is not None:
+            stats.template_time += time.perf_counter() - stats.template_start
+            stats.template_start = None
+
+    def _start(self):
+        g._perf = _RequestStats()
+
+    def _finish(self, response):
+        stats = g.pop('_perf', None)
+        if stats is not None:
+            self._report(stats, request.endpoint or 'unknown', request.method, response.status_code,
+                         response.headers)
+        return response
+
+    def detach(self):
+        """
+        מוציא את מדידת הבקשה מ-g לפני process_response, כשגוף התשובה נשלח
+        אחרי סוף הבקשה (/chat במצב ASGI). נסגרת ב-complete.
+        """
+        return g.pop('_perf', None) if has_app_context() else None
+
+    def complete(self, stats, endpoint, method, status, headers=None):
+        """סוגר מדידה שנותקה ב-detach אחרי שכל התשובה נשלחה; Server-Timing רק אם הכותרות עוד לא נשלחו"""
+        if stats is not None:
+            self._report(stats, endpoint, method, status, headers)
+
+    def _report(self, stats, endpoint, method, status, headers=None):
+        total = time.perf_counter() - stats.start
+        duplicates = sum(n - 1 for n in stats.statements.values() if n > 1)
+
+        if headers is not None:
+            headers.add('Server-Timing', f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"')
+            headers.add('Server-Timing', f'tpl;dur={stats.template_time * 1000:.1f}')
+            headers.add('Server-Timing', f'app;dur={total * 1000:.1f}')
+
+        if endpoint != 'static':
+            self._record(endpoint, total, stats.db_time, stats.queries, duplicates, stats.template_time)
+
+        if self.log_all or total * 1000 >= self.slow_request_ms or duplicates:
+            record = {
+                'event': 'request',
+                'endpoint': endpoint,
+                'method': method,
+                'status': status,
+                'ms': round(total * 1000, 1),
+                'db_ms': round(stats.db_time * 1000, 1),
+                'queries': stats.queries,
+                'duplicates': duplicates,
+                'template_ms': round(stats.template_time * 1000, 1),
+            }
+            if duplicates:
+                statement, count = stats.statements.most_common(1)[0]
+                record['top_duplicate'] = {'count': count, 'statement': ' '.join(statement.split())[:200]}
+            level = logging.WARNING if total * 1000 >= self.slow_request_ms else logging.INFO
+            logger.log(level, json.dumps(record, ensure_ascii=False))
+
+    # ----- צבירה -----
+    def _record(self, endpoint, total, db_time, queries, duplicates, template_time):
+        with self._lock:
+            samples = self._endpoints.get(endpoint)
+            if samples is None:
+                samples = self._endpoints[endpoint] = deque(maxlen=self.window)
+            samples.append((total, db_time, queries, duplicates, template_time))
+
+    def summary(self):
+        """אחוזונים לכל endpoint על חלון הבקשות האחרונות, הכבד ביותר (p95) קודם"""
+        with self._lock:
+            snapshot = {endpoint: list(samples) for endpoint, samples in self._endpoints.items()}
+        rows = []
+        for endpoint, samples in snapshot.items():
+            durations = sorted(s[0] * 1000 for s in samples)
+            n = len(samples)
+            rows.append({
+                'endpoint': endpoint,
+                'count': n,
+                'p50_ms': round(percentile(durations, 50), 1),
+                'p95_ms': round(percentile(durations, 95), 1),
+                'p99_ms': round(percentile(durations, 99), 1),
+                'avg_db_ms': round(sum(s[1] for s in samples) * 1000 / n, 1),
+                'avg_queries': round(sum(s[2] for s in samples) / n, 1),
+                'max_duplicates': max(s[3] for s in samples),
+                'avg_template_ms': round(sum(s[4] for s in samples) * 1000 / n, 1),
+            })
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows
+
+
+# מופע גלובלי לתהליך
+profiler = RequestProfiler()
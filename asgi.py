@@ -0,0 +1,4 @@
+from app.asgi import create_asgi_app
+
+# uvicorn asgi:app --workers 2   (או: gunicorn -k uvicorn.workers.UvicornWorker asgi:app)
+app = create_asgi_app()
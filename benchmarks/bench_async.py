@@ -0,0 +1,139 @@
+"""
+עומס על /chat מול מודל איטי: אותה אפליקציה פעם תחת gunicorn עם sync workers
+(Procfile) ופעם במצב ASGI (uvicorn asgi:app), עם אותו מספר תהליכים.
+המודל המזויף ממתין CHATBOT_FAKE_DELAY שניות לכל מילה, כך שכל תשובה לוקחת
+בערך שנייה. בזמן העומס נמדד גם זמן התגובה של עמוד רגיל (/faq).
+
+    python benchmarks/bench_async.py
+    python benchmarks/bench_async.py --concurrency 100 --duration 15 --workers 2 --delay 0.1
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_routes import make_app  # noqa: E402
+
+SERVERS = {
+    'sync (gunicorn)': lambda port, workers: [sys.executable, '-m', 'gunicorn', '-w', str(workers),
+                                              '-b', f'127.0.0.1:{port}', 'run:app'],
+    'asgi (uvicorn)': lambda port, workers: [sys.executable, '-m', 'uvicorn', '--workers', str(workers),
+                                             '--host', '127.0.0.1', '--port', str(port),
+                                             '--log-level', 'warning', 'asgi:app'],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+async def wait_ready(client, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get('/faq')).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+async def load(base_url, concurrency, duration, stream):
+    import httpx
+    limits = httpx.Limits(max_connections=concurrency + 10, max_keepalive_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await wait_ready(client)
+        counter = itertools.count()
+        chat_ms, page_ms, errors = [], [], 0
+        deadline = time.monotonic() + duration
+        headers = {'Accept': 'text/event-stream'} if stream else {}
+
+        async def chat_user():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                # שאלה שונה בכל בקשה - בלי פגיעות במטמון התשובות
+                start = time.perf_counter()
+                try:
+                    response = await client.post('/chat', json={'message': f'movie question {next(counter)}'},
+                                                 headers=headers)
+                    ok = response.status_code == 200 and 'CineMate' in response.text
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    chat_ms.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors += 1
+
+        async def page_user():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await client.get('/faq')
+                page_ms.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        await asyncio.gather(page_user(), *(chat_user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        'requests': len(chat_ms),
+        'errors': errors,
+        'rps': len(chat_ms) / elapsed,
+        'p50': statistics.median(chat_ms) if chat_ms else 0.0,
+        'p95': percentile(chat_ms, 95),
+        'page_p50': statistics.median(page_ms) if page_ms else 0.0,
+        'page_p95': percentile(page_ms, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--delay', type=float, default=0.1, help='השהיית המודל המזויף לכל מילה (שניות)')
+    parser.add_argument('--json', action='store_true', help='תשובת JSON במקום SSE')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='cinemate-async-')
+    db_url = f'sqlite:///{work_dir}/async.db'
+    make_app(db_url, '1k')
+    env = dict(os.environ, CINEMATE_DATABASE_URL=db_url, CHATBOT_BACKEND='fake',
+               CHATBOT_FAKE_DELAY=str(args.delay), MAIL_QUEUE_DIR=os.path.join(work_dir, 'mail_queue'),
+               PERF_LOG_ALL='0')
+
+    print(f'concurrency={args.concurrency} duration={args.duration}s workers={args.workers} '
+          f'delay={args.delay}s/word mode={"json" if args.json else "sse"}')
+    print(f"{'server':<18}{'requests':>9}{'errors':>8}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'/faq p50':>10}{'/faq p95':>10}")
+    for name, command in SERVERS.items():
+        port = free_port()
+        server = subprocess.Popen(command(port, args.workers), cwd=ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            row = asyncio.run(load(f'http://127.0.0.1:{port}', args.concurrency, args.duration, not args.json))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        print(f"{name:<18}{row['requests']:>9}{row['errors']:>8}{row['rps']:>8.1f}{row['p50']:>9.0f}"
+              f"{row['p95']:>9.0f}{row['page_p50']:>10.0f}{row['page_p95']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
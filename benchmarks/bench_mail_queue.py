@@ -0,0 +1,132 @@
+"""
+בנצ'מרק שליחת מיילים: חיבור SMTP חדש לכל מייל (השיטה הישנה) מול תור
+הרקע עם חיבור אחד שנשמר פתוח.
+
+מריץ שרת SMTP מקומי מינימלי (ללא רשת חיצונית). --handshake-delay מדמה את
+זמן ה-STARTTLS וה-login מול שרת מרוחק.
+
+    python benchmarks/bench_mail_queue.py --messages 200 --handshake-delay 0.3
+"""
+import argparse
+import os
+import smtplib
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.mail_queue import MailQueue  # noqa: E402
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """שרת SMTP מינימלי שמקבל כל הודעה וסופר אותה"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        time.sleep(self.server.handshake_delay)
+        self.reply('220 sink ready')
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b'.\r\n', b'.\n'):
+                    in_data = False
+                    with self.server.lock:
+                        self.server.received += 1
+                    self.reply('250 queued')
+                continue
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250 sink')
+            elif command.startswith('DATA'):
+                in_data = True
+                self.reply('354 end with .')
+            elif command.startswith('QUIT'):
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        super().__init__(('127.0.0.1', 0), SinkHandler)
+        self.handshake_delay = handshake_delay
+        self.received = 0
+        self.lock = threading.Lock()
+
+
+def make_message(i):
+    msg = EmailMessage()
+    msg['From'] = 'bench@cinemate.local'
+    msg['To'] = f'user{i}@cinemate.local'
+    msg['Subject'] = 'CineMate – שחזור סיסמה'
+    msg.set_content('שלום,\nזו הודעת בדיקה.\n')
+    return msg
+
+
+def bench_connection_per_message(port, n):
+    start = time.perf_counter()
+    for i in range(n):
+        server = smtplib.SMTP('127.0.0.1', port)
+        server.send_message(make_message(i))
+        server.quit()
+    return time.perf_counter() - start
+
+
+def bench_queue(port, n, spool_dir, sink):
+    queue = MailQueue()
+    queue.server, queue.port = '127.0.0.1', port
+    queue.use_tls = queue.use_ssl = False
+    queue.username = queue.password = None
+    queue.default_sender = 'bench@cinemate.local'
+    queue.spool_dir = spool_dir
+    queue.batch_size, queue.max_attempts, queue.backoff = 50, 3, 1
+    queue.poll_interval, queue.idle_timeout, queue.smtp_timeout = 0.05, 60, 10
+    os.makedirs(os.path.join(spool_dir, 'failed'), exist_ok=True)
+
+    before = sink.received
+    start = time.perf_counter()
+    for i in range(n):
+        queue.send(f'user{i}@cinemate.local', 'CineMate – שחזור סיסמה', 'שלום,\nזו הודעת בדיקה.\n')
+    enqueue_time = time.perf_counter() - start
+    while sink.received - before < n:
+        time.sleep(0.005)
+    return enqueue_time, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--handshake-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    sink = SinkServer(args.handshake_delay)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    port = sink.server_address[1]
+    n = args.messages
+
+    print(f'messages={n} handshake_delay={args.handshake_delay}s')
+    legacy = bench_connection_per_message(port, n)
+    print(f'connection per message: {legacy:8.2f} s total, {legacy / n * 1000:8.2f} ms in-request/msg, {n / legacy:8.1f} msg/s')
+
+    # התיקייה לא נמחקת: ה-thread של התור ממשיך לסרוק אותה עד סוף התהליך
+    enqueue, total = bench_queue(port, n, tempfile.mkdtemp(prefix='cinemate-mail-'), sink)
+    print(f'queue + pooled SMTP:    {total:8.2f} s total, {enqueue / n * 1000:8.2f} ms in-request/msg, {n / total:8.1f} msg/s')
+
+    sink.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+בתים לכל עמוד: כמה HTML ונכסים (CSS/JS מקומיים) יורדים בביקור ראשון ובביקור
+חוזר, כשהדפדפן שולח Accept-Encoding: gzip, br. נכסים עם כותרת immutable
+נחשבים שמורים בביקור החוזר.
+
+    python benchmarks/bench_page_bytes.py
+    python benchmarks/bench_page_bytes.py --save benchmarks/baselines/page-bytes.json
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_routes import bench_config  # noqa: E402
+from benchmarks.seed import ADMIN_EMAIL, PASSWORD, seed, user_email  # noqa: E402
+
+# שם, נתיב, מי מחובר
+PAGES = [
+    ('home', '/', None),
+    ('login', '/login', None),
+    ('faq', '/faq', None),
+    ('dashboard', '/dashboard', 'user'),
+    ('all_movies', '/all-movies', 'user'),
+    ('search', '/search?q=star', 'user'),
+    ('profile', '/profile', 'user'),
+    ('admin_rentals', '/admin/rentals', 'admin'),
+]
+
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="(/(?:static|assets)/[^"]+\.(?:css|js))"')
+HEADERS = {'Accept-Encoding': 'gzip, br'}
+
+
+def decode(response):
+    data = response.get_data()
+    if response.content_encoding == 'gzip':
+        return gzip.decompress(data)
+    if response.content_encoding == 'br':
+        import brotli
+        return brotli.decompress(data)
+    return data
+
+
+def measure(client, path):
+    """בתים ברשת: HTML, נכסים בביקור ראשון, ומה שנשאר בביקור חוזר (נכסים immutable שמורים)"""
+    response = client.get(path, headers=HEADERS)
+    html = decode(response)
+    wire = len(response.get_data())
+    first = repeat = 0
+    for url in sorted(set(ASSET_RE.findall(html.decode('utf-8')))):
+        asset = client.get(url, headers=HEADERS)
+        size = len(asset.get_data())
+        first += size
+        if 'immutable' not in asset.headers.get('Cache-Control', ''):
+            repeat += size
+        asset.close()
+    return {
+        'html_bytes': len(html),
+        'html_wire': wire,
+        'encoding': response.content_encoding or 'identity',
+        'assets_wire': first,
+        'first_visit': wire + first,
+        'repeat_visit': wire + repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save')
+    args = parser.parse_args()
+
+    os.environ.setdefault('CHATBOT_BACKEND', 'fake')
+    from app import create_app, db
+    work_dir = tempfile.mkdtemp(prefix='cinemate-bytes-')
+    app = create_app(bench_config(f'sqlite:///{work_dir}/bytes.db', work_dir))
+    with app.app_context():
+        db.create_all()
+        seed('1k')
+
+    results = {}
+    for name, path, who in PAGES:
+        client = app.test_client()
+        if who:
+            client.post('/login', data={'email': ADMIN_EMAIL if who == 'admin' else user_email(2),
+                                        'password': PASSWORD})
+        results[name] = measure(client, path)
+
+    print(f"{'page':<15}{'html':>9}{'wire':>9}{'encoding':>10}{'assets':>9}{'first':>9}{'repeat':>9}")
+    for name, row in results.items():
+        print(f"{name:<15}{row['html_bytes']:>9}{row['html_wire']:>9}{row['encoding']:>10}"
+              f"{row['assets_wire']:>9}{row['first_visit']:>9}{row['repeat_visit']:>9}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'saved to {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+בנצ'מרק עיבוד תמונות פרופיל: זמן עיבוד לכל העלאה (בדיקה בבקשה + הקטנה
+וקידוד ברקע) והבתים שמוגשים לכל אווטאר לעומת שמירת הקובץ המקורי כמו שהוא.
+
+התמונות סינתטיות (צילום טלפון מדומה: מעברי צבע + רעש) ולא נשמרות בדיסק.
+
+    python benchmarks/bench_profile_images.py --uploads 20 --workers 2
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.image_pipeline import ProfileImagePipeline  # noqa: E402
+
+PHOTO_SIZES = [(4032, 3024), (3000, 4000), (1920, 1080), (800, 800)]
+
+
+def make_photo(width, height, seed):
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = np.dstack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)]).astype(np.int16)
+    pixels += rng.integers(-25, 25, pixels.shape, dtype=np.int16)
+    buf = io.BytesIO()
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(buf, 'JPEG', quality=92)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    pipeline = ProfileImagePipeline()
+    print(f'uploads={args.uploads} workers={args.workers}')
+
+    for width, height in PHOTO_SIZES:
+        data = make_photo(width, height, seed=width)
+        start = time.perf_counter()
+        pipeline.validate(data)
+        validate_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        outputs = pipeline.render(data)
+        render_ms = (time.perf_counter() - start) * 1000
+        variants = ' '.join(f'{size}.{ext}={len(content) / 1024:.1f}KB'
+                            for (size, ext), content in sorted(outputs.items()))
+        print(f'{width}x{height}: original {len(data) / 1024:8.1f}KB | in-request validate {validate_ms:6.2f} ms'
+              f' | background render {render_ms:7.1f} ms | {variants}')
+
+    photos = [make_photo(*PHOTO_SIZES[i % len(PHOTO_SIZES)], seed=i) for i in range(args.uploads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as pool:
+        list(pool.map(pipeline.render, photos))
+    total = time.perf_counter() - start
+    print(f'pool throughput: {args.uploads / total:.1f} uploads/s ({total / args.uploads * 1000:.1f} ms/upload)')
+
+    original = sum(len(p) for p in photos) / len(photos)
+    sm_webp = sum(len(pipeline.render(p)[('sm', 'webp')]) for p in photos[:4]) / 4
+    print(f'bytes per avatar in lists: {original / 1024:.1f}KB (as uploaded) -> {sm_webp / 1024:.1f}KB (sm.webp)')
+
+
+if __name__ == '__main__':
+    main()
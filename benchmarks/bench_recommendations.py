@@ -0,0 +1,133 @@
+"""
+בנצ'מרק המלצות: לולאת התגיות המקורית מול האינדקס ההפוך ומנוע ה-item-item.
+
+הרצה (ללא מסד נתונים - נתונים סינתטיים):
+    python benchmarks/bench_recommendations.py --movies 10000 --rentals 1000000
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict, namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.recommendation_engine import ItemSimilarityEngine  # noqa: E402
+from app.services.tag_index import split_tags  # noqa: E402
+
+FakeMovie = namedtuple('FakeMovie', ['movie_id', 'tags'])
+
+TAGS = [f'tag{i}' for i in range(200)]
+
+
+def make_data(n_movies, n_rentals, n_users, seed=0):
+    rng = np.random.default_rng(seed)
+    movies = [
+        FakeMovie(movie_id, ','.join(rng.choice(TAGS, size=4, replace=False)))
+        for movie_id in range(1, n_movies + 1)
+    ]
+    # התפלגות זיפית - מעט סרטים פופולריים מאוד
+    popularity = 1.0 / np.arange(1, n_movies + 1)
+    popularity /= popularity.sum()
+    pairs = np.stack([
+        rng.integers(1, n_users + 1, size=n_rentals),
+        rng.choice(np.arange(1, n_movies + 1), size=n_rentals, p=popularity)
+    ], axis=1)
+    return movies, pairs
+
+
+def legacy_tag_loop(history, all_movies, limit=3):
+    """העתק של get_recommended_movies לפני האינדקס ההפוך"""
+    tag_counter = Counter()
+    for movie in history:
+        if movie.tags:
+            tag_counter.update(tag.strip() for tag in movie.tags.split(','))
+    rented_ids = {movie.movie_id for movie in history}
+    scores = []
+    for movie in all_movies:
+        if movie.movie_id in rented_ids or not movie.tags:
+            continue
+        movie_tags = [tag.strip() for tag in movie.tags.split(',')]
+        score = sum(tag_counter[tag] for tag in movie_tags if tag in tag_counter)
+        if score > 0:
+            scores.append((score, movie.movie_id, movie))
+    return [movie for _, _, movie in sorted(scores, reverse=True)][:limit]
+
+
+def build_postings(movies):
+    postings = defaultdict(set)
+    for movie in movies:
+        for tag in split_tags(movie.tags):
+            postings[tag].add(movie.movie_id)
+    return postings
+
+
+def indexed_tag_scores(history, postings, limit=3):
+    import heapq
+    tag_counter = Counter()
+    for movie in history:
+        tag_counter.update(split_tags(movie.tags))
+    rented_ids = {movie.movie_id for movie in history}
+    scores = defaultdict(int)
+    for tag, weight in tag_counter.items():
+        for movie_id in postings.get(tag, ()):
+            if movie_id not in rented_ids:
+                scores[movie_id] += weight
+    return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', type=int, default=10000)
+    parser.add_argument('--rentals', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f'movies={args.movies} rentals={args.rentals} users={args.users}')
+    movies, pairs = make_data(args.movies, args.rentals, args.users)
+    by_id = {movie.movie_id: movie for movie in movies}
+
+    user_history = defaultdict(list)
+    for user_id, movie_id in pairs[:200000]:
+        if len(user_history) >= args.queries and user_id not in user_history:
+            continue
+        user_history[int(user_id)].append(by_id[int(movie_id)])
+    sample = list(user_history.items())[:args.queries]
+
+    start = time.perf_counter()
+    postings = build_postings(movies)
+    print(f'tag index build:        {(time.perf_counter() - start) * 1000:10.1f} ms')
+
+    engine = ItemSimilarityEngine()
+    start = time.perf_counter()
+    engine.build_from_pairs(pairs, [movie.movie_id for movie in movies])
+    print(f'item-item build:        {(time.perf_counter() - start) * 1000:10.1f} ms')
+
+    legacy = timed(lambda: [legacy_tag_loop(history, movies) for _, history in sample], 1) / len(sample)
+    indexed = timed(lambda: [indexed_tag_scores(history, postings) for _, history in sample], 1) / len(sample)
+    item = timed(lambda: [engine.recommend(user_id) for user_id, _ in sample], 1) / len(sample)
+
+    print(f'legacy tag loop:        {legacy:10.3f} ms/user')
+    print(f'inverted tag index:     {indexed:10.3f} ms/user')
+    print(f'item-item engine:       {item:10.3f} ms/user')
+
+    rng = np.random.default_rng(1)
+    updates = 1000
+    start = time.perf_counter()
+    for _ in range(updates):
+        engine.add_rental(int(rng.integers(1, args.users + 1)), int(rng.integers(1, args.movies + 1)))
+    print(f'incremental add_rental: {(time.perf_counter() - start) / updates * 1000:10.3f} ms/rental')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+בנצ'מרק ועומס על ה-routes החמים: /dashboard, /all-movies, /admin/rentals, /chat, /login.
+
+האפליקציה נבנית דרך create_app מול מסד מקומי (SQLite כברירת מחדל, או כל
+URL של SQLAlchemy), ממולאת בנתונים סינתטיים (benchmarks/seed.py) ונמדדת
+בשני מצבים:
+  client - Flask test client בתהליך אחד (latency נקי, בלי רשת)
+  http   - שרת werkzeug מקומי ומחולל עומס מרובה תהליכים (requests)
+
+לכל route: throughput, p50/p99 ומספר השאילתות (מכותרת Server-Timing).
+--save-baseline שומר את התוצאות, --compare משווה לקובץ שמור ומחזיר קוד 1
+אם p50 או מספר השאילתות עלו מעבר ל-tolerance.
+
+    python benchmarks/bench_routes.py --scale 100k --mode client --iterations 50
+    python benchmarks/bench_routes.py --scale 1k --mode http --processes 4 --duration 10
+    python benchmarks/bench_routes.py --scale 1k --compare benchmarks/baselines/sqlite-1k-client.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.seed import SCALES, ADMIN_EMAIL, PASSWORD, seed, user_email  # noqa: E402
+
+# שם, method, נתיב, מי מחובר
+ROUTES = [
+    ('dashboard', 'GET', '/dashboard', 'user'),
+    ('all_movies', 'GET', '/all-movies', 'user'),
+    ('admin_rentals', 'GET', '/admin/rentals', 'admin'),
+    ('chat', 'POST', '/chat', 'user'),
+    ('login', 'POST', '/login', None),
+]
+
+CHAT_QUESTIONS = [
+    'What comedies do you have?', 'Recommend a space movie', 'Any good heist movies?',
+    'Which movies are about love?', 'Something for kids this weekend', 'Best war movies',
+    'Do you have detective stories?', 'A scary movie with zombies', 'Movies about music', 'Pirates!',
+]
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+def bench_config(db_url, work_dir):
+    """הגדרות לבנצ'מרק: מסד מקומי, מטמונים מקומיים ותיקיות זמניות"""
+    return {
+        'SQLALCHEMY_DATABASE_URI': db_url,
+        'CATALOG_VERSION_BACKEND': 'local',
+        'USER_VERSION_BACKEND': 'local',
+        'RENTAL_VERSION_BACKEND': 'local',
+        'SUBMISSIONS_COUNT_BACKEND': 'local',
+        'RETRIEVER_INDEX_DIR': os.path.join(work_dir, 'retriever'),
+        'MAIL_QUEUE_DIR': os.path.join(work_dir, 'mail_queue'),
+        'POSTER_CACHE_DIR': os.path.join(work_dir, 'posters'),
+    }
+
+
+def make_app(db_url, scale, reseed=False):
+    os.environ.setdefault('CHATBOT_BACKEND', 'fake')
+    os.environ.setdefault('CHATBOT_FAKE_DELAY', '0')
+    from app import create_app, db
+    from app.models import User
+
+    app = create_app(bench_config(db_url, tempfile.mkdtemp(prefix='cinemate-bench-')))
+    with app.app_context():
+        db.create_all()
+        if reseed or User.query.count() == 0:
+            db.drop_all()
+            db.create_all()
+            start = time.perf_counter()
+            sizes = seed(scale)
+            print(f'seeded {sizes} in {time.perf_counter() - start:.1f}s')
+    return app
+
+
+def request_kwargs(route, i, user):
+    name, method, path, _ = route
+    if name == 'chat':
+        return {'json': {'message': CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]}}
+    if name == 'login':
+        return {'data': {'email': user, 'password': PASSWORD}}
+    return {}
+
+
+def credentials(route, worker, n_users):
+    return ADMIN_EMAIL if route[3] == 'admin' else user_email(2 + worker % n_users)
+
+
+def queries_from(headers):
+    return sum(int(n) for n in QUERIES_RE.findall(headers.get('Server-Timing', '')))
+
+
+# ----- מצב client -----
+def run_client(app, iterations, n_users):
+    results = {}
+    for route in ROUTES:
+        name, method, path, who = route
+        client = app.test_client()
+        user = credentials(route, 0, n_users)
+        if who:
+            client.post('/login', data={'email': user, 'password': PASSWORD})
+        for i in range(3):  # חימום - מטמונים ואינדקסים
+            client.open(path, method=method, **request_kwargs(route, i, user))
+        samples = []
+        start = time.perf_counter()
+        for i in range(iterations):
+            t = time.perf_counter()
+            response = client.open(path, method=method, **request_kwargs(route, i, user))
+            samples.append((time.perf_counter() - t, queries_from(response.headers), response.status_code < 400))
+        results[name] = summarize(samples, time.perf_counter() - start)
+    return results
+
+
+# ----- מצב http -----
+def serve(app):
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def http_worker(job):
+    import requests
+    base, route_index, worker, duration, n_users = job
+    route = ROUTES[route_index]
+    name, method, path, who = route
+    session = requests.Session()
+    user = credentials(route, worker, n_users)
+    if who:
+        session.post(base + '/login', data={'email': user, 'password': PASSWORD})
+    samples = []
+    deadline = time.perf_counter() + duration
+    i = worker
+    while time.perf_counter() < deadline:
+        t = time.perf_counter()
+        response = session.request(method, base + path, allow_redirects=False, **request_kwargs(route, i, user))
+        samples.append((time.perf_counter() - t, queries_from(response.headers), response.status_code < 400))
+        i += 1
+    return samples
+
+
+def run_http(app, processes, duration, n_users):
+    server, base = serve(app)
+    results = {}
+    with multiprocessing.get_context('spawn').Pool(processes) as pool:
+        for index, route in enumerate(ROUTES):
+            start = time.perf_counter()
+            jobs = [(base, index, worker, duration, n_users) for worker in range(processes)]
+            samples = [sample for chunk in pool.map(http_worker, jobs) for sample in chunk]
+            results[route[0]] = summarize(samples, time.perf_counter() - start)
+    server.shutdown()
+    return results
+
+
+# ----- דוח וקווי בסיס -----
+def summarize(samples, elapsed):
+    latencies = sorted(s[0] * 1000 for s in samples)
+    n = len(latencies)
+
+    def pct(p):
+        return round(latencies[min(n - 1, int(round(p / 100 * (n - 1))))], 2) if n else 0.0
+
+    return {
+        'requests': n,
+        'errors': sum(1 for s in samples if not s[2]),
+        'throughput_rps': round(n / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': pct(50),
+        'p99_ms': pct(99),
+        'avg_queries': round(sum(s[1] for s in samples) / n, 2) if n else 0.0,
+    }
+
+
+def print_report(results):
+    print(f"{'route':<15}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for name, row in results.items():
+        print(f"{name:<15}{row['requests']:>9}{row['errors']:>8}{row['throughput_rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p99_ms']:>9}{row['avg_queries']:>9}")
+
+
+def compare(results, baseline, tolerance):
+    """מחזיר רשימת רגרסיות: p50 איטי ביותר מ-tolerance, או יותר שאילתות"""
+    regressions = []
+    for name, row in results.items():
+        base = baseline['routes'].get(name)
+        if base is None:
+            continue
+        if row['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']} -> {row['p50_ms']} ms")
+        if row['avg_queries'] > base['avg_queries']:
+            regressions.append(f"{name}: queries {base['avg_queries']} -> {row['avg_queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=None, help='SQLAlchemy URL (ברירת מחדל: SQLite זמני לכל scale)')
+    parser.add_argument('--scale', choices=SCALES, default='1k')
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--mode', choices=['client', 'http'], default='client')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0, help='שניות לכל route במצב http')
+    parser.add_argument('--save-baseline')
+    parser.add_argument('--compare')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    db_url = args.db or f'sqlite:///{tempfile.gettempdir()}/cinemate-bench-{args.scale}.db'
+    from app import config
+    if db_url == config.DATABASE_URL:
+        parser.error('refusing to benchmark against the production database')
+
+    app = make_app(db_url, args.scale, args.reseed)
+    n_users = SCALES[args.scale][0]
+    print(f'db={db_url} scale={args.scale} mode={args.mode}')
+    if args.mode == 'client':
+        results = run_client(app, args.iterations, n_users)
+    else:
+        results = run_http(app, args.processes, args.duration, n_users)
+    print_report(results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {'db': db_url.split(':')[0], 'scale': args.scale, 'mode': args.mode,
+                         'python': platform.python_version(), 'machine': platform.machine(),
+                         'created': time.strftime('%Y-%m-%d')},
+                'routes': results,
+            }, f, indent=2)
+        print(f'baseline saved to {args.save_baseline}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print('REGRESSION', line)
+        if regressions:
+            sys.exit(1)
+        print('no regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+זמן עלייה של worker: import app, create_app ובקשה ראשונה, כל מדידה
+בתהליך Python חדש (cold boot), ועוד דוח `python -X importtime` של
+החבילות הכבדות ביותר. בודק שמודולים כבדים (numpy, scipy, PIL, requests,
+langchain) לא נטענים בעלייה, ושהחציון נשאר בתוך התקציב - אחרת קוד יציאה 1.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget-ms 1200 --top 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_routes import bench_config  # noqa: E402
+
+FORBIDDEN = ('numpy', 'scipy', 'PIL', 'requests', 'langchain_core', 'langchain_community', 'langchain_ollama',
+             'ollama')
+
+CHILD = '''
+import json, sys, time
+config = json.loads(sys.argv[1])
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app(config)
+t2 = time.perf_counter()
+application.test_client().get('/health')
+t3 = time.perf_counter()
+from app.services.ai_service import chatbot_service
+while chatbot_service.state == 'warming' and time.perf_counter() - t3 < 10:
+    time.sleep(0.01)
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t3 - t2) * 1000,
+    'boot_ms': (t2 - t0) * 1000,
+    'chatbot': chatbot_service.health(),
+    'modules': sorted(name for name in sys.modules if '.' not in name),
+}))
+'''
+
+
+def run_child(config, importtime=False):
+    env = dict(os.environ, CHATBOT_BACKEND=os.environ.get('CHATBOT_BACKEND', 'fake'))
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD, json.dumps(config)]
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_report(stderr, top):
+    """חבילות לפי סכום זמן ה-self של כל המודולים שלהן (sqlalchemy, numpy, ...)"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        if not own.strip().isdigit():
+            continue  # שורת הכותרת
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(own)
+    return sorted(packages.items(), key=lambda item: -item[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help='תקציב לחציון של import + create_app')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='cinemate-startup-')
+    config = bench_config(f'sqlite:///{work_dir}/startup.db', work_dir)
+
+    runs = [run_child(config)[0] for _ in range(args.runs)]
+    _, stderr = run_child(config, importtime=True)
+
+    print(f'runs={args.runs} python={sys.version.split()[0]}')
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'boot_ms'):
+        values = [run[key] for run in runs]
+        print(f'{key:<18} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}')
+    print(f"chatbot warmup     {runs[-1]['chatbot']}")
+
+    print(f'\ntop {args.top} packages (self ms, -X importtime):')
+    for name, micros in import_report(stderr, args.top):
+        print(f'  {name:<30}{micros / 1000:8.1f}')
+
+    failures = []
+    loaded = sorted(set(FORBIDDEN) & set(runs[-1]['modules']))
+    if loaded:
+        failures.append(f'heavy modules imported at boot: {", ".join(loaded)}')
+    boot = statistics.median(run['boot_ms'] for run in runs)
+    if boot > args.budget_ms:
+        failures.append(f'boot median {boot:.1f} ms exceeds budget {args.budget_ms:.0f} ms')
+    for failure in failures:
+        print('FAIL', failure)
+    if failures:
+        sys.exit(1)
+    print(f'\nOK boot median {boot:.1f} ms <= {args.budget_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+נתונים סינתטיים לבנצ'מרקים: משתמשים, סרטים, השכרות ופניות בכמה סדרי גודל.
+ההכנסה ב-bulk insert במנות, כך ש-1M השכרות נטענות בדקות ולא בשעות.
+
+    CINEMATE_DATABASE_URL=sqlite:////tmp/cinemate-bench.db python benchmarks/seed.py --scale 100k
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {
+    # שם: (משתמשים, סרטים, השכרות, פניות)
+    '1k': (200, 500, 1_000, 100),
+    '100k': (5_000, 5_000, 100_000, 2_000),
+    '1m': (50_000, 20_000, 1_000_000, 10_000),
+}
+
+GENRES = ['Action', 'Drama', 'Comedy', 'Horror', 'Sci-Fi', 'Romance', 'Animation', 'Thriller']
+TAGS = ['action', 'drama', 'comedy', 'family', 'kids', 'war', 'space', 'love', 'crime', 'music',
+        'history', 'sport', 'magic', 'robots', 'heist', 'zombies', 'pirates', 'detective']
+WORDS = ['star', 'night', 'city', 'dark', 'last', 'love', 'road', 'king', 'dream', 'fire',
+         'ocean', 'ghost', 'storm', 'garden', 'summer', 'winter', 'secret', 'empire']
+
+ADMIN_EMAIL = 'admin@bench.local'
+PASSWORD = 'bench'
+BATCH = 5_000
+
+
+def user_email(i):
+    return f'user{i}@bench.local'
+
+
+def _insert(model, rows):
+    from app import db
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(insert(model), rows[start:start + BATCH])
+    db.session.commit()
+
+
+def seed(scale='1k', seed=0):
+    """ממלא את המסד של האפליקציה הנוכחית (בתוך app context). מחזיר את הגדלים"""
+    from app.models import User, Movie, Rental, ContactSubmission
+    n_users, n_movies, n_rentals, n_submissions = SCALES[scale]
+    rng = np.random.default_rng(seed)
+
+    _insert(User, [{'user_id': 1, 'email': ADMIN_EMAIL, 'password': PASSWORD, 'type': 'admin',
+                    'first_name': 'Admin', 'last_name': 'Bench'}] +
+            [{'user_id': i, 'email': user_email(i), 'password': PASSWORD, 'type': 'user',
+              'first_name': f'User{i}', 'last_name': 'Bench'} for i in range(2, n_users + 2)])
+
+    _insert(Movie, [{
+        'movie_id': i,
+        'title': f'{WORDS[i % len(WORDS)].title()} {WORDS[(i * 7) % len(WORDS)].title()} {i}',
+        'genre': GENRES[i % len(GENRES)],
+        'year': 1970 + i % 55,
+        'poster_url': 'movies/default.jpg',
+        'description': ' '.join(rng.choice(WORDS, size=12)),
+        'tags': ','.join(rng.choice(TAGS, size=3, replace=False)),
+    } for i in range(1, n_movies + 1)])
+
+    # פופולריות זיפית - מעט סרטים מושכרים הרבה
+    popularity = 1.0 / np.arange(1, n_movies + 1)
+    popularity /= popularity.sum()
+    user_ids = rng.integers(2, n_users + 2, size=n_rentals)
+    movie_ids = rng.choice(np.arange(1, n_movies + 1), size=n_rentals, p=popularity)
+    days = rng.integers(0, 730, size=n_rentals)
+    start = datetime.date(2023, 1, 1)
+    _insert(Rental, [{'user_id': int(u), 'movie_id': int(m), 'rent_date': start + datetime.timedelta(days=int(d))}
+                     for u, m, d in zip(user_ids, movie_ids, days)])
+
+    now = datetime.datetime(2025, 1, 1)
+    _insert(ContactSubmission, [{
+        'name': f'User{i}', 'email': user_email(i), 'message': 'שאלה על השכרה',
+        'timestamp': now - datetime.timedelta(hours=i), 'is_new': i % 3 == 0, 'response_sent': i % 3 == 2,
+    } for i in range(n_submissions)])
+
+    return {'users': n_users + 1, 'movies': n_movies, 'rentals': n_rentals, 'submissions': n_submissions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='1k')
+    parser.add_argument('--db', default=os.environ.get('CINEMATE_DATABASE_URL', 'sqlite:////tmp/cinemate-bench.db'))
+    args = parser.parse_args()
+
+    from app import config
+    if args.db == config.DATABASE_URL:
+        parser.error('refusing to drop and reseed the production database')
+
+    from app import create_app, db
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.db})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        sizes = seed(args.scale)
+        print(f'seeded {sizes} into {args.db} in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""baseline schema
+
+Revision ID: 1a0c5e7b2d10
+Revises: 
+Create Date: 2026-10-18 10:00:00
+
+הטבלאות כפי שהיו לפני המיגרציות. במסד קיים (שנוצר ידנית / ב-create_all)
+הטבלאות כבר קיימות ולכן מדולגות, כך ש-flask db upgrade בטוח בשני המקרים.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a0c5e7b2d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'Users' not in existing:
+        op.create_table(
+            'Users',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('password', sa.String(length=100), nullable=False),
+            sa.Column('type', sa.String(length=10), nullable=False),
+            sa.Column('first_name', sa.String(length=50), nullable=False),
+            sa.Column('last_name', sa.String(length=50), nullable=False),
+            sa.PrimaryKeyConstraint('user_id'),
+            sa.UniqueConstraint('email'),
+        )
+    if 'Movies' not in existing:
+        op.create_table(
+            'Movies',
+            sa.Column('movie_id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=100), nullable=False),
+            sa.Column('genre', sa.String(length=50), nullable=True),
+            sa.Column('year', sa.Integer(), nullable=True),
+            sa.Column('poster_url', sa.String(length=255), nullable=True),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('tags', sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint('movie_id'),
+        )
+    if 'contact_submissions' not in existing:
+        op.create_table(
+            'contact_submissions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=False),
+            sa.Column('is_new', sa.Boolean(), nullable=False),
+            sa.Column('response_sent', sa.Boolean(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if 'Rentals' not in existing:
+        op.create_table(
+            'Rentals',
+            sa.Column('rental_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('movie_id', sa.Integer(), nullable=True),
+            sa.Column('rent_date', sa.Date(), nullable=True),
+            sa.ForeignKeyConstraint(['movie_id'], ['Movies.movie_id']),
+            sa.ForeignKeyConstraint(['user_id'], ['Users.user_id']),
+            sa.PrimaryKeyConstraint('rental_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('Rentals')
+    op.drop_table('contact_submissions')
+    op.drop_table('Movies')
+    op.drop_table('Users')
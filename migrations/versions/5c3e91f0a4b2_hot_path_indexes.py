@@ -0,0 +1,46 @@
+"""indexes for the hot lookup paths
+
+Revision ID: 5c3e91f0a4b2
+Revises: 1a0c5e7b2d10
+Create Date: 2026-10-18 10:30:00
+
+Rentals: (user_id, movie_id) כולל rent_date - השכרות של משתמש וה-NOT EXISTS
+של הסרטים הזמינים; movie_id לבד; (rent_date, rental_id) למיון האדמין.
+contact_submissions: (is_new, timestamp, id) למונה ולסינון, (timestamp, id) לרשימה.
+Movies: (genre, year), year, (title, movie_id).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c3e91f0a4b2'
+down_revision = '1a0c5e7b2d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_rentals_user_movie', 'Rentals', ['user_id', 'movie_id'],
+                    mssql_include=['rent_date'], postgresql_include=['rent_date'])
+    op.create_index('ix_rentals_movie', 'Rentals', ['movie_id'])
+    op.create_index('ix_rentals_rent_date', 'Rentals', ['rent_date', 'rental_id'])
+
+    op.create_index('ix_submissions_is_new_timestamp', 'contact_submissions', ['is_new', 'timestamp', 'id'])
+    op.create_index('ix_submissions_timestamp', 'contact_submissions', ['timestamp', 'id'])
+
+    op.create_index('ix_movies_genre_year', 'Movies', ['genre', 'year'])
+    op.create_index('ix_movies_year', 'Movies', ['year'])
+    op.create_index('ix_movies_title', 'Movies', ['title', 'movie_id'])
+
+
+def downgrade():
+    op.drop_index('ix_movies_title', table_name='Movies')
+    op.drop_index('ix_movies_year', table_name='Movies')
+    op.drop_index('ix_movies_genre_year', table_name='Movies')
+
+    op.drop_index('ix_submissions_timestamp', table_name='contact_submissions')
+    op.drop_index('ix_submissions_is_new_timestamp', table_name='contact_submissions')
+
+    op.drop_index('ix_rentals_rent_date', table_name='Rentals')
+    op.drop_index('ix_rentals_movie', table_name='Rentals')
+    op.drop_index('ix_rentals_user_movie', table_name='Rentals')
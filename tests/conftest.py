@@ -0,0 +1,120 @@
+import datetime
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('CHATBOT_BACKEND', 'fake')
+os.environ.setdefault('CHATBOT_FAKE_DELAY', '0')
+os.environ.setdefault('CHATBOT_WARMUP', '0')
+
+from app import create_app, db  # noqa: E402
+
+PASSWORD = 'secret'
+ADMIN_EMAIL = 'admin@test.local'
+
+
+def user_email(i):
+    return f'user{i}@test.local'
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    work_dir = tmp_path_factory.mktemp('cinemate')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{work_dir}/test.db',
+        'CATALOG_VERSION_BACKEND': 'local',
+        'USER_VERSION_BACKEND': 'local',
+        'RENTAL_VERSION_BACKEND': 'local',
+        'SUBMISSIONS_COUNT_BACKEND': 'local',
+        'RETRIEVER_INDEX_DIR': os.path.join(work_dir, 'retriever'),
+        'MAIL_QUEUE_DIR': os.path.join(work_dir, 'mail_queue'),
+        'MAIL_QUEUE_AUTOSTART': False,
+        'POSTER_CACHE_DIR': os.path.join(work_dir, 'posters'),
+        'ASSETS_AUTO_BUILD': False,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_rows(n_users=3, n_movies=6):
+    """מנהל, משתמשים וסרטים בסיסיים. מחזיר את מזהי הסרטים"""
+    from app.models import User, Movie
+    db.session.add(User(user_id=1, email=ADMIN_EMAIL, password=PASSWORD, type='admin',
+                        first_name='Admin', last_name='Test'))
+    for i in range(2, n_users + 2):
+        db.session.add(User(user_id=i, email=user_email(i), password=PASSWORD, type='user',
+                            first_name=f'User{i}', last_name='Test'))
+    genres = ['Action', 'Drama', 'Comedy']
+    for i in range(1, n_movies + 1):
+        db.session.add(Movie(movie_id=i, title=f'Movie {i}', genre=genres[i % 3], year=2000 + i,
+                             description=f'description {i}', tags='action,space' if i % 2 else 'drama,love'))
+    db.session.commit()
+    return list(range(1, n_movies + 1))
+
+
+def add_rental(user_id, movie_id, days=0):
+    from app.models import Rental
+    rental = Rental(user_id=user_id, movie_id=movie_id, rent_date=datetime.date(2024, 1, 1) + datetime.timedelta(days))
+    db.session.add(rental)
+    db.session.commit()
+    return rental
+
+
+@contextmanager
+def count_statements():
+    """רשימת פקודות ה-SQL שנשלחו למסד בתוך הבלוק"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+
+@pytest.fixture
+def seeded(app):
+    """מסד נקי עם נתוני בסיס, ומטמונים שלא זוכרים את הבדיקה הקודמת"""
+    from app.services.catalog_cache import catalog_cache
+    from app.services.rental_version import rental_version
+    from app.services.user_cache import user_cache
+    from app.services.recommendation_engine import item_engine
+    from app.services.chat_cache import response_cache
+    from app.utils.fragment_cache import fragment_cache
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        seed_rows()
+        catalog_cache.bump()
+        rental_version.bump()
+        user_cache.invalidate()
+        fragment_cache.clear()
+        item_engine.invalidate()
+        response_cache.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+def login(client, email):
+    response = client.post('/login', data={'email': email, 'password': PASSWORD})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def admin_client(seeded):
+    return login(seeded.test_client(), ADMIN_EMAIL)
+
+
+@pytest.fixture
+def user_client(seeded):
+    return login(seeded.test_client(), user_email(2))
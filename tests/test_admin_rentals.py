@@ -0,0 +1,48 @@
+from app import db
+from app.services.rental_service import get_all_rentals_with_details, get_rentals_page
+from tests.conftest import add_rental, count_statements
+
+
+def add_rentals(count):
+    for i in range(count):
+        add_rental(2 + i % 3, 1 + i % 6, days=i)
+
+
+def test_rentals_with_details_statement_count_is_constant(seeded):
+    with seeded.app_context():
+        add_rentals(3)
+        db.session.expunge_all()
+        with count_statements() as small:
+            rows = get_all_rentals_with_details()
+        assert len(rows) == 3
+
+        add_rentals(30)
+        db.session.expunge_all()
+        with count_statements() as large:
+            rows = get_all_rentals_with_details()
+        assert len(rows) == 33
+        assert rows[0].user_name and rows[0].movie_title
+        assert len(large) == len(small) == 1
+
+
+def test_rentals_page_statement_count_is_constant(seeded):
+    with seeded.app_context():
+        add_rentals(3)
+        db.session.expunge_all()
+        with count_statements() as small:
+            get_rentals_page(search='user')
+        add_rentals(40)
+        db.session.expunge_all()
+        with count_statements() as large:
+            page = get_rentals_page(search='user')
+        assert len(page.items) > 3
+        assert len(large) == len(small)
+
+
+def test_admin_dashboard_does_not_load_rentals(admin_client, seeded):
+    with seeded.app_context():
+        add_rentals(5)
+        with count_statements() as statements:
+            assert admin_client.get('/admin/dashboard').status_code == 200
+            assert admin_client.get('/dashboard').status_code == 200
+    assert not [s for s in statements if 'Rentals' in s]
@@ -0,0 +1,60 @@
+from tests.conftest import count_statements, login, user_email
+
+
+def test_requires_login(seeded):
+    response = seeded.test_client().get('/api/v1/movies')
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Authentication required'}
+
+
+def test_movies_fields_and_cursor(user_client):
+    response = user_client.get('/api/v1/movies?fields=movie_id,title&limit=4')
+    data = response.get_json()
+    assert [set(item) for item in data['items']] == [{'movie_id', 'title'}] * 4
+
+    data = user_client.get(f"/api/v1/movies?fields=movie_id,title&limit=4&cursor={data['next_cursor']}").get_json()
+    assert [item['movie_id'] for item in data['items']] == [5, 6]
+    assert data['next_cursor'] is None
+
+    assert user_client.get('/api/v1/movies?fields=title,nope').status_code == 400
+
+
+def test_matching_etag_returns_304_without_queries(seeded, user_client):
+    response = user_client.get('/api/v1/movies')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/') and response.status_code == 200
+    assert 'no-cache' in response.headers['Cache-Control'] and 'private' in response.headers['Cache-Control']
+
+    user_client.get('/faq')  # load_user במטמון
+    with seeded.app_context(), count_statements() as statements:
+        response = user_client.get('/api/v1/movies', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    assert statements == []
+
+    # ETag שונה למשתמש אחר ולפרמטרים אחרים
+    other = login(seeded.test_client(), user_email(3))
+    assert other.get('/api/v1/movies', headers={'If-None-Match': etag}).status_code == 200
+    assert user_client.get('/api/v1/movies?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_write_changes_etag(seeded, user_client):
+    response = user_client.get('/api/v1/rentals')
+    etag = response.headers['ETag']
+    assert response.get_json()['items'] == []
+
+    assert user_client.post('/rent/3').status_code == 302
+
+    response = user_client.get('/api/v1/rentals', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+    assert [item['movie_id'] for item in response.get_json()['items']] == [3]
+
+
+def test_catalog_change_invalidates_movie_etag(seeded, user_client, admin_client):
+    etag = user_client.get('/api/v1/movies/2').headers['ETag']
+    admin_client.post('/admin/movies/edit/2', data={
+        'title': 'Changed', 'year': '2002', 'genre': 'Drama', 'description': '', 'tags': 'drama',
+    })
+    response = user_client.get('/api/v1/movies/2', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Changed'
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.asgi import AsgiApp
+from app.services.ai_service import chatbot_service
+from app.utils.perf import profiler
+
+DELAY = 0.02
+
+
+@pytest.fixture
+def slow_bot(seeded, monkeypatch):
+    monkeypatch.setattr(chatbot_service.get().llm, 'delay', DELAY)
+    monkeypatch.setattr(profiler, '_endpoints', {})
+    return len(chatbot_service.get().llm.reply.split(' ')) * DELAY * 1000
+
+
+def asgi_request(app, method, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=AsgiApp(app))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(run())
+
+
+def chat_ms():
+    return {row['endpoint']: row for row in profiler.summary()}['main.chat']['p50_ms']
+
+
+def test_chat_json_timing_covers_answer(seeded, slow_bot):
+    response = asgi_request(seeded, 'POST', '/chat', json={'message': 'json timing question'})
+    assert response.status_code == 200
+    assert 'CineMate' in response.json()['response']
+    app_ms = [float(v.split('dur=')[1]) for v in response.headers.get_list('server-timing') if v.startswith('app;')]
+    assert app_ms and app_ms[0] >= slow_bot
+    assert chat_ms() >= slow_bot
+
+
+def test_chat_stream_recorded_after_body(seeded, slow_bot):
+    response = asgi_request(seeded, 'POST', '/chat', json={'message': 'stream timing question'},
+                            headers={'Accept': 'text/event-stream'})
+    assert response.status_code == 200
+    assert 'event: done' in response.text
+    # הכותרות נשלחו לפני הטוקנים - אין בהן זמן שמתאר רק את תחילת הבקשה
+    assert not response.headers.get_list('server-timing')
+    assert chat_ms() >= slow_bot
+
+
+def test_healthz_without_database(seeded):
+    response = asgi_request(seeded, 'GET', '/healthz')
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ok'
+
+
+def test_prepare_chat_error_uses_flask_500_handler(seeded, monkeypatch):
+    import app.asgi
+    from flask import got_request_exception
+
+    def broken():
+        raise RuntimeError('boom')
+    monkeypatch.setattr(app.asgi, 'prepare_chat', broken)
+    monkeypatch.setitem(seeded.config, 'PROPAGATE_EXCEPTIONS', False)
+    raised = []
+
+    def on_exception(sender, exception, **extra):
+        raised.append(exception)
+    with got_request_exception.connected_to(on_exception, seeded):
+        response = asgi_request(seeded, 'POST', '/chat', json={'message': 'hello'})
+
+    assert response.status_code == 500
+    assert response.headers['content-type'].startswith('text/html')
+    assert [type(e) for e in raised] == [RuntimeError]
+
+
+def test_not_found_page_renders(seeded):
+    response = seeded.test_client().get('/no-such-page')
+    assert response.status_code == 404
+    assert '404' in response.text
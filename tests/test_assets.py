@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+import pytest
+
+from app.utils import assets as assets_module
+from app.utils.assets import AssetPipeline, minify_css, minify_js
+
+
+def test_minify_css():
+    css = """/* header */
+    .a  >  .b {
+        color: red;
+        margin: 0 ;
+    }
+    """
+    assert minify_css(css) == '.a>.b{color:red;margin:0}'
+
+
+def test_minify_js_keeps_line_breaks():
+    js = """// helper
+    function f(a) {
+        // inner comment
+        return a + 1
+
+    }
+    var url = 'http://example.com';
+    """
+    assert minify_js(js) == "function f(a) {\nreturn a + 1\n}\nvar url = 'http://example.com';"
+
+
+@pytest.fixture
+def pipeline(app, tmp_path):
+    """pipeline על עותק של קובצי המקור - הבנייה לא נוגעת ב-static של הריפו"""
+    static_dir = tmp_path / 'static'
+    for source in AssetPipeline.SOURCES:
+        os.makedirs(static_dir / os.path.dirname(source), exist_ok=True)
+        shutil.copy(os.path.join(app.static_folder, source), static_dir / source)
+    pipeline = AssetPipeline()
+    pipeline.static_dir = str(static_dir)
+    pipeline.dist_dir = str(static_dir / 'dist')
+    return pipeline
+
+
+def read(path, mode='rb'):
+    with open(path, mode) as f:
+        return f.read()
+
+
+def test_build_fingerprints_and_precompresses(pipeline):
+    assert pipeline.stale()
+    report = pipeline.build()
+    assert not pipeline.stale()
+
+    manifest = json.loads(read(os.path.join(pipeline.dist_dir, 'manifest.json')))
+    assert set(manifest) == set(AssetPipeline.SOURCES)
+    for source, entry in manifest.items():
+        minified = read(os.path.join(pipeline.dist_dir, entry['file']))
+        name, ext = os.path.splitext(os.path.basename(source))
+        assert entry['file'] == f'{name}.{hashlib.sha1(minified).hexdigest()[:10]}.min{ext}'
+        assert len(minified) < report[source]['source']
+        assert gzip.decompress(read(os.path.join(pipeline.dist_dir, entry['file'] + '.gz'))) == minified
+        if assets_module.brotli:
+            assert entry['encodings'] == ['br', 'gzip']
+            br = read(os.path.join(pipeline.dist_dir, entry['file'] + '.br'))
+            assert assets_module.brotli.decompress(br) == minified
+        else:
+            assert entry['encodings'] == ['gzip']
+
+
+def test_rebuild_after_source_change_drops_old_files(pipeline):
+    pipeline.build()
+    old = pipeline._manifest['css/base.css']['file']
+    with open(os.path.join(pipeline.static_dir, 'css/base.css'), 'a') as f:
+        f.write('\n.added { color: blue; }\n')
+    assert pipeline.stale()
+
+    pipeline.build()
+    new = pipeline._manifest['css/base.css']['file']
+    assert new != old
+    assert not [name for name in os.listdir(pipeline.dist_dir) if name.startswith(old)]
+
+
+@pytest.mark.parametrize('accept, encoding, suffix', [
+    ('br, gzip', 'br', '.br'),
+    ('gzip', 'gzip', '.gz'),
+    ('identity', None, ''),
+])
+def test_send_precompressed_sibling(app, pipeline, accept, encoding, suffix):
+    if encoding == 'br' and not assets_module.brotli:
+        pytest.skip('brotli not installed')
+    pipeline.build()
+    filename = pipeline._manifest['js/chat_widget.js']['file']
+    with app.test_request_context(headers={'Accept-Encoding': accept}):
+        response = pipeline.send(filename)
+        response.direct_passthrough = False
+        body = response.get_data()
+    assert response.content_encoding == encoding
+    assert body == read(os.path.join(pipeline.dist_dir, filename + suffix))
+    assert response.mimetype == 'text/javascript'
+    assert response.cache_control.immutable
+    assert 'Accept-Encoding' in response.vary
@@ -0,0 +1,35 @@
+from app.services.movie_service import get_available_movies, get_available_movies_page
+from tests.conftest import add_rental
+
+
+def test_available_movies_exclude_rentals_in_sql(seeded):
+    with seeded.app_context():
+        add_rental(2, 1)
+        add_rental(2, 4)
+        add_rental(3, 2)
+        movies = get_available_movies(2)
+        assert [m['movie_id'] for m in movies] == [2, 3, 5, 6]
+        assert set(movies[0]) == {'movie_id', 'title', 'genre', 'year', 'poster_url'}
+        assert [m['movie_id'] for m in get_available_movies(2, limit=2)] == [2, 3]
+        # סרט 3 - Action, 2003
+        assert [m['movie_id'] for m in get_available_movies(2, genre='Action')] == [3, 6]
+        assert [m['movie_id'] for m in get_available_movies(2, year=2003)] == [3]
+
+
+def test_available_movies_page(seeded):
+    with seeded.app_context():
+        add_rental(2, 6)
+        page = get_available_movies_page(2, sort='title', order='desc', per_page=3)
+        assert [m.movie_id for m in page.items] == [5, 4, 3]
+        rest = get_available_movies_page(2, cursor=page.next_cursor, sort='title', order='desc', per_page=3)
+        assert [m.movie_id for m in rest.items] == [2, 1]
+
+
+def test_all_movies_page_lists_unrented(user_client, seeded):
+    with seeded.app_context():
+        add_rental(2, 3)
+    html = user_client.get('/all-movies?genre=Action').get_data(as_text=True)
+    assert '<h5 class="card-title">Movie 6</h5>' in html
+    # מושכר / ז'אנר אחר
+    assert '<h5 class="card-title">Movie 3</h5>' not in html
+    assert '<h5 class="card-title">Movie 2</h5>' not in html
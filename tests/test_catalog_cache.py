@@ -0,0 +1,46 @@
+from sqlalchemy import update
+
+from app import db
+from app.models import Movie
+from app.services.catalog_cache import catalog_cache
+from app.services.movie_service import search_movies
+
+
+def titles(results):
+    return [movie['title'] for movie in results]
+
+
+def test_admin_edit_invalidates_catalog_and_search(seeded, admin_client):
+    with seeded.app_context():
+        catalog_cache.get_movies()
+        assert titles(search_movies('Movie 3'))[0] == 'Movie 3'
+
+    response = admin_client.post('/admin/movies/edit/3', data={
+        'title': 'Zanzibar Nights', 'year': '2003', 'genre': 'Drama',
+        'description': '', 'tags': 'drama',
+    })
+    assert response.status_code == 302
+
+    with seeded.app_context():
+        assert catalog_cache.get_movies_by_id()[3].title == 'Zanzibar Nights'
+        assert titles(search_movies('zanzibar')) == ['Zanzibar Nights']
+
+
+def test_ttl_reload_with_direct_change_bumps_version(seeded, monkeypatch):
+    with seeded.app_context():
+        catalog_cache.get_movies()
+        search_movies('Movie')
+        version = catalog_cache.version
+
+        # שינוי ישירות במסד, בלי movie_changed
+        db.session.execute(update(Movie).where(Movie.movie_id == 2).values(title='Quasar Drift'))
+        db.session.commit()
+        monkeypatch.setattr(catalog_cache, 'ttl', 0)
+
+        assert catalog_cache.get_movies_by_id()[2].title == 'Quasar Drift'
+        assert catalog_cache.version == version + 1
+        assert titles(search_movies('quasar')) == ['Quasar Drift']
+
+        # טעינה חוזרת בלי שינוי לא מקדמת את הגרסה
+        catalog_cache.get_movies()
+        assert catalog_cache.version == version + 1
@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from app import db
+from app.models import Movie
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_io import import_movies, read_rows
+
+
+def csv_rows(text):
+    return read_rows(io.BytesIO(text.encode('utf-8')), 'csv')
+
+
+def test_partial_columns_do_not_overwrite(seeded):
+    with seeded.app_context():
+        before = db.session.get(Movie, 2)
+        description, tags, year = before.description, before.tags, before.year
+        db.session.execute(db.update(Movie).where(Movie.movie_id == 2).values(poster_url='https://img/2.jpg'))
+        db.session.commit()
+
+        result = import_movies(csv_rows('movie_id,title,genre\n2,Movie 2,Thriller\n7,Brand New,Drama\n'))
+        assert (result.inserted, result.updated, result.skipped) == (1, 1, 0)
+
+        db.session.expire_all()
+        updated = db.session.get(Movie, 2)
+        assert updated.genre == 'Thriller'
+        assert (updated.poster_url, updated.description, updated.tags, updated.year) == \
+            ('https://img/2.jpg', description, tags, year)
+        assert db.session.get(Movie, 7).poster_url == 'movies/default.jpg'
+
+
+def test_rows_with_different_columns_in_one_batch(seeded):
+    with seeded.app_context():
+        lines = [{'movie_id': 1, 'title': 'Movie 1', 'tags': 'retro'},
+                 {'movie_id': 3, 'title': 'Movie 3', 'year': 1999, 'description': None},
+                 {'title': 'Movie 4', 'year': 2004, 'genre': 'Horror'}]
+        data = ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
+        result = import_movies(read_rows(io.BytesIO(data), 'jsonl'))
+        assert result.updated == 3
+
+        db.session.expire_all()
+        movies = {m.movie_id: m for m in Movie.query}
+        assert (movies[1].tags, movies[1].genre, movies[1].year) == ('retro', 'Drama', 2001)
+        assert (movies[3].year, movies[3].description, movies[3].tags) == (1999, None, 'action,space')
+        assert (movies[4].genre, movies[4].tags) == ('Horror', 'drama,love')
+
+
+def test_failed_batch_still_bumps_catalog_version(seeded):
+    def rows():
+        yield 2, {'movie_id': '1', 'title': 'Renamed'}
+        raise OSError('upload interrupted')
+
+    with seeded.app_context():
+        catalog_cache.get_movies()
+        version = catalog_cache.version
+        with pytest.raises(OSError):
+            import_movies(rows(), batch_size=1)
+        assert catalog_cache.version == version + 1
+        assert catalog_cache.get_movies_by_id()[1].title == 'Renamed'
@@ -0,0 +1,52 @@
+from app.services.ai_service import MovieChatbot
+from app.services.chat_cache import ResponseCache, ConversationStore, normalize_question
+
+
+class CountingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        yield f'answer {len(self.prompts)}'
+
+
+def ask(bot, question, session_id):
+    return bot.get_response(question, 'ctx', session_id=session_id)['response']
+
+
+def make_bot():
+    llm = CountingLLM()
+    return MovieChatbot(llm=llm, cache=ResponseCache(), conversations=ConversationStore()), llm
+
+
+def test_key_keeps_word_order():
+    assert normalize_question('Is Alien better than Predator?') == 'alien better than predator'
+    assert ResponseCache.key('Alien better than Predator') != ResponseCache.key('Predator better than Alien')
+    assert ResponseCache.key('Do you have Alien?') == ResponseCache.key('alien')
+
+
+def test_same_first_question_is_served_from_cache():
+    bot, llm = make_bot()
+    assert ask(bot, 'Any space movies?', 'a') == 'answer 1'
+    assert ask(bot, 'any space movies', 'b') == 'answer 1'
+    assert len(llm.prompts) == 1
+
+
+def test_follow_up_depends_on_history():
+    bot, llm = make_bot()
+    ask(bot, 'Recommend a comedy', 'a')
+    ask(bot, 'Recommend a horror movie', 'b')
+
+    first = ask(bot, 'And the second one?', 'a')
+    second = ask(bot, 'And the second one?', 'b')
+    assert first != second
+    assert len(llm.prompts) == 4
+    assert 'Recommend a horror movie' in llm.prompts[-1]
+
+
+def test_clear():
+    cache = ResponseCache()
+    cache.put('k', 'value', 0.1)
+    cache.clear()
+    assert cache.get('k') is None and cache.stats()['bytes'] == 0
@@ -0,0 +1,51 @@
+import json
+
+from app.services.ai_service import chatbot_service
+
+
+def parse_events(body):
+    """(event, data) לכל הודעת SSE; event ברירת מחדל - message"""
+    events = []
+    for frame in body.split('\n\n'):
+        if not frame:
+            continue
+        fields = dict(line.split(': ', 1) for line in frame.split('\n'))
+        assert set(fields) <= {'event', 'data'}
+        events.append((fields.get('event', 'message'), json.loads(fields['data'])))
+    return events
+
+
+def test_chat_streams_tokens_over_sse(seeded):
+    client = seeded.test_client()
+    response = client.post('/chat', json={'message': 'recommend a space movie'},
+                           headers={'Accept': 'text/event-stream'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n\n')
+    events = parse_events(body)
+    *tokens, (last_event, last_data) = events
+    assert tokens and all(event == 'message' for event, _ in tokens)
+    # הטוקנים לפי הסדר מרכיבים את תשובת המודל המזויף
+    assert ''.join(data['token'] for _, data in tokens) == chatbot_service.get().llm.reply
+    assert last_event == 'done'
+    assert set(last_data) == {'time'}
+
+
+def test_chat_without_sse_returns_json(seeded):
+    response = seeded.test_client().post('/chat', json={'message': 'recommend a space movie'})
+    assert response.is_json
+    assert response.get_json()['response'] == chatbot_service.get().llm.reply
+
+
+def test_chat_stream_error_event(seeded, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('model down')
+        yield
+    monkeypatch.setattr(chatbot_service.get(), 'stream_response', broken)
+    response = seeded.test_client().post('/chat', json={'message': 'hello'},
+                                         headers={'Accept': 'text/event-stream'})
+    assert [event for event, _ in parse_events(response.get_data(as_text=True))] == ['error']
@@ -0,0 +1,56 @@
+from app.utils.fragment_cache import fragment_cache
+from tests.conftest import count_statements, login, user_email
+
+EMPTY_RENTALS = '<h4>🎬 עדיין לא השכרת סרטים</h4>'
+
+
+def data_queries(statements):
+    # שאילתות הבלוקים (סרטים / השכרות), בלי load_user
+    return [s for s in statements if '"Movies"' in s or '"Rentals"' in s]
+
+
+def rentals_block(page):
+    return page.split('הסרטים שהשכרתי')[1]
+
+
+def dashboard(seeded, client):
+    with seeded.app_context(), count_statements() as statements:
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+    return response.get_data(as_text=True), data_queries(statements)
+
+
+def test_second_render_served_from_fragments(seeded, user_client):
+    first, queries = dashboard(seeded, user_client)
+    assert queries
+    second, queries = dashboard(seeded, user_client)
+    assert queries == []
+    assert rentals_block(second) == rentals_block(first)
+    assert fragment_cache.stats()['hits'] >= 3
+
+
+def test_rental_invalidates_user_fragments(seeded, user_client):
+    page, _ = dashboard(seeded, user_client)
+    assert EMPTY_RENTALS in rentals_block(page)
+
+    assert user_client.post('/rent/4').status_code == 302
+    page, queries = dashboard(seeded, user_client)
+    assert queries
+    assert EMPTY_RENTALS not in rentals_block(page) and 'Movie 4' in rentals_block(page)
+
+
+def test_catalog_edit_invalidates_fragments(seeded, user_client, admin_client):
+    dashboard(seeded, user_client)
+    admin_client.post('/admin/movies/edit/1', data={
+        'title': 'Completely New Title', 'year': '2001', 'genre': 'Drama', 'description': '', 'tags': 'drama',
+    })
+    page, queries = dashboard(seeded, user_client)
+    assert queries
+    assert 'Completely New Title' in page
+
+
+def test_fragments_are_per_user(seeded, user_client):
+    dashboard(seeded, user_client)
+    other = login(seeded.test_client(), user_email(3))
+    _, queries = dashboard(seeded, other)
+    assert queries
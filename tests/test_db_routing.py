@@ -0,0 +1,80 @@
+import os
+
+import pytest
+from flask import g
+from sqlalchemy import text, update
+
+from app import create_app, db
+from app.models import Movie
+from app.utils.db_routing import PRIMARY_COOKIE, REPLICA_BIND, db_router, replica_read
+
+
+@pytest.fixture(scope='module')
+def replica_app(tmp_path_factory):
+    work_dir = tmp_path_factory.mktemp('replica')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{work_dir}/primary.db',
+        'DB_REPLICA_URL': f'sqlite:///{work_dir}/replica.db',
+        'CATALOG_VERSION_BACKEND': 'local',
+        'USER_VERSION_BACKEND': 'local',
+        'RENTAL_VERSION_BACKEND': 'local',
+        'SUBMISSIONS_COUNT_BACKEND': 'local',
+        'RETRIEVER_INDEX_DIR': os.path.join(work_dir, 'retriever'),
+        'MAIL_QUEUE_DIR': os.path.join(work_dir, 'mail_queue'),
+        'MAIL_QUEUE_AUTOSTART': False,
+        'POSTER_CACHE_DIR': os.path.join(work_dir, 'posters'),
+        'ASSETS_AUTO_BUILD': False,
+    })
+
+    @app.route('/_routing/write', methods=['POST'])
+    def routing_write():
+        db.session.execute(update(Movie).where(Movie.movie_id == 1).values(year=1999))
+        db.session.commit()
+        return 'ok'
+
+    @app.route('/_routing/bind')
+    def routing_bind():
+        return 'replica' if reads_from_replica() else 'primary'
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Movie(movie_id=1, title='Primary', genre='Drama', year=2001))
+        db.session.commit()
+    yield app
+    # db ו-db_router משותפים לכל האפליקציות בתהליך - שאר הבדיקות רצות בלי replica
+    db.metadatas.pop(REPLICA_BIND, None)
+    db_router.enabled = False
+
+
+@replica_read
+def reads_from_replica():
+    return db.session.get_bind() is db.engines[REPLICA_BIND]
+
+
+@pytest.mark.parametrize('write', [
+    lambda: db.session.execute(update(Movie).where(Movie.movie_id == 1).values(year=2002)),
+    lambda: db.session.execute(text('UPDATE "Movies" SET year = 2003 WHERE movie_id = 1')),
+    lambda: db.session.connection().exec_driver_sql('UPDATE "Movies" SET year = 2004 WHERE movie_id = 1'),
+])
+def test_core_write_pins_request_to_primary(replica_app, write):
+    with replica_app.test_request_context():
+        assert reads_from_replica()
+        write()
+        assert g.db_wrote
+        assert not reads_from_replica()
+        db.session.rollback()
+
+
+def test_write_sets_pin_cookie_without_session(replica_app):
+    client = replica_app.test_client()
+    assert client.get('/_routing/bind').text == 'replica'
+
+    response = client.post('/_routing/write')
+    assert response.status_code == 200
+    assert client.get_cookie(PRIMARY_COOKIE) is not None
+    assert 'Cookie' not in response.headers.get('Vary', '')
+    assert client.get('/_routing/bind').text == 'primary'
+
+    client.delete_cookie(PRIMARY_COOKIE)
+    assert client.get('/_routing/bind').text == 'replica'
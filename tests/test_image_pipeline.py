@@ -0,0 +1,46 @@
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from app.utils.image_pipeline import ImageValidationError, ProfileImagePipeline  # noqa: E402
+
+
+def image_bytes(size=(400, 300), fmt='PNG', color=(10, 120, 200)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, fmt)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ProfileImagePipeline(max_pixels=1_000_000)
+    pipeline.image_dir = str(tmp_path)
+    return pipeline
+
+
+@pytest.mark.parametrize('data', [b'not an image', image_bytes((2000, 1000)), image_bytes(fmt='TIFF')])
+def test_validate_rejects(pipeline, data):
+    with pytest.raises(ImageValidationError):
+        pipeline.validate(data)
+
+
+def test_process_writes_square_sizes_and_replaces_previous(pipeline, app):
+    first = pipeline.process(7, image_bytes())
+    for size, side in ProfileImagePipeline.SIZES.items():
+        with Image.open(os.path.join(pipeline.image_dir, f'user_7-{size}-{first}.webp')) as image:
+            assert image.size == (min(side, 300),) * 2
+
+    second = pipeline.process(7, image_bytes(color=(200, 0, 0)))
+    assert second != first
+    names = os.listdir(pipeline.image_dir)
+    assert not [name for name in names if first in name]
+    assert len([name for name in names if second in name]) == 2 * len(ProfileImagePipeline.SIZES)
+
+    with app.test_request_context(headers={'Accept': 'image/webp,*/*'}):
+        assert pipeline.avatar_url(7, 'sm').endswith(f'/profile_images/user_7-sm-{second}.webp')
+    with app.test_request_context():
+        assert pipeline.avatar_url(7).endswith(f'user_7-md-{second}.png')
+        assert pipeline.avatar_url(8).endswith('/profile_images/user_8.png')
@@ -0,0 +1,54 @@
+from app import db
+from app.models import Rental
+from app.services.recommendation_engine import ItemSimilarityEngine, item_engine
+from app.services.rental_service import rental_changed
+from app.services.rental_version import rental_version
+from tests.conftest import add_rental
+
+
+def test_remove_one_of_two_rentals_keeps_pair():
+    engine = ItemSimilarityEngine()
+    engine.build_from_pairs([(1, 10), (1, 10), (1, 20), (2, 10)], [10, 20, 30])
+    assert [movie_id for movie_id, _ in engine.recommend(2)] == [20]
+
+    # למשתמש 1 שתי השכרות של סרט 10 - מחיקת אחת לא מבטלת את הקשר 10-20
+    engine.remove_rental(1, 10)
+    assert [movie_id for movie_id, _ in engine.recommend(2)] == [20]
+
+    engine.remove_rental(1, 10)
+    assert engine.recommend(2) == []
+
+
+def test_rebuilds_after_rental_from_another_worker(seeded):
+    with seeded.app_context():
+        add_rental(2, 1)
+        add_rental(2, 2)
+        add_rental(3, 1)
+        db.session.commit()
+        rental_version.bump()
+        assert [movie_id for movie_id, _ in item_engine.recommend(3)] == [2]
+
+        # worker אחר: השכרה חדשה ב-DB והגרסה המשותפת מתקדמת, בלי add_rental מקומי
+        add_rental(4, 1)
+        add_rental(4, 3)
+        db.session.commit()
+        rental_version.bump(4)
+        assert sorted(movie_id for movie_id, _ in item_engine.recommend(3)) == [2, 3]
+
+
+def test_local_change_adopts_version_without_rebuild(seeded, monkeypatch):
+    with seeded.app_context():
+        add_rental(2, 1)
+        add_rental(2, 2)
+        add_rental(3, 1)
+        db.session.commit()
+        rental_version.bump()
+        item_engine.recommend(3)
+
+        builds = []
+        monkeypatch.setattr(item_engine, 'build', lambda: builds.append(1))
+        db.session.add(Rental(user_id=3, movie_id=4))
+        db.session.commit()
+        rental_changed(3, 4)
+        item_engine.recommend(3)
+        assert builds == []
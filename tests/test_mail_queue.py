@@ -0,0 +1,111 @@
+import os
+import socket
+import time
+
+import pytest
+from flask import Flask
+
+from app.utils.mail_queue import MailQueue
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+
+class Recorder:
+    """שרת SMTP מקומי במקום השרת האמיתי: שומר הודעות או מחזיר שגיאה זמנית"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.reject = False
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject:
+            return '451 try again later'
+        self.sessions.add(id(session))
+        self.messages.append(envelope.content.decode('utf-8', 'replace'))
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp_server():
+    recorder = Recorder()
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    controller = aiosmtpd_controller.Controller(recorder, hostname='127.0.0.1', port=port)
+    controller.start()
+    yield recorder, port
+    controller.stop()
+
+
+def make_queue(tmp_path, port, **config):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config.update({'MAIL_SERVER': '127.0.0.1', 'MAIL_PORT': port, 'MAIL_USE_TLS': False,
+                       'MAIL_DEFAULT_SENDER': 'noreply@test.local', 'MAIL_QUEUE_DIR': str(tmp_path / 'spool'),
+                       'MAIL_QUEUE_AUTOSTART': False, 'MAIL_QUEUE_POLL_INTERVAL': 0.05, **config})
+    queue = MailQueue()
+    queue.init_app(app)
+    return queue
+
+
+def spool(queue):
+    return sorted(name for name in os.listdir(queue.spool_dir) if name != 'failed')
+
+
+def test_batch_sent_over_one_connection(tmp_path, smtp_server):
+    recorder, port = smtp_server
+    queue = make_queue(tmp_path, port)
+    for i in range(3):
+        queue._write(_message(f'subject {i}'), not_before=0, attempts=0)
+
+    assert queue.flush() == 3
+    assert sorted(m.split('Subject: ')[1].split('\n')[0].strip() for m in recorder.messages) == \
+        ['subject 0', 'subject 1', 'subject 2']
+    assert len(recorder.sessions) == 1
+    assert spool(queue) == [] and queue.sent == 3
+    queue._close()
+
+
+def test_temporary_failure_is_retried_with_backoff(tmp_path, smtp_server):
+    recorder, port = smtp_server
+    queue = make_queue(tmp_path, port, MAIL_QUEUE_BACKOFF=60)
+    recorder.reject = True
+    queue._write(_message('later'), not_before=0, attempts=0)
+
+    assert queue.flush() == 1
+    [name] = spool(queue)
+    not_before, attempts, _ = name.split('-', 2)
+    assert attempts == '1' and int(not_before) > time.time() + 30
+    assert queue.flush() == 0  # עוד לא הגיע הזמן
+
+
+def test_stale_claim_keeps_attempts(tmp_path, smtp_server):
+    _, port = smtp_server
+    queue = make_queue(tmp_path, port)
+    assert queue.stale_after > queue.batch_size * queue.smtp_timeout
+    queue._write(_message('crashed'), not_before=0, attempts=3, name='abc')
+    os.rename(os.path.join(queue.spool_dir, '0-3-abc.eml'), os.path.join(queue.spool_dir, '.3-abc.sending'))
+
+    queue._recover_stale()
+    assert spool(queue) == ['.3-abc.sending']  # עדיין בטווח של מנה בשליחה
+    queue._recover_stale(max_age=-1)
+    assert spool(queue) == ['0-3-abc.eml']
+
+
+def test_worker_starts_in_init_app_and_drains_spool(tmp_path, smtp_server):
+    recorder, port = smtp_server
+    queue = make_queue(tmp_path, port)
+    queue._write(_message('left over'), not_before=0, attempts=0)
+    assert queue._thread is None
+
+    # אין קריאה ל-send - ה-worker שהופעל ב-init_app שולח את מה שנשאר בתור
+    queue = make_queue(tmp_path, port, MAIL_QUEUE_AUTOSTART=True)
+    deadline = time.monotonic() + 10
+    while not recorder.messages and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(recorder.messages) == 1 and 'left over' in recorder.messages[0]
+
+
+def _message(subject):
+    return (f'From: noreply@test.local\r\nTo: user@test.local\r\nSubject: {subject}\r\n\r\n'
+            f'body of {subject}\r\n').encode('utf-8')
@@ -0,0 +1,88 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import db
+from app.models import Movie
+from app.services.catalog_cache import catalog_cache
+from app.services.movie_retriever import MovieRetriever, movie_retriever
+
+
+@pytest.fixture
+def catalog(seeded):
+    with seeded.app_context():
+        db.session.add(Movie(movie_id=101, title='Interstellar', genre='Sci-Fi', year=2014,
+                             description='Astronauts travel through a wormhole', tags='space,time'))
+        db.session.add(Movie(movie_id=102, title='Gravity', genre='Sci-Fi', year=2013,
+                             description='Two astronauts stranded in space', tags='space'))
+        db.session.commit()
+        catalog_cache.bump()
+        yield seeded
+
+
+def index_dirs():
+    return sorted(name for name in os.listdir(movie_retriever.index_dir) if name.startswith('v'))
+
+
+def test_build_and_load_round_trip(catalog, tmp_path):
+    movies = catalog_cache.get_movies()
+    retriever = MovieRetriever()
+    retriever.build(movies, str(tmp_path / 'index'))
+
+    index = retriever._load(str(tmp_path / 'index'))
+    assert isinstance(index['data'], np.memmap)
+    assert list(index['movie_ids']) == [m.movie_id for m in movies]
+    assert index['indptr'][-1] == len(index['indices']) == len(index['data'])
+    assert 'interstellar' in index['term_ids']
+
+
+def test_named_movie_ranks_first(catalog):
+    hits = movie_retriever.retrieve('tell me about Interstellar and space', k=3)
+    assert hits[0][0] == 101
+    assert 102 in [movie_id for movie_id, _ in hits]
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+    assert 'Interstellar (2014' in movie_retriever.context_for('Interstellar')
+
+
+def test_rebuilds_after_catalog_bump(catalog):
+    assert movie_retriever.retrieve('Arrival') == []
+    db.session.add(Movie(movie_id=103, title='Arrival', genre='Sci-Fi', year=2016,
+                         description='A linguist meets visitors', tags='aliens'))
+    db.session.commit()
+    catalog_cache.bump()
+
+    assert movie_retriever.retrieve('Arrival')[0][0] == 103
+    # האינדקס הקודם נמחק
+    assert len(index_dirs()) == 1
+
+
+def test_same_version_different_catalog_rebuilds(catalog, monkeypatch):
+    movie_retriever.retrieve('Interstellar')
+    before = index_dirs()
+
+    # הפעלה חדשה מול קטלוג אחר: אותו מספר גרסה, תוכן שונה
+    other = [SimpleNamespace(movie_id=1, title='Solaris', genre='Drama', year=1972,
+                             tags='space', description='A psychologist on a space station')]
+    monkeypatch.setattr(catalog_cache, 'get_movies', lambda: other)
+    fresh = MovieRetriever()
+    fresh.index_dir = movie_retriever.index_dir
+
+    assert [movie_id for movie_id, _ in fresh.retrieve('Solaris')] == [1]
+    assert fresh.retrieve('Interstellar') == []
+    assert index_dirs() != before
+
+
+def test_cleanup_removes_old_versions(catalog):
+    movie_retriever.retrieve('Interstellar')
+    keep = index_dirs()[0]
+    for name in ('v1', 'vold'):
+        os.makedirs(os.path.join(movie_retriever.index_dir, name))
+    other = os.path.join(movie_retriever.index_dir, 'notes.txt')
+    open(other, 'w').close()
+
+    movie_retriever._cleanup(keep=keep)
+    assert index_dirs() == [keep]
+    assert os.path.exists(other)
+    os.remove(other)
@@ -0,0 +1,70 @@
+import datetime
+
+from app import db
+from app.models import Movie, Rental
+from app.services.movie_service import get_movies_page
+from app.services.rental_service import get_rentals_page
+from app.utils.pagination import encode_cursor, decode_cursor
+from tests.conftest import add_rental
+
+
+def test_cursor_round_trip_with_separator_and_null():
+    row = Movie(movie_id=7, title='Mission: Impossible | Fallout|7')
+    columns = [Movie.title, Movie.movie_id]
+    cursor = encode_cursor(row, columns)
+    assert decode_cursor(cursor, columns) == ['Mission: Impossible | Fallout|7', 7]
+
+    rental = Rental(rental_id=3, rent_date=None)
+    columns = [Rental.rent_date, Rental.rental_id]
+    assert decode_cursor(encode_cursor(rental, columns), columns) == [None, 3]
+
+    rental.rent_date = datetime.date(2024, 5, 1)
+    assert decode_cursor(encode_cursor(rental, columns), columns) == [datetime.date(2024, 5, 1), 3]
+
+
+def test_invalid_cursor_falls_back_to_first_page():
+    columns = [Movie.title, Movie.movie_id]
+    assert decode_cursor('not-a-cursor', columns) is None
+    assert decode_cursor('a|1', columns) is None
+
+
+def walk(fetch):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = fetch(cursor)
+        items.extend(page.items)
+        pages += 1
+        assert pages < 50, 'pager does not advance'
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def test_movies_title_pages_with_pipe_in_title(seeded):
+    with seeded.app_context():
+        for i in range(10, 16):
+            db.session.add(Movie(movie_id=i, title=f'Mission | Part|{i}'))
+        db.session.commit()
+        items = walk(lambda cursor: get_movies_page(cursor=cursor, sort='title', per_page=2))
+        ids = [movie.movie_id for movie in items]
+        assert len(ids) == len(set(ids)) == Movie.query.count()
+
+
+def test_rentals_by_date_include_null_dates(seeded):
+    with seeded.app_context():
+        for i in range(6):
+            add_rental(2 + i % 3, 1 + i, days=i)
+        for i in range(4):
+            db.session.add(Rental(user_id=2, movie_id=1 + i, rent_date=None))
+        db.session.commit()
+        total = Rental.query.count()
+
+        for order in ('asc', 'desc'):
+            rows = walk(lambda cursor: get_rentals_page(cursor=cursor, sort='rent_date', order=order, per_page=3))
+            ids = [row.rental_id for row in rows]
+            assert len(ids) == len(set(ids)) == total
+            dates = [row.rent_date for row in rows]
+            nulls = [i for i, value in enumerate(dates) if value is None]
+            # NULL קודם בסדר עולה, אחרון בסדר יורד
+            expected = list(range(4)) if order == 'asc' else list(range(total - 4, total))
+            assert nulls == expected
@@ -0,0 +1,34 @@
+import re
+
+from app.utils.perf import profiler
+from tests.conftest import count_statements
+
+
+def server_timing(response):
+    return dict(re.match(r'(\w+);dur=([\d.]+)', value).groups()
+                for value in response.headers.get_all('Server-Timing'))
+
+
+def test_server_timing_counts_queries(seeded, admin_client):
+    with seeded.app_context(), count_statements() as statements:
+        response = admin_client.get('/admin/users')
+    assert response.status_code == 200
+    assert f'desc="{len(statements)} queries"' in response.headers.get_all('Server-Timing')[0]
+    assert set(server_timing(response)) == {'db', 'tpl', 'app'}
+
+
+def test_admin_perf_summary(seeded, admin_client, monkeypatch):
+    monkeypatch.setattr(profiler, 'slow_query_ms', 0)
+    admin_client.get('/faq')
+    admin_client.get('/admin/users')
+
+    data = admin_client.get('/admin/perf?format=json').get_json()
+    rows = {row['endpoint']: row for row in data['endpoints']}
+    assert rows['main.faq']['count'] >= 1
+    assert rows['main.admin_users_list']['avg_queries'] >= 1
+    assert any(entry['endpoint'] == 'main.admin_users_list' for entry in data['slow_queries'])
+    assert admin_client.get('/admin/perf').status_code == 200
+
+
+def test_admin_perf_requires_admin(user_client):
+    assert user_client.get('/admin/perf?format=json').status_code == 302
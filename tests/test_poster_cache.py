@@ -0,0 +1,116 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from app.services.poster_cache import PosterCache, poster_key  # noqa: E402
+
+
+def png(width, height):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buf, 'PNG')
+    return buf.getvalue()
+
+
+class PosterServer(BaseHTTPRequestHandler):
+    """שרת HTTP מקומי במקום אתר הפוסטרים"""
+
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def poster_server():
+    PosterServer.files = {'/ok.png': png(800, 1200), '/bomb.png': png(300, 300), '/text.png': b'not an image'}
+    PosterServer.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PosterServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PosterCache(workers=1, timeout=5)
+    cache.cache_dir = str(tmp_path)
+    return cache
+
+
+def test_fetch_renders_all_sizes(cache, poster_server):
+    url = f'{poster_server}/ok.png'
+    assert cache._fetch(poster_key(url), url) is True
+    assert cache.is_cached(poster_key(url))
+    with Image.open(cache.path(poster_key(url), 'sm', 'webp')) as image:
+        assert image.width == PosterCache.SIZES['sm']
+
+
+@pytest.mark.parametrize('name', ['bomb.png', 'text.png', 'missing.png'])
+def test_bad_poster_is_logged_and_backed_off(cache, poster_server, monkeypatch, name):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100)  # 300x300 > 2 x 100 - DecompressionBombError
+    url = f'{poster_server}/{name}'
+    assert cache._fetch(poster_key(url), url) is False
+    assert cache.failed == 1 and poster_key(url) in cache._failed
+    assert not cache._pending
+
+    # אין שליפה חוזרת עד retry_after
+    assert cache.prefetch(url) is None
+    assert PosterServer.requests == [f'/{name}']
+
+
+@pytest.fixture
+def remote_poster(seeded, monkeypatch):
+    from app import db
+    from app.models import Movie
+    from app.services.catalog_cache import catalog_cache
+    from app.services.poster_cache import poster_cache
+    url = 'http://posters.test/alien.jpg'
+    with seeded.app_context():
+        db.session.get(Movie, 1).poster_url = url
+        db.session.commit()
+        catalog_cache.bump()
+    prefetched = []
+    monkeypatch.setattr(poster_cache, 'prefetch', prefetched.append)
+    return poster_key(url), url, prefetched
+
+
+def test_poster_route_redirects_until_cached(seeded, remote_poster):
+    key, url, prefetched = remote_poster
+    response = seeded.test_client().get(f'/posters/{key}-md.webp')
+    assert response.status_code == 302
+    assert response.location == url
+    assert prefetched == [url]
+
+
+@pytest.mark.parametrize('path', [
+    '{key}-xl.webp',            # גודל לא מוכר
+    '{key}-md.gif',             # פורמט לא מוכר
+    '{upper}-md.webp',          # לא hex קטן
+    'zzzzzzzzzzzzzzzzzzzz-md.webp',
+    '{key}0-md.webp',           # 21 תווים
+])
+def test_poster_route_rejects_bad_urls(seeded, remote_poster, path):
+    key, _, prefetched = remote_poster
+    response = seeded.test_client().get('/posters/' + path.format(key=key, upper=key.upper()))
+    assert response.status_code == 404
+    assert prefetched == []
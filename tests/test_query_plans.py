@@ -0,0 +1,56 @@
+"""
+EXPLAIN QUERY PLAN לשאילתות החמות: פונקציות השירות האמיתיות רצות מול SQLite
+של הבדיקות (הטבלאות והאינדקסים מהמודלים), ה-SQL שנשלח נלכד ונבדק שהאינדקס
+הצפוי מופיע בתוכנית - הסרת אינדקס מהמודלים מפילה את הבדיקה.
+"""
+import pytest
+from sqlalchemy import event
+
+from app import db
+
+
+def hot_queries():
+    """(שם, פונקציה שמריצה את השאילתה, האינדקס שחייב להופיע בתוכנית)"""
+    from app.models import ContactSubmission
+    from app.services.movie_service import get_available_movies, get_movies_page
+    from app.services.rental_service import get_user_rentals_with_movie_details, get_rentals_page
+    from app.services.submission_service import get_submissions_page
+    return [
+        ('user rentals', lambda: get_user_rentals_with_movie_details(2), 'ix_rentals_user_movie'),
+        ('available movies (NOT EXISTS)', lambda: get_available_movies(2, limit=30), 'ix_rentals_user_movie'),
+        ('available movies by genre/year',
+         lambda: get_available_movies(2, genre='Drama', year=2001), 'ix_movies_genre_year'),
+        ('admin movies by year', lambda: get_movies_page(year=2001), 'ix_movies_year'),
+        ('admin movies by title', lambda: get_movies_page(sort='title'), 'ix_movies_title'),
+        ('admin rentals by date', lambda: get_rentals_page(sort='rent_date', order='desc'), 'ix_rentals_rent_date'),
+        ('new submissions count',
+         lambda: ContactSubmission.query.filter_by(is_new=True).count(), 'ix_submissions_is_new_timestamp'),
+        ('admin submissions', lambda: get_submissions_page(), 'ix_submissions_timestamp'),
+        ('admin new submissions', lambda: get_submissions_page(status='new'), 'ix_submissions_is_new_timestamp'),
+    ]
+
+
+def query_plan(run):
+    statements = []
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        statements.append((statement, params))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, params in statements:
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', params).fetchall()
+            plans.extend(row[-1] for row in rows)
+    return '\n'.join(plans)
+
+
+@pytest.mark.parametrize('name, run, expected_index', hot_queries(), ids=[q[0] for q in hot_queries()])
+def test_hot_query_uses_index(seeded, name, run, expected_index):
+    with seeded.app_context():
+        plan = query_plan(run)
+    assert expected_index in plan, f'{name}:\n{plan}'
@@ -0,0 +1,70 @@
+import pytest
+
+from app import db
+from app.models import Movie
+from app.services import search_index as search_module
+from app.services.catalog_cache import catalog_cache
+from app.services.movie_service import movie_changed, update_movie
+from app.services.search_index import search_index, tokenize
+
+
+@pytest.fixture
+def catalog(seeded):
+    with seeded.app_context():
+        yield seeded
+
+
+def add_movies(*rows, start=100):
+    for i, (title, description) in enumerate(rows, start):
+        db.session.add(Movie(movie_id=i, title=title, genre='Drama', year=2020, description=description))
+    db.session.commit()
+    catalog_cache.bump()
+
+
+def ids(query, **kwargs):
+    return [movie.movie_id for movie, _ in search_index.search(query, **kwargs)]
+
+
+def test_hebrew_prefix_letter_variant(catalog):
+    add_movies(('הסרט הגדול', 'עלילה'))
+    assert tokenize('הסרט') == ['הסרט', 'סרט']
+    assert ids('סרט', prefix=False) == [100]
+
+
+def test_final_letters_normalised(catalog):
+    add_movies(('חלום', 'עלילה'))
+    assert tokenize('חלום', variants=False) == ['חלומ']
+    assert ids('חלום', prefix=False) == ids('חלומ', prefix=False) == [100]
+    # אות סופית באמצע הקלדה - התחילית עדיין מתאימה
+    assert ids('חלו') == [100]
+
+
+def test_prefix_expansion_capped(catalog, monkeypatch):
+    monkeypatch.setattr(search_module, 'MAX_PREFIX_EXPANSIONS', 3)
+    add_movies(*[(f'zebra{letter}', 'x') for letter in 'abcde'])
+    assert ids('zebra', prefix=False) == []
+    assert ids('zebr', limit=10) == [100, 101, 102]
+
+
+def test_title_hit_outranks_description_hit(catalog):
+    add_movies(('Plain', 'a nebula story'), ('Nebula', 'a plain story'))
+    assert ids('nebula') == [101, 100]
+
+
+def test_incremental_updates_keep_vocabulary_and_version(catalog):
+    add_movies(('Nebula', 'space'), ('Quasar', 'space'))
+    assert ids('nebula') == [100]
+
+    update_movie(100, title='Pulsar')
+    assert search_index._vocabulary == sorted(search_index._postings)
+    assert search_index._version == catalog_cache.version
+    assert ids('nebula') == []
+    assert ids('pulsar') == [100]
+
+    db.session.delete(db.session.get(Movie, 101))
+    db.session.commit()
+    movie_changed(101)
+    assert search_index._vocabulary == sorted(search_index._postings)
+    assert 'quasar' not in search_index._vocabulary
+    assert search_index._version == catalog_cache.version
+    assert ids('quasar') == []
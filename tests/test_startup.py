@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import click
+
+from app import _cli_command
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHELL_INPUT = '''
+import sys, threading
+from app.services.ai_service import chatbot_service
+print('STATE', chatbot_service.state, sorted(t.name for t in threading.enumerate()))
+print('HEAVY', [name for name in ('numpy', 'scipy', 'PIL') if name in sys.modules])
+'''
+
+
+def test_cli_command_detection():
+    assert not _cli_command()
+    with click.Context(click.Command('run'), info_name='run'):
+        assert not _cli_command()
+    with click.Context(click.Command('upgrade'), info_name='upgrade'):
+        assert _cli_command()
+
+
+def test_flask_cli_skips_background_threads(tmp_path):
+    env = dict(os.environ, CHATBOT_BACKEND='fake', CHATBOT_WARMUP='1', MAIL_QUEUE_AUTOSTART='1',
+               CINEMATE_DATABASE_URL=f'sqlite:///{tmp_path}/cli.db', MAIL_QUEUE_DIR=str(tmp_path / 'mail'),
+               POSTER_CACHE_DIR=str(tmp_path / 'posters'), RETRIEVER_INDEX_DIR=str(tmp_path / 'retriever'))
+    result = subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'shell'], input=SHELL_INPUT,
+                            cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    state = next(line for line in result.stdout.splitlines() if 'STATE' in line)
+    assert "STATE cold" in state
+    assert 'chatbot-warmup' not in state and 'mail-queue' not in state
+    assert "HEAVY []" in result.stdout
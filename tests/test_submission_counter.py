@@ -0,0 +1,46 @@
+import pytest
+
+from app.services.submission_counter import LocalCounterStore, new_submissions_counter
+from tests.conftest import count_statements
+
+
+@pytest.fixture
+def counter(seeded, monkeypatch):
+    # מונה ריק - הקריאה הראשונה מסתנכרנת מול המסד
+    monkeypatch.setattr(new_submissions_counter, '_store', LocalCounterStore())
+    return new_submissions_counter
+
+
+def submit(client, i):
+    response = client.post('/contact', data={'name': f'n{i}', 'email': f'c{i}@test.local', 'message': 'hi'})
+    assert response.status_code == 302
+
+
+def test_counter_follows_submissions_without_count_queries(seeded, counter, admin_client):
+    reconciles = counter.reconciles
+    client = seeded.test_client()
+    submit(client, 1)
+    with seeded.app_context():
+        assert counter.get() == 1
+    submit(client, 2)
+    submit(client, 3)
+
+    with seeded.app_context(), count_statements() as statements:
+        assert counter.get() == 3
+        admin_client.get('/admin/submission/1')
+    assert not [s for s in statements if 'count(' in s.lower()]
+
+    admin_client.delete('/admin/delete_submission/2')
+    admin_client.delete('/admin/delete_submission/1')  # כבר נקראה
+    with seeded.app_context():
+        assert counter.get() == 1
+        assert counter.reconciles == reconciles + 1
+
+
+def test_reconcile_corrects_drift(seeded, counter, monkeypatch):
+    with seeded.app_context():
+        assert counter.get() == 0
+        counter.add(5)  # למשל פניות שנמחקו ישירות במסד
+        assert counter.get() == 5
+        monkeypatch.setattr(counter, 'reconcile_interval', 0)
+        assert counter.get() == 0
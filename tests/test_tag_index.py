@@ -0,0 +1,32 @@
+from app.services.catalog_cache import catalog_cache
+from app.services.movie_service import get_recommended_movies, update_movie
+from app.services.tag_index import split_tags, tag_index
+from tests.conftest import add_rental
+
+
+def test_split_tags_normalises():
+    assert split_tags(' Action, space ,ACTION,, ') == ('action', 'space')
+    assert split_tags(None) == ()
+
+
+def test_score_only_movies_sharing_tags(seeded):
+    with seeded.app_context():
+        # סרטים אי-זוגיים: action,space; זוגיים: drama,love
+        scores = tag_index.score({'space': 2, 'action': 1}, exclude={1})
+    assert dict(scores) == {3: 3, 5: 3}
+
+
+def test_recommendations_rank_by_shared_tags(seeded):
+    with seeded.app_context():
+        add_rental(2, 1)
+        assert [m['movie_id'] for m in get_recommended_movies(2)] == [5, 3]
+        assert get_recommended_movies(3) == []
+
+
+def test_movie_edit_updates_index_in_place(seeded):
+    with seeded.app_context():
+        add_rental(2, 1)
+        get_recommended_movies(2)
+        update_movie(4, tags='Space')
+        assert tag_index._version == catalog_cache.version
+        assert [m['movie_id'] for m in get_recommended_movies(2, limit=5)] == [5, 3, 4]
@@ -0,0 +1,38 @@
+from app import db
+from app.models import User
+from app.services.user_cache import user_cache
+from tests.conftest import ADMIN_EMAIL, PASSWORD, count_statements, login, user_email
+
+
+def user_selects(statements):
+    return [s for s in statements if 'from "users"' in s.lower()]
+
+
+def test_load_user_is_cached_between_requests(seeded, user_client):
+    user_client.get('/faq')
+    with seeded.app_context(), count_statements() as statements:
+        assert user_client.get('/faq').status_code == 200
+    assert user_selects(statements) == []
+
+
+def test_admin_edit_invalidates_cached_user(seeded, user_client):
+    assert 'User2' in user_client.get('/profile').get_data(as_text=True)
+
+    admin = login(seeded.test_client(), ADMIN_EMAIL)
+    response = admin.post('/admin/users/edit/2', data={
+        'first_name': 'Renamed', 'last_name': 'Test', 'email': user_email(2), 'password': PASSWORD,
+    })
+    assert response.status_code == 302
+
+    with seeded.app_context(), count_statements() as statements:
+        page = user_client.get('/profile').get_data(as_text=True)
+    assert 'Renamed' in page
+    assert user_selects(statements)
+
+
+def test_deleted_user_is_logged_out(seeded, user_client):
+    with seeded.app_context():
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+        user_cache.invalidate(2)
+    assert user_client.get('/profile').status_code == 302